@@ -1,22 +1,76 @@
-import openai
 from dotenv import load_dotenv
 import os
 import json
 import re
+import threading
 from collections import deque
+from stream_sinks import StreamSink, MetricsSink, MultiSink, default_sink
+from llm_pool import Endpoint, EndpointPool
+from fair_queue import FairQueue
+import metrics
 
 load_dotenv()
 my_api_key = os.getenv("KEY")
 
+# Shared pool of model servers, configured from LLM_ENDPOINTS (or LLM_HOST/LLM_PORT)
+llm_pool = None
+llm_pool_lock = threading.Lock()
+
+# Weighted fair queue in front of the pool, shared by every request in the process
+llm_queue = None
+
+SYSTEM_PROMPT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "advisor_system_prompt.txt")
+system_prompt_cache = None
+
+def load_system_prompt() -> str:
+    """Read the advisor system prompt once per process"""
+    global system_prompt_cache
+    if system_prompt_cache is None:
+        with open(SYSTEM_PROMPT_PATH) as f:
+            system_prompt_cache = f.read()
+    return system_prompt_cache
+
+def get_llm_pool() -> EndpointPool:
+    """Return the process-wide endpoint pool, starting its health checks on first use"""
+    global llm_pool
+    if llm_pool is None:
+        with llm_pool_lock:
+            if llm_pool is None:
+                pool = EndpointPool.from_env(my_api_key)
+                # Re-prime a replica's prefix cache whenever it (re)joins the pool
+                if os.getenv("LLM_WARMUP", "1") != "0":
+                    pool.warmup_messages = [{"role": "system", "content": load_system_prompt()}]
+                llm_pool = pool.start_health_checks()
+    return llm_pool
+
+def get_llm_queue() -> FairQueue:
+    """Return the process-wide fair queue, configured from LLM_MAX_CONCURRENCY and friends"""
+    global llm_queue
+    if llm_queue is None:
+        with llm_pool_lock:
+            if llm_queue is None:
+                llm_queue = FairQueue.from_env()
+    return llm_queue
+
 class LocalLLM:
-    def __init__(self, host_ip, port_num, api_key_str):
-        self.client = openai.Client(base_url=f"http://{host_ip}:{port_num}/v1", api_key=api_key_str)
-        self.model_name = self.client.models.list().data[0].id
+    def __init__(self, host_ip=None, port_num=None, api_key_str=None, pool: EndpointPool = None,
+                 queue: FairQueue = None, caller: str = 'anonymous'):
+        # Either talk to one server directly or route through a shared pool
+        if pool is None:
+            pool = EndpointPool([Endpoint(host_ip, port_num, api_key_str)], health_interval=0)
+        self.pool = pool
+        # Requests wait their turn in `queue` (if any) under the caller's flow
+        self.queue = queue
+        self.caller = caller
+        self.completion_tokens = 0  # Generated by this conversation so far
 
+        self.system_prompt = ""  # pinned first in every request, never rotated out
         self.history = deque(maxlen=20)
         self.facts = set()
         self.summary = ""  # summarized long-term memory
-        print("Model loaded:", self.model_name)
+
+    def set_system_prompt(self, prompt: str):
+        self.system_prompt = prompt
 
     def append_to_history(self, role: str, data: str):
         self.history.append({"role": role, "content": data})
@@ -33,12 +87,27 @@ class LocalLLM:
                 {"role": "user", "content": "Please summarize everything above in 100 words or less."}
             ]
             try:
-                summary_response = self.client.chat.completions.create(
-                    model=self.model_name,
-                    messages=summary_prompt,
-                    temperature=0.3
-                )
-                self.summary = summary_response.choices[0].message.content.strip()
+                ticket = self.queue.acquire(self.caller, 'background') if self.queue else None
+                summary_response = None
+                try:
+                    lease, summary_response = self.pool.create_chat_completion(
+                        messages=summary_prompt,
+                        temperature=0.3
+                    )
+                    summary_error = None
+                    try:
+                        summary = summary_response.choices[0].message.content.strip()
+                    except Exception as e:
+                        summary_error = e
+                        raise
+                    finally:
+                        self.pool.release(lease, summary_error)
+                finally:
+                    if ticket is not None:
+                        if getattr(summary_response, 'usage', None):
+                            ticket.cost = summary_response.usage.completion_tokens or 0
+                        self.queue.release(ticket)
+                self.summary = summary
             except Exception as e:
                 print("Error updating summary:", e)
                 self.summary = ""
@@ -48,60 +117,143 @@ class LocalLLM:
             return ""
         return "The following facts should be kept in mind during this conversation:\n- " + "\n- ".join(sorted(self.facts))
 
-    def get_response(self, message):
-        self.append_to_history("user", message)
-        self.update_summary()
+    def build_messages(self):
+        """
+        Lay out a request so consecutive calls share the longest possible prefix
 
+        Model servers reuse their KV cache for an identical leading run of
+        tokens, so static content goes first (the pinned system prompt, then
+        history in order) and content that changes between calls (summary,
+        facts) goes just before the newest user message.
+        """
         messages = []
-        if self.summary:
-            messages.append({"role": "system", "content": f"Summary of past conversation: {self.summary}"})
+        if self.system_prompt:
+            messages.append({"role": "system", "content": self.system_prompt})
+
+        # Include only the most recent history for clarity
+        recent = list(self.history)[-10:]
+        messages.extend(recent[:-1])
 
+        volatile = []
+        if self.summary:
+            volatile.append(f"Summary of past conversation: {self.summary}")
         fact_prompt = self.generate_fact_prompt()
         if fact_prompt:
-            messages.append({"role": "system", "content": fact_prompt})
+            volatile.append(fact_prompt)
+        if volatile:
+            messages.append({"role": "system", "content": "\n\n".join(volatile)})
 
-        # Include only the most recent history for clarity
-        messages.extend(list(self.history)[-10:])
+        messages.extend(recent[-1:])
+        return messages
+
+    def get_response(self, message, sink: StreamSink = None):
+        # Streamed tokens go to the sink; the default does no per-token I/O
+        if sink is None:
+            sink = default_sink()
+
+        self.append_to_history("user", message)
+        self.update_summary()
+
+        messages = self.build_messages()
+
+        # Timing starts here so time-to-first-token covers queueing and prefill
+        stream_metrics = MetricsSink()
+        sink = MultiSink(sink, stream_metrics)
+
+        # Wait for a slot before leasing an endpoint; QueueFull/QueueTimeout reach the caller
+        ticket = self.queue.acquire(self.caller, 'interactive') if self.queue else None
+        if sink.cancelled:
+            # The client left while this request was queued
+            if ticket is not None:
+                self.queue.release(ticket)
+            return "", ""
 
         try:
-            response_stream = self.client.chat.completions.create(
-                model=self.model_name,
+            lease, response_stream = self.pool.create_chat_completion(
                 messages=messages,
                 temperature=0.5,
                 top_p=0.9,
                 stream=True,
+                # Final chunk carries prompt/completion token counts
+                stream_options={"include_usage": True},
             )
         except Exception as e:
-            print("Error getting response:", e)
+            if ticket is not None:
+                self.queue.release(ticket)
+            metrics.LLM_ERRORS.inc()
+            sink.on_error(e)
             return "", ""
 
-        reasoning = ""
-        answer = ""
-        has_content_started = False
-        has_reason_started = False
-
-        # Process streaming response with error checking
-        for chunk in response_stream:
-            delta = chunk.choices[0].delta
-            # Check if the custom attribute exists (if not, rely on content)
-            if hasattr(delta, 'reasoning_content') and delta.reasoning_content:
-                if not has_reason_started:
-                    has_reason_started = True
-                    print("\n~~~ BEGINNING OF REASONING ~~~")
-                print(delta.reasoning_content, end="")
-                reasoning += delta.reasoning_content
-            elif hasattr(delta, 'content') and delta.content:
-                if not has_content_started:
-                    has_content_started = True
-                    print("\n~~~ END OF REASONING ~~~")
-                    print("\n~~~ BEGINNING OF ANSWER ~~~")
-                print(delta.content, end="")
-                answer += delta.content
-
-        print("\n~~~ END OF ANSWER ~~~")
-        self.append_to_history("assistant", answer)
+        reasoning_parts = []
+        answer_parts = []
+        usage = None
+
+        # Process streaming response with error checking; the endpoint stays leased until it ends
+        stream_error = None
+        cancelled = False
+        try:
+            for chunk in response_stream:
+                if sink.cancelled:
+                    # Stop generating for a client that disconnected; closing the stream aborts the request
+                    cancelled = True
+                    metrics.LLM_CANCELLED.inc()
+                    response_stream.close()
+                    break
+                if getattr(chunk, 'usage', None):
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                # Check if the custom attribute exists (if not, rely on content)
+                if hasattr(delta, 'reasoning_content') and delta.reasoning_content:
+                    sink.on_reasoning(delta.reasoning_content)
+                    reasoning_parts.append(delta.reasoning_content)
+                elif hasattr(delta, 'content') and delta.content:
+                    sink.on_content(delta.content)
+                    answer_parts.append(delta.content)
+        except Exception as e:
+            stream_error = e
+            metrics.LLM_ERRORS.inc()
+            sink.on_error(e)
+            raise
+        finally:
+            self.pool.release(lease, stream_error)
+            if ticket is not None:
+                # Charge the caller's flow for what was actually generated
+                if usage is not None:
+                    ticket.cost = usage.completion_tokens or 0
+                else:
+                    ticket.cost = stream_metrics.reasoning_deltas + stream_metrics.content_deltas
+                self.queue.release(ticket)
+
+        answer = "".join(answer_parts)
+        reasoning = "".join(reasoning_parts)
+        sink.on_finish(answer, reasoning)
+        self.completion_tokens += self.record_stream_metrics(stream_metrics, usage)
+        if not cancelled:
+            self.append_to_history("assistant", answer)
         return answer, reasoning
 
+    def record_stream_metrics(self, stream_metrics: MetricsSink, usage) -> int:
+        """Publish latency and token counts for one finished completion, returning the completion tokens"""
+        metrics.LLM_GENERATION_LATENCY.observe(stream_metrics.finished_at - stream_metrics.start)
+        if stream_metrics.time_to_first_token is None:
+            return 0
+        metrics.LLM_TIME_TO_FIRST_TOKEN.observe(stream_metrics.time_to_first_token)
+
+        if usage is not None:
+            completion_tokens = usage.completion_tokens or 0
+            metrics.LLM_PROMPT_TOKENS.inc(usage.prompt_tokens or 0)
+        else:
+            # Servers that ignore include_usage send roughly one token per delta
+            completion_tokens = stream_metrics.reasoning_deltas + stream_metrics.content_deltas
+        metrics.LLM_COMPLETION_TOKENS.inc(completion_tokens)
+
+        generation_time = stream_metrics.finished_at - stream_metrics.first_token_at
+        if generation_time > 0:
+            metrics.LLM_TOKENS_PER_SECOND.observe(completion_tokens / generation_time)
+        return completion_tokens
+
 def extract_courses(user_input):
     # Define a regular expression pattern:
     # \b - word boundary
@@ -116,31 +268,31 @@ def extract_courses(user_input):
     return courses
 
 # New function for app.py to call
-def process_prompt(prompt_text):
+def process_prompt(prompt_text, sink: StreamSink = None, caller: str = 'anonymous'):
     """
     Process a user prompt with the AI advisor
     
     Args:
         prompt_text: The user's question or request
+        sink: Receives streamed tokens (optional, defaults to stream_sinks.default_sink())
+        caller: Whose turn this is in the fair queue ("user:12", "ip:10.0.0.5")
         
     Returns:
-        dict: A dictionary containing the response, reasoning, and original prompt
+        dict: A dictionary containing the response, reasoning, original prompt and tokens generated
     """
-    # Initialize the AI model
-    llm = LocalLLM("172.30.80.17", 50001, my_api_key)
-    
-    with open("advisor_system_prompt.txt") as f:
-        system_prompt = f.read()
+    # Initialize the AI model on the shared endpoint pool, behind the fair queue
+    llm = LocalLLM(pool=get_llm_pool(), queue=get_llm_queue(), caller=caller)
     
-    # Set up the system prompt
-    llm.append_to_history("system", system_prompt)
+    # Pin the system prompt so it always leads the request (and stays in the server's prefix cache)
+    llm.set_system_prompt(load_system_prompt())
     
     # Get response from the model
-    answer, reasoning = llm.get_response(prompt_text)
+    answer, reasoning = llm.get_response(prompt_text, sink)
     
     # Return the results as a dictionary
     return {
         'response': answer,
         'reasoning': reasoning,
-        'original_prompt': prompt_text
+        'original_prompt': prompt_text,
+        'completion_tokens': llm.completion_tokens
     }
\ No newline at end of file
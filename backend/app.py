@@ -1,16 +1,36 @@
-from flask import Flask, request, jsonify, session
+from flask import Flask, request, jsonify, session, Response, stream_with_context, g, send_file
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy # type: ignore
+from sqlalchemy import event, inspect as sa_inspect
 import os
 import hashlib
+import hmac
+import random
+import uuid
 import functools
+import io
+import math
+import json
+import threading
+import time
 from datetime import datetime
 
 import subprocess
 import os
 # from ocr_search import ocr_pdf, CourseAnalyzer
 
-from ai import LocalLLM, my_api_key, process_prompt
+from ai import LocalLLM, my_api_key, process_prompt, get_llm_pool, get_llm_queue
+from fair_queue import QueueFull, QueueTimeout
+from rate_limit import RateLimiter
+from intent_router import route_prompt
+from catalog_registry import CatalogRegistry
+from transcript_index import ensure_transcript_index, index_transcript, rebuild_transcript_index, search_transcripts
+from transcript_analysis import TranscriptAnalysis
+from user_sync import UserImporter, export_users, read_lines
+from stream_sinks import SSESink
+import metrics
+from profiler import SamplingProfiler, ProfileStore, PROFILE_ID_PATTERN
+from photo_store import PhotoStore, ThumbnailWorker, InvalidPhoto, MAX_PHOTO_BYTES, variant_mimetype
 
 app = Flask(__name__)
 app.secret_key = 'your-secret-key'  # Used for sessions
@@ -20,8 +40,8 @@ CORS(app, supports_credentials=True)  # Enable credentials for sessions
 db_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'db')
 os.makedirs(db_dir, exist_ok=True)
 
-# Database configuration for SQLite
-db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'db', 'database.sqlite')
+# Database configuration for SQLite (DATABASE_PATH points benchmarks and tests at a scratch file)
+db_path = os.getenv('DATABASE_PATH') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'db', 'database.sqlite')
 app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db = SQLAlchemy(app)
@@ -40,6 +60,21 @@ class User(db.Model):
     current_semester = db.Column(db.Integer, default=1)
     transcript = db.Column(db.Text, default='')
     profile_photo = db.Column(db.String(500), default='/default-profile.jpg') 
+
+# Per-segment analysis of each user's saved transcript, patched on every edit
+class TranscriptAnalysisState(db.Model):
+    __tablename__ = 'transcript_analysis'
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    state = db.Column(db.Text, default='')
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+# Degree progress shown by DegreeProgress.tsx, recomputed only when its inputs change
+class DegreeProgressSnapshot(db.Model):
+    __tablename__ = 'degree_progress'
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    requirements_version = db.Column(db.String(32))
+    payload = db.Column(db.Text, default='')
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
 # Add this function to detect database changes and recreate if needed
 def recreate_database():
@@ -64,11 +99,119 @@ def recreate_database():
             print("Creating new database...")
             db.create_all()
 
-# Move the recreate_database() call inside the app context
-with app.app_context():
-    db.create_all()
-    recreate_database()
+def init_database():
+    """
+    One-time schema checks and backfills
+
+    Run once per deployment start (by wsgi.py in the gunicorn master, or by
+    the dev server below) rather than on every import.
+    """
+    with app.app_context():
+        db.create_all()
+        recreate_database()
+        # Cross-user transcript search index, backfilled once when first created
+        if ensure_transcript_index(db.session):
+            indexed = rebuild_transcript_index(db.session, db.session.query(User.id, User.transcript).all())
+            print(f"[INFO] Indexed {indexed} transcripts for search")
+        db.session.commit()
+        db.session.remove()
+        # Forked workers must open their own SQLite connections
+        db.engine.dispose()
     
+# Time every SQL statement issued through SQLAlchemy
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_start'].pop()
+    statement_type = statement.lstrip().split(' ', 1)[0].upper()
+    metrics.SQL_LATENCY.labels(statement_type).observe(elapsed)
+
+with app.app_context():
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    event.listen(db.engine, 'after_cursor_execute', after_cursor_execute)
+
+# Request latency, labelled by route pattern so ids don't explode the label set
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_latency(response):
+    start = g.pop('request_start', None)
+    if start is not None:
+        endpoint = request.url_rule.rule if request.url_rule else '<unmatched>'
+        metrics.REQUEST_LATENCY.labels(request.method, endpoint, response.status_code).observe(
+            time.perf_counter() - start)
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus scrape endpoint"""
+    return Response(metrics.render_metrics(), mimetype='text/plain; version=0.0.4')
+
+# On-demand request profiling: send X-Profile with the admin token, or set
+# PROFILE_SAMPLE_RATE (0.0-1.0) to capture a random share of traffic
+profile_store = ProfileStore()
+profile_sample_rate = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+
+def should_profile():
+    admin_token = os.getenv('ADMIN_TOKEN')
+    requested = request.headers.get('X-Profile')
+    if requested and admin_token and hmac.compare_digest(requested, admin_token):
+        return True
+    return profile_sample_rate > 0 and random.random() < profile_sample_rate
+
+@app.before_request
+def start_profiler():
+    if should_profile():
+        # The id names the capture file, so a client id that isn't a safe file name is replaced
+        request_id = request.headers.get('X-Request-ID', '')
+        g.request_id = request_id if PROFILE_ID_PATTERN.match(request_id) else uuid.uuid4().hex
+        g.profiler = SamplingProfiler().start()
+
+@app.after_request
+def save_profile(response):
+    profiler = g.pop('profiler', None)
+    if profiler is None:
+        return response
+    profile_id = g.request_id
+    meta = {'method': request.method, 'path': request.path, 'status': response.status_code}
+
+    def finish():
+        profiler.stop()
+        return profile_store.save(profile_id, profiler, meta)
+
+    if response.is_streamed:
+        # The body is generated after this hook returns; keep sampling until the server closes the response
+        response.call_on_close(finish)
+        response.headers['X-Profile-Id'] = profile_id
+    elif finish():
+        response.headers['X-Profile-Id'] = profile_id
+    return response
+
+def start_worker():
+    """
+    Per-process startup, run after fork (threads started before a fork don't survive it)
+
+    Connects to the model servers now so health checks prime their prefix
+    caches before traffic arrives, starts watching the catalog files and,
+    under gunicorn, starts publishing this worker's metrics for /metrics.
+    """
+    if os.getenv('LLM_WARMUP', '1') != '0':
+        get_llm_pool()
+    catalog_registry.start()
+    metrics.start_flusher()
+
+# Catalog search index, planner and cohort matrices, rebuilt in the background when courses.json or
+# requirementsDB.json change; handlers read catalog_registry.current once and use that snapshot throughout.
+# Memory-mapped course embeddings are included if built offline (python course_embeddings.py build).
+catalog_registry = CatalogRegistry()
+
+# Uploaded profile photos and the thread that renders their thumbnails
+photo_store = PhotoStore()
+thumbnail_worker = ThumbnailWorker(photo_store)
+
 # Simple password hashing function
 def hash_password(password):
     return hashlib.sha256(password.encode()).hexdigest()
@@ -82,6 +225,107 @@ def auth_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+# Admin middleware - token from the ADMIN_TOKEN environment variable
+def admin_required(f):
+    @functools.wraps(f)
+    def decorated_function(*args, **kwargs):
+        admin_token = os.getenv('ADMIN_TOKEN')
+        if not admin_token or not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), admin_token):
+            return jsonify({'error': 'Admin access required'}), 403
+        return f(*args, **kwargs)
+    return decorated_function
+
+@app.route('/api/profiles', methods=['GET'])
+@admin_required
+def list_profiles():
+    """List stored request profiles, newest first"""
+    return jsonify({'profiles': profile_store.list()})
+
+@app.route('/api/profiles/<profile_id>', methods=['GET'])
+@admin_required
+def download_profile(profile_id):
+    """Download a capture as collapsed stacks (flamegraph.pl / speedscope input)"""
+    path = profile_store.path(profile_id, 'folded')
+    if path is None or not os.path.exists(path):
+        return jsonify({'error': 'Profile not found'}), 404
+    return send_file(path, mimetype='text/plain', as_attachment=True, download_name=f'{profile_id}.folded')
+
+def refresh_transcript_analysis(user):
+    """Re-analyze only the changed parts of a user's transcript (caller commits)"""
+    record = db.session.get(TranscriptAnalysisState, user.id) or TranscriptAnalysisState(user_id=user.id)
+    analysis = TranscriptAnalysis.from_json(record.state)
+    changes = analysis.update(user.transcript or '')
+    record.state = analysis.to_json()
+    db.session.add(record)
+    return analysis, changes
+
+def analysis_from_state(state, transcript):
+    """A stored analysis, or the transcript analyzed from scratch if it was saved before analysis was tracked"""
+    if state:
+        return TranscriptAnalysis.from_json(state)
+    analysis = TranscriptAnalysis()
+    analysis.update(transcript or '')
+    return analysis
+
+def stored_transcript_analysis(user):
+    """A user's transcript analysis, including one added earlier in this session and not yet flushed"""
+    record = db.session.get(TranscriptAnalysisState, user.id) or next(
+        (o for o in db.session.new if isinstance(o, TranscriptAnalysisState) and o.user_id == user.id), None)
+    return analysis_from_state(record.state if record is not None else None, user.transcript)
+
+def refresh_progress_snapshot(user, reason):
+    """Recompute a user's degree progress snapshot from the transcript analysis (caller commits)"""
+    analysis = stored_transcript_analysis(user)
+    planner = catalog_registry.current.planner
+    requirements = planner.progress(analysis.completed_courses, user.emphasis)
+    snapshot = db.session.get(DegreeProgressSnapshot, user.id) or DegreeProgressSnapshot(user_id=user.id)
+    snapshot.requirements_version = planner.version
+    snapshot.payload = json.dumps({
+        'major': user.major,
+        'emphasis': user.emphasis,
+        'requirements_version': planner.version,
+        'completed_courses': analysis.completed_courses,
+        'credits_completed': analysis.earned,
+        'gpa': analysis.gpa,
+        'requirements_satisfied': sum(r['satisfied'] for r in requirements),
+        'requirements_total': len(requirements),
+        'requirements': requirements,
+        'updated_at': datetime.utcnow().isoformat() + 'Z',
+    })
+    db.session.add(snapshot)
+    metrics.PROGRESS_REFRESHES.labels(reason).inc()
+    return snapshot
+
+# Fields the progress snapshot is derived from
+PROGRESS_FIELDS = ('transcript', 'major', 'emphasis')
+
+@event.listens_for(db.session, 'before_flush')
+def track_progress_inputs(flush_session, flush_context, instances):
+    """Remember users being created, and users whose transcript, major or emphasis is being written"""
+    stale = flush_session.info.setdefault('progress_stale', {})
+    for obj in flush_session.new:
+        if isinstance(obj, User):
+            stale.setdefault(obj, 'new')
+    for obj in flush_session.dirty:
+        if not isinstance(obj, User):
+            continue
+        state = sa_inspect(obj)
+        changed = [f for f in PROGRESS_FIELDS if state.attrs[f].history.has_changes()]
+        if changed:
+            stale.setdefault(obj, changed[0])
+
+@event.listens_for(db.session, 'before_commit')
+def refresh_stale_progress(commit_session):
+    """Recompute the remembered users' snapshots in the same transaction (after any autoflush
+    triggered mid-request, so the transcript analysis is already up to date)"""
+    commit_session.flush()  # Commit flushes after this hook; surface pending user changes first
+    for user, reason in commit_session.info.pop('progress_stale', {}).items():
+        refresh_progress_snapshot(user, reason)
+
+@event.listens_for(db.session, 'after_rollback')
+def forget_stale_progress(rollback_session):
+    rollback_session.info.pop('progress_stale', None)
+
 # Authentication routes
 @app.route('/api/auth/register', methods=['POST'])
 def register():
@@ -119,6 +363,10 @@ def register():
     
     try:
         db.session.add(user)
+        db.session.flush()  # Assigns user.id for the search index
+        if user.transcript:
+            index_transcript(db.session, user.id, user.transcript)
+            refresh_transcript_analysis(user)
         db.session.commit()
         
         # Set user in session
@@ -265,6 +513,13 @@ def create_or_update_user():
         user.current_semester = data['current_semester']
     if 'transcript' in data:
         user.transcript = data['transcript']
+        # Re-index in the same transaction so search never sees a half-applied update
+        index_transcript(db.session, user.id, user.transcript)
+        analysis, changes = refresh_transcript_analysis(user)
+        # The transcript's GPA is returned with the analysis; it only fills in a GPA the user never set
+        changes['gpa'] = gpa = analysis.gpa
+        if 'gpa' not in data and gpa and not user.gpa:
+            user.gpa = gpa.get('Cumulative GPA', gpa.get('GPA', user.gpa))
     if 'firstName' in data:
         user.first_name = data['firstName']
     if 'lastName' in data:
@@ -274,26 +529,329 @@ def create_or_update_user():
     
     try:
         db.session.commit()
-        return jsonify({
+        response = {
             "message": "User data saved successfully",
             "id": user.id
-        })
+        }
+        if 'transcript' in data:
+            response['analysis'] = changes
+        return jsonify(response)
     except Exception as e:
         db.session.rollback()
         print(e)
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/users/bulk', methods=['POST'])
+@admin_required
+def import_users():
+    """
+    Create or update users from an NDJSON body (one user per line, keyed by email)
+
+    Records use the /api/users field names plus "password" (hashed here) or
+    "password_hash"; fields a record leaves out are not changed. ?chunk_size
+    sets records per transaction.
+    """
+    chunk_size = max(1, min(request.args.get('chunk_size', 1000, type=int), 10000))
+    importer = UserImporter(db.session, User.__table__, hash_password, chunk_size)
+    # The body is read line by line, so its size doesn't matter (buffered: the raw stream reads a line slowly);
+    # a line over BULK_MAX_LINE_BYTES is skipped and reported rather than read whole
+    report = importer.run(read_lines(io.BufferedReader(request.stream, 1 << 16)))
+    return jsonify(report), 200 if not report['failed'] else 207
+
+@app.route('/api/users/bulk', methods=['GET'])
+@admin_required
+def export_all_users():
+    """Stream every user as NDJSON (?transcripts=0 to leave transcripts out, ?password_hash=1 to include them)"""
+    lines = export_users(db.session, User.__table__,
+                         include_transcripts=request.args.get('transcripts', '1') != '0',
+                         include_password_hash=request.args.get('password_hash') == '1')
+    return Response(stream_with_context(lines), mimetype='application/x-ndjson',
+                    headers={'Content-Disposition': 'attachment; filename=users.ndjson'})
+
+@app.route('/api/users/photo', methods=['POST'])
+@auth_required
+def upload_profile_photo():
+    """Store an uploaded profile photo (multipart field "photo") and point the user at its thumbnails"""
+    user = User.query.get(session['user_id'])
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+    if request.content_length and request.content_length > MAX_PHOTO_BYTES + 64 * 1024:
+        return jsonify({"error": "Photo is too large"}), 413
+    upload = request.files.get('photo')
+    if upload is None:
+        return jsonify({"error": "No photo uploaded"}), 400
+
+    try:
+        photo = photo_store.save_original(upload.read(MAX_PHOTO_BYTES + 1))
+    except InvalidPhoto as e:
+        return jsonify({"error": str(e)}), 400
+    except ImportError:
+        return jsonify({"error": "Pillow is not installed"}), 503
+    thumbnail_worker.submit(photo)
+
+    urls = photo_store.urls(photo)
+    user.profile_photo = urls['webp'][256]
+    db.session.commit()
+    return jsonify({"profile_photo": user.profile_photo, "photos": urls}), 201
+
+@app.route('/api/photos/<name>', methods=['GET'])
+def get_photo(name):
+    """Serve a photo thumbnail; names are content hashes, so responses never change"""
+    try:
+        path = photo_store.variant_path(name)
+    except ImportError:
+        return jsonify({'error': 'Pillow is not installed'}), 503
+    if path is None:
+        return jsonify({'error': 'Photo not found'}), 404
+    # conditional=True answers If-None-Match and Range requests (206) from the file
+    response = send_file(path, mimetype=variant_mimetype(name), conditional=True, max_age=31536000)
+    response.cache_control.immutable = True
+    return response
+
+# Prompt budgets: logged-in users are limited per account, anonymous clients per IP (more tightly)
+user_prompt_limiter = RateLimiter.from_env('PROMPT_USER', requests_per_minute=20, tokens_per_minute=20000)
+ip_prompt_limiter = RateLimiter.from_env('PROMPT_IP', requests_per_minute=10, tokens_per_minute=8000)
+
+def prompt_caller():
+    """Rate-limit and fair-queue identity of the current request, with its limiter"""
+    if 'user_id' in session:
+        return f"user:{session['user_id']}", user_prompt_limiter
+    return f"ip:{request.remote_addr}", ip_prompt_limiter
+
+def retry_response(error, wait, status):
+    response = jsonify({'error': error, 'retry_after': math.ceil(wait)})
+    response.status_code = status
+    response.headers['Retry-After'] = str(math.ceil(wait))
+    return response
+
+def prompt_rate_limited(f):
+    """Refuse prompts from callers over their request or generated-token budget"""
+    @functools.wraps(f)
+    def decorated_function(*args, **kwargs):
+        g.caller, g.prompt_limiter = prompt_caller()
+        wait = g.prompt_limiter.check(g.caller)
+        if wait:
+            return retry_response('Rate limit exceeded', wait, 429)
+        return f(*args, **kwargs)
+    return decorated_function
+
 @app.route('/api/prompt', methods=['POST'])
+@prompt_rate_limited
 def promptLLM():
     data = request.json
     prompt_text = data.get('prompt', '')
     
-    # Call the AI processing function from ai.py
-    result = process_prompt(prompt_text)
+    # Catalog lookups (prerequisites, credits, ...) are answered without the LLM
+    result = route_prompt(prompt_text, catalog_registry.current.catalog)
+    if result is None:
+        # Call the AI processing function from ai.py
+        try:
+            result = process_prompt(prompt_text, caller=g.caller)
+        except QueueFull:
+            return retry_response('Too many requests in progress', 1, 429)
+        except QueueTimeout:
+            return retry_response('Advisor is busy, try again shortly', 5, 503)
+        g.prompt_limiter.charge(g.caller, result['completion_tokens'])
     
     # Return the response
     return jsonify(result)
 
+@app.route('/api/prompt/stream', methods=['POST'])
+@prompt_rate_limited
+def streamPromptLLM():
+    """Stream the advisor's reasoning and answer as Server-Sent Events"""
+    data = request.json
+    prompt_text = data.get('prompt', '')
+    sink = SSESink()
+
+    routed = route_prompt(prompt_text, catalog_registry.current.catalog)
+    if routed is not None:
+        sink.on_content(routed['response'])
+        sink.on_finish(routed['response'], '')
+        return Response(sink.events(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+    caller, limiter = g.caller, g.prompt_limiter
+
+    def run():
+        try:
+            result = process_prompt(prompt_text, sink, caller=caller)
+            limiter.charge(caller, result['completion_tokens'])
+        except Exception as e:
+            # get_response reports stream errors itself; this covers setup failures
+            if not sink.closed:
+                sink.on_error(e)
+
+    threading.Thread(target=run, daemon=True).start()
+    return Response(stream_with_context(sink.events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+# Catalog routes
+def catalog_response(payload, catalog):
+    """Return catalog data with an ETag tied to the catalog it was read from"""
+    etag = catalog.etag
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        response = jsonify(payload)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'public, max-age=300'
+    return response
+
+@app.route('/api/catalog/search', methods=['GET'])
+def search_catalog():
+    """Ranked full-text search over the course catalog"""
+    query = request.args.get('q', '')
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 20, type=int)
+    catalog = catalog_registry.current.catalog
+    return catalog_response(catalog.search(query, page, per_page), catalog)
+
+@app.route('/api/catalog/autocomplete', methods=['GET'])
+def autocomplete_catalog():
+    """Prefix completion of course names"""
+    prefix = request.args.get('prefix', '')
+    limit = request.args.get('limit', 10, type=int)
+    catalog = catalog_registry.current.catalog
+    return catalog_response({'prefix': prefix, 'suggestions': catalog.autocomplete(prefix, limit)}, catalog)
+
+@app.route('/api/catalog/semantic', methods=['GET'])
+def semantic_search_catalog():
+    """Courses closest in meaning to a plain-language query (?q=something with data and statistics)"""
+    semantic_search = catalog_registry.current.semantic_search
+    if semantic_search is None:
+        return jsonify({'error': 'Semantic index not built'}), 503
+    query = request.args.get('q', '')
+    k = request.args.get('k', 10, type=int)
+    try:
+        return jsonify(semantic_search.search(query, k))
+    except ImportError:
+        return jsonify({'error': 'sentence-transformers is not installed'}), 503
+
+@app.route('/api/catalog/courses/<course_id>', methods=['GET'])
+def get_catalog_course(course_id):
+    """Get a single catalog course by name or ID"""
+    catalog = catalog_registry.current.catalog
+    course = catalog.get(course_id)
+    if not course:
+        return jsonify({'error': 'Course not found'}), 404
+    return catalog_response(course, catalog)
+
+@app.route('/api/catalog/version', methods=['GET'])
+def get_catalog_version():
+    """Version and content hashes of the catalog and requirements currently served"""
+    return jsonify(catalog_registry.current.describe())
+
+@app.route('/api/plan', methods=['GET'])
+@auth_required
+def get_degree_plan():
+    """Semester-by-semester plan for the authenticated user's remaining requirements"""
+    user = User.query.get(session['user_id'])
+
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+
+    max_credits = max(1, min(request.args.get('max_credits', 15, type=int), 24))
+    emphasis = request.args.get('emphasis') or user.emphasis
+    plan = catalog_registry.current.planner.plan(
+        stored_transcript_analysis(user).completed_courses,
+        emphasis=emphasis,
+        current_semester=user.current_semester or 1,
+        max_credits=max_credits
+    )
+    return jsonify(plan)
+
+@app.route('/api/transcript/analysis', methods=['GET'])
+@auth_required
+def get_transcript_analysis():
+    """Completed courses and GPA parsed from the current user's saved transcript"""
+    user = User.query.get(session['user_id'])
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+
+    record = db.session.get(TranscriptAnalysisState, user.id)
+    if record is None:
+        # Saved before analysis was tracked; analyze once and keep the result
+        if not user.transcript:
+            return jsonify(TranscriptAnalysis().summary())
+        analysis, _ = refresh_transcript_analysis(user)
+        db.session.commit()
+    else:
+        analysis = TranscriptAnalysis.from_json(record.state)
+    return jsonify(analysis.summary())
+
+@app.route('/api/progress', methods=['GET'])
+@auth_required
+def get_degree_progress():
+    """Requirement coverage, credits and GPA for the current user, served from the stored snapshot"""
+    snapshot = db.session.get(DegreeProgressSnapshot, session['user_id'])
+    if snapshot is None or snapshot.requirements_version != catalog_registry.current.planner.version:
+        user = User.query.get(session['user_id'])
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        snapshot = refresh_progress_snapshot(user, 'missing' if snapshot is None else 'requirements')
+        db.session.commit()
+    return Response(snapshot.payload, mimetype='application/json')
+
+def load_cohort(cohort_index):
+    """All users' ids plus their completed-course matrix"""
+    rows = db.session.query(User.id, User.transcript, TranscriptAnalysisState.state).outerjoin(
+        TranscriptAnalysisState, TranscriptAnalysisState.user_id == User.id).all()
+    return [row.id for row in rows], cohort_index.student_matrix(
+        analysis_from_state(row.state, row.transcript).completed_courses for row in rows)
+
+@app.route('/api/cohort/eligible', methods=['GET'])
+@admin_required
+def get_cohort_eligible():
+    """Students whose completed courses satisfy a course's prerequisites"""
+    current = catalog_registry.current
+    course = current.catalog.get(request.args.get('course', ''))
+    if course is None:
+        return jsonify({'error': 'Unknown course'}), 404
+
+    user_ids, completed = load_cohort(current.cohort_index)
+    eligible = current.cohort_index.eligible_for(completed, course['id'])
+    return jsonify({
+        'course': course['id'],
+        'total_students': len(user_ids),
+        'eligible_count': int(eligible.sum()),
+        'eligible': [user_ids[i] for i in eligible.nonzero()[0]]
+    })
+
+@app.route('/api/cohort/coverage', methods=['GET'])
+@admin_required
+def get_cohort_coverage():
+    """How many students have met each degree requirement group"""
+    cohort_index = catalog_registry.current.cohort_index
+    user_ids, completed = load_cohort(cohort_index)
+    return jsonify({
+        'total_students': len(user_ids),
+        'requirements': cohort_index.coverage_summary(completed)
+    })
+
+@app.route('/api/transcripts/search', methods=['GET'])
+@admin_required
+def search_all_transcripts():
+    """Search every stored transcript, e.g. ?course=PHYS 211&grade=C or ?q="data structures" calc*"""
+    result = search_transcripts(
+        db.session,
+        query=request.args.get('q', ''),
+        course=request.args.get('course', ''),
+        grade=request.args.get('grade', ''),
+        page=request.args.get('page', 1, type=int),
+        per_page=request.args.get('per_page', 20, type=int)
+    )
+    user_ids = {r['user_id'] for r in result['results']}
+    names = {u.id: f"{u.first_name} {u.last_name}" for u in User.query.filter(User.id.in_(user_ids))} if user_ids else {}
+    for r in result['results']:
+        r['name'] = names.get(r['user_id'])
+    return jsonify(result)
+
+@app.route('/api/llm/endpoints', methods=['GET'])
+@admin_required
+def get_llm_endpoints():
+    """Health, circuit state and load of each model endpoint, plus the fair queue in front of them"""
+    return jsonify({'endpoints': get_llm_pool().status(), 'queue': get_llm_queue().status()})
+
 # Route to handle file uploading and AI processing of the uploaded PDF, first through ocr in the ocr_search.py file and then take that txt output and put that through the AI model
 # @app.route('/api/upload', methods=['GET'])
 # def upload():
@@ -367,4 +925,7 @@ def promptLLM():
 #         }), 500
 
 if __name__ == '__main__':
-    app.run(debug=True, port=5000)
\ No newline at end of file
+    # Development server; production runs gunicorn -c gunicorn.conf.py (see wsgi.py)
+    init_database()
+    start_worker()
+    app.run(debug=True, port=5000)
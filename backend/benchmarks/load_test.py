@@ -0,0 +1,174 @@
+"""
+Open-loop load generator for the advisor endpoints
+
+Sends requests at a fixed target rate (independent of how fast responses
+come back, so queueing shows up as latency) and reports p50/p95/p99 total
+latency and time to first token.
+
+Typical offline setup, from backend/:
+    python mock_llm_server.py --port 50001 --ttft 0.3 --tokens-per-second 40 &
+    LLM_HOST=127.0.0.1 LLM_PORT=50001 \
+        PROMPT_IP_REQUESTS_PER_MINUTE=1000000 PROMPT_IP_TOKENS_PER_MINUTE=1000000000 python app.py &
+    python benchmarks/load_test.py --url http://127.0.0.1:5000 --rps 4 --duration 60
+
+Every request comes from one IP, which the app limits to 10 prompts a
+minute by default; raise PROMPT_IP_REQUESTS_PER_MINUTE and
+PROMPT_IP_TOKENS_PER_MINUTE (PROMPT_USER_* for logged-in sessions) on the
+server, or the run measures 429s. Only a 200 response without an error
+event counts as completed; everything else is reported as an error, by
+status.
+
+With --stream, requests go to /api/prompt/stream and TTFT is the arrival
+of the first reasoning/content event; otherwise /api/prompt is used and
+TTFT equals total latency.
+"""
+import json
+import math
+import time
+import argparse
+import threading
+import http.client
+from collections import Counter
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+
+
+def percentile(values, pct: float) -> float:
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return float('nan')
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def send_prompt(url: str, prompt: str, stream: bool, timeout: float) -> dict:
+    """
+    Send one advisor request and time it
+
+    Returns:
+        Dictionary with ok flag (200 and no error event), HTTP status, total latency and TTFT in seconds
+    """
+    parsed = urlparse(url)
+    path = '/api/prompt/stream' if stream else '/api/prompt'
+    body = json.dumps({'prompt': prompt})
+    start = time.perf_counter()
+    ttft = None
+    failed = False
+    try:
+        conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=timeout)
+        conn.request('POST', path, body=body, headers={'Content-Type': 'application/json'})
+        response = conn.getresponse()
+        if stream:
+            # Read line by line so the first token event is timed on arrival
+            while True:
+                line = response.fp.readline()
+                if not line:
+                    break
+                if ttft is None and line.strip() in (b'event: reasoning', b'event: content'):
+                    ttft = time.perf_counter() - start
+                elif line.strip() == b'event: error':
+                    failed = True
+        else:
+            response.read()
+        latency = time.perf_counter() - start
+        conn.close()
+        return {
+            'ok': response.status == 200 and not failed,
+            'status': response.status,
+            'latency': latency,
+            'ttft': ttft if ttft is not None else latency,
+        }
+    except Exception as e:
+        return {'ok': False, 'status': None, 'latency': time.perf_counter() - start, 'ttft': None, 'error': str(e)}
+
+
+def run_load(url: str, rps: float, duration: float, stream: bool, prompt: str,
+             max_in_flight: int, timeout: float) -> dict:
+    """
+    Drive the app at a fixed arrival rate
+
+    Args:
+        url: Base URL of the Flask app
+        rps: Target requests per second
+        duration: Seconds to keep sending
+        stream: Use the SSE endpoint and measure TTFT
+        prompt: Prompt text
+        max_in_flight: Worker threads (caps concurrency on the client side)
+        timeout: Per-request timeout in seconds
+
+    Returns:
+        Summary dictionary
+    """
+    results = []
+    lock = threading.Lock()
+
+    def worker():
+        result = send_prompt(url, prompt, stream, timeout)
+        with lock:
+            results.append(result)
+
+    interval = 1.0 / rps
+    sent = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        while True:
+            next_send = start + sent * interval
+            if next_send - start >= duration:
+                break
+            delay = next_send - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(worker)
+            sent += 1
+    elapsed = time.perf_counter() - start
+
+    ok = [r for r in results if r['ok']]
+    latencies = [r['latency'] for r in ok]
+    ttfts = [r['ttft'] for r in ok if r['ttft'] is not None]
+    return {
+        'target_rps': rps,
+        'sent': sent,
+        'completed': len(ok),
+        'errors': len(results) - len(ok),
+        'error_statuses': dict(Counter(str(r['status']) for r in results if not r['ok'])),
+        'achieved_rps': len(ok) / elapsed if elapsed > 0 else 0.0,
+        'latency': {f'p{p}': percentile(latencies, p) for p in (50, 95, 99)},
+        'ttft': {f'p{p}': percentile(ttfts, p) for p in (50, 95, 99)},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the advisor endpoints at a target request rate")
+    parser.add_argument('--url', default="http://127.0.0.1:5000", help="Base URL of the Flask app")
+    parser.add_argument('--rps', type=float, default=2.0, help="Target requests per second")
+    parser.add_argument('--duration', type=float, default=30.0, help="Seconds to send requests for")
+    parser.add_argument('--stream', action='store_true', help="Use /api/prompt/stream and measure TTFT")
+    parser.add_argument('--prompt', default="Which courses should I take next semester?")
+    parser.add_argument('--max-in-flight', type=int, default=256, help="Maximum concurrent client requests")
+    parser.add_argument('--timeout', type=float, default=300.0, help="Per-request timeout (seconds)")
+    parser.add_argument('-o', '--output', help="Write the summary as JSON to this file")
+    args = parser.parse_args()
+
+    print(f"[INFO] Sending {args.rps} req/s for {args.duration:.0f}s to {args.url}")
+    summary = run_load(args.url, args.rps, args.duration, args.stream, args.prompt,
+                       args.max_in_flight, args.timeout)
+
+    print(f"\nSent {summary['sent']}, completed {summary['completed']}, errors {summary['errors']}, "
+          f"achieved {summary['achieved_rps']:.2f} req/s")
+    if summary['errors']:
+        print(f"[WARNING] Errors by status: {summary['error_statuses']}"
+              + (" (429: raise the server's PROMPT_IP_* limits)" if '429' in summary['error_statuses'] else ""))
+    for label in ('latency', 'ttft'):
+        values = summary[label]
+        print(f"  {label:<8} p50 {values['p50'] * 1000:9.1f}ms   p95 {values['p95'] * 1000:9.1f}ms   "
+              f"p99 {values['p99'] * 1000:9.1f}ms")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        print(f"[INFO] Summary saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+"""
+Benchmarks for the transcript analysis and advisor hot paths
+
+Run from backend/:
+    python benchmarks/run_benchmarks.py                       # run and save results
+    python benchmarks/run_benchmarks.py --sizes 100 1000 10000 100000
+    python benchmarks/run_benchmarks.py --save-baseline       # accept current numbers as the baseline
+    python benchmarks/run_benchmarks.py --compare             # also compare to the baseline
+
+Results are written as JSON, with the machine they were measured on. With
+--compare, any benchmark whose median is more than --threshold slower than
+the stored baseline is reported and makes the script exit non-zero.
+Absolute timings only mean something on the same hardware, so a baseline
+from a different machine (benchmarks/baseline.json comes from the reference
+machine) is not compared; re-save it on yours first. --prompt runs against a scratch database in a
+temporary directory, never backend/db/database.sqlite, with the prompt
+rate limits (PROMPT_IP_* and PROMPT_USER_* REQUESTS_PER_MINUTE and
+TOKENS_PER_MINUTE) raised unless they are already set; any non-200
+response is counted as an error and fails the run.
+"""
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import platform
+import copy
+import tempfile
+import statistics
+from datetime import datetime, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from synthetic import synthetic_requirements, synthetic_catalog, synthetic_transcript, write_json
+
+DEFAULT_RESULTS = os.path.join(BENCH_DIR, 'results', 'latest.json')
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+SAMPLE_PDF = os.path.join(BACKEND_DIR, 'OfficialTranscript.pdf')
+
+
+def measure(fn, runs: int, setup=None) -> dict:
+    """
+    Time fn() several times
+
+    Args:
+        fn: Callable to time; receives setup()'s return value if setup is given
+        runs: Number of timed runs
+        setup: Untimed callable run before every call
+
+    Returns:
+        Dictionary of min/median/mean seconds
+    """
+    times = []
+    for _ in range(runs):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        fn(arg) if setup else fn()
+        times.append(time.perf_counter() - start)
+    return {
+        'runs': runs,
+        'min': min(times),
+        'median': statistics.median(times),
+        'mean': statistics.fmean(times),
+    }
+
+
+def bench_course_analyzer(sizes, max_quadratic, runs, tmp_dir):
+    """CourseAnalyzer.load_requirements, extract_courses_from_text and analyze_course_relationships"""
+    from ocr_search import CourseAnalyzer
+    from course_matcher import CourseMatcher
+
+    results = []
+    for size in sizes:
+        path = os.path.join(tmp_dir, f'requirements_{size}.json')
+        write_json(synthetic_requirements(size), path)
+
+        stats = measure(lambda: CourseAnalyzer(requirements_json=path, verbose=False), runs)
+        results.append(dict(name='load_requirements', size=size, **stats))
+
+        # Match against a synthetic catalog of the same size, built once outside the timer;
+        # every run starts from a fresh analyzer and a cold match cache
+        catalog = synthetic_catalog(size)
+        catalog_path = os.path.join(tmp_dir, f'courses_{size}.json')
+        write_json(catalog, catalog_path)
+        analyzer = CourseAnalyzer(verbose=False)
+        analyzer.course_matcher = CourseMatcher.from_catalog(catalog_path)
+        transcript = synthetic_transcript(courses=min(size, 10000), course_names=[c['name'] for c in catalog])
+
+        def fresh_analyzer():
+            analyzer.course_matcher.match.cache_clear()
+            return copy.deepcopy(analyzer)
+
+        stats = measure(lambda a: a.extract_courses_from_text(transcript), runs, setup=fresh_analyzer)
+        results.append(dict(name='extract_courses_from_text', size=min(size, 10000), **stats))
+
+        if size > max_quadratic:
+            print(f"[INFO] Skipping analyze_course_relationships at {size} courses (--max-quadratic {max_quadratic})")
+            continue
+        analyzer = CourseAnalyzer(requirements_json=path, verbose=False)
+        analyzer.completed_courses = set(list(analyzer.all_courses)[::3])
+        stats = measure(analyzer.analyze_course_relationships, runs)
+        results.append(dict(name='analyze_course_relationships', size=size, **stats))
+    return results
+
+
+def bench_catalog(sizes, runs, tmp_dir):
+    """CourseCatalog search/autocomplete latency per query"""
+    from catalog import CourseCatalog
+
+    results = []
+    queries = 200
+    for size in sizes:
+        path = os.path.join(tmp_dir, f'courses_{size}.json')
+        write_json(synthetic_catalog(size), path)
+        catalog = CourseCatalog(path)
+        prefixes = [c['name'][:6] for c in catalog.courses[:queries]]
+
+        stats = measure(lambda: [catalog.search(f"topic {i}") for i in range(queries)], runs)
+        results.append(dict(name='catalog_search_per_query', size=size,
+                            **{k: (v / queries if k != 'runs' else v) for k, v in stats.items()}))
+        stats = measure(lambda: [catalog.autocomplete(p) for p in prefixes], runs)
+        results.append(dict(name='catalog_autocomplete_per_query', size=size,
+                            **{k: (v / len(prefixes) if k != 'runs' else v) for k, v in stats.items()}))
+    return results
+
+
+def bench_ocr(runs):
+    """ocr_pdf on the bundled transcript: full pages, preprocessed regions, batched regions (model load excluded)"""
+    from ocr_search import ocr_pdf, get_reader, CourseAnalyzer
+
+    get_reader()
+    modes = [
+        ('ocr_pdf', dict(preprocess=False, engine='page')),
+        ('ocr_pdf_regions', dict(preprocess=True, engine='page')),
+        ('ocr_pdf_regions_batched', dict(preprocess=True, engine='batched')),
+    ]
+    results = []
+    found = {}
+    for name, options in modes:
+        stats = measure(lambda: ocr_pdf(SAMPLE_PDF, verbose=False, **options), runs)
+        batch_timings = []
+        text = ocr_pdf(SAMPLE_PDF, verbose=False, batch_timings=batch_timings, **options)
+        found[name] = CourseAnalyzer(verbose=False).extract_courses_from_text(text)
+        results.append(dict(name=name, size=1, courses=len(found[name]), **stats))
+        for timing in batch_timings:
+            print(f"  {name} batch {timing['batch']}: {timing['images']} image(s) "
+                  f"{timing['size'][1]}x{timing['size'][0]} {timing['seconds'] * 1000:.0f}ms")
+
+    # Region cropping and batching must not cost course codes
+    for name, _ in modes[1:]:
+        lost = sorted(found['ocr_pdf'] - found[name])
+        if lost:
+            print(f"[WARNING] Course codes missed by {name}: {lost}")
+    return results
+
+
+# Prompt rate limits for --prompt, high enough that every timed request reaches the model
+BENCH_RATE_LIMITS = {
+    'PROMPT_IP_REQUESTS_PER_MINUTE': '1000000',
+    'PROMPT_IP_TOKENS_PER_MINUTE': '1000000000',
+    'PROMPT_USER_REQUESTS_PER_MINUTE': '1000000',
+    'PROMPT_USER_TOKENS_PER_MINUTE': '1000000000',
+}
+
+
+def bench_prompt(runs, tmp_dir):
+    """POST /api/prompt end to end against the mock LLM server, on a scratch database"""
+    from mock_llm_server import start_mock_server
+
+    server = start_mock_server()
+    os.environ['LLM_HOST'], os.environ['LLM_PORT'] = server.server_address[0], str(server.server_address[1])
+    # init_database() creates and backfills tables; keep it away from backend/db/database.sqlite
+    os.environ['DATABASE_PATH'] = os.path.join(tmp_dir, 'database.sqlite')
+    for name, value in BENCH_RATE_LIMITS.items():
+        os.environ.setdefault(name, value)
+
+    from app import app, init_database
+    init_database()
+    client = app.test_client()
+    payload = {'prompt': 'What should I take after Csci 211?'}
+    statuses = []
+
+    def post():
+        statuses.append(client.post('/api/prompt', json=payload).status_code)
+
+    try:
+        stats = measure(post, runs)
+    finally:
+        server.shutdown()
+    errors = sum(status != 200 for status in statuses)
+    if errors:
+        print(f"[ERROR] api_prompt: {errors}/{runs} non-200 responses {sorted(set(statuses) - {200})}")
+    return [dict(name='api_prompt', size=1, errors=errors, **stats)]
+
+
+def bench_startup(runs):
+    """Import of the gunicorn entrypoint in a fresh interpreter, plus master and per-worker memory"""
+    import subprocess
+
+    probes = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, os.path.join(BENCH_DIR, 'startup_probe.py'), '--workers', '2'],
+                                capture_output=True, text=True, check=True).stdout
+        probes.append(json.loads(output.strip().splitlines()[-1]))
+
+    times = [p['import_seconds'] for p in probes]
+    last = probes[-1]
+    print(f"  wsgi import: master RSS {last['master']['rss_mb']:.1f}MB, heavy modules {last['heavy_modules']}")
+    for i, worker in enumerate(last['workers']):
+        print(f"  worker {i}: USS {worker.get('uss_mb', 0):.1f}MB, PSS {worker.get('pss_mb', 0):.1f}MB")
+    return [dict(name='wsgi_import', size=1, runs=runs, min=min(times),
+                 median=statistics.median(times), mean=statistics.fmean(times))]
+
+
+def scaling_exponents(results):
+    """Estimate k in time ~ size^k between consecutive sizes of each benchmark"""
+    by_name = {}
+    for r in results:
+        by_name.setdefault(r['name'], []).append(r)
+
+    exponents = {}
+    for name, rows in by_name.items():
+        rows = sorted(rows, key=lambda r: r['size'])
+        steps = []
+        for a, b in zip(rows, rows[1:]):
+            if a['size'] != b['size'] and a['median'] > 0 and b['median'] > 0:
+                steps.append(round(math.log(b['median'] / a['median']) / math.log(b['size'] / a['size']), 2))
+        if steps:
+            exponents[name] = steps
+    return exponents
+
+
+def machine_info() -> dict:
+    """Hardware and interpreter the results were measured on"""
+    cpu = platform.processor()
+    try:
+        with open('/proc/cpuinfo', 'r', encoding='utf-8') as f:
+            cpu = next((line.split(':', 1)[1].strip() for line in f if line.startswith('model name')), cpu)
+    except OSError:
+        pass
+    return {
+        'machine': platform.machine(),
+        'cpu': cpu,
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare results against a baseline
+
+    Returns:
+        List of (name, size, baseline median, current median, ratio) for regressions
+    """
+    previous = {(r['name'], r['size']): r for r in baseline.get('results', [])}
+    regressions = []
+    for r in results:
+        old = previous.get((r['name'], r['size']))
+        if not old or old['median'] <= 0:
+            continue
+        ratio = r['median'] / old['median']
+        if ratio > 1 + threshold:
+            regressions.append((r['name'], r['size'], old['median'], r['median'], ratio))
+    return regressions
+
+
+def print_table(results):
+    print(f"\n{'benchmark':<34}{'size':>9}{'median':>14}{'min':>14}")
+    for r in results:
+        print(f"{r['name']:<34}{r['size']:>9}{r['median'] * 1000:>12.3f}ms{r['min'] * 1000:>12.3f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark transcript analysis and advisor hot paths")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000],
+                        help="Synthetic catalog sizes (number of courses)")
+    parser.add_argument('--max-quadratic', type=int, default=10000,
+                        help="Largest size to run for benchmarks that scale quadratically")
+    parser.add_argument('--runs', type=int, default=5, help="Timed runs per benchmark")
+    parser.add_argument('--ocr', action='store_true', help="Include ocr_pdf on the bundled transcript (slow)")
+    parser.add_argument('--prompt', action='store_true', help="Include /api/prompt against the mock LLM server")
+    parser.add_argument('--startup', action='store_true',
+                        help="Include entrypoint import time and per-worker memory (fresh interpreters)")
+    parser.add_argument('-o', '--output', default=DEFAULT_RESULTS, help="Where to write results JSON")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline results JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Allowed slowdown before a benchmark counts as a regression (0.2 = 20%%)")
+    parser.add_argument('--save-baseline', action='store_true', help="Write results to the baseline file")
+    parser.add_argument('--compare', action='store_true',
+                        help="Compare against the baseline and exit non-zero on regressions (same machine only)")
+    args = parser.parse_args()
+
+    # ai.process_prompt reads advisor_system_prompt.txt relative to the backend
+    os.chdir(BACKEND_DIR)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        results += bench_course_analyzer(args.sizes, args.max_quadratic, args.runs, tmp_dir)
+        results += bench_catalog(args.sizes, args.runs, tmp_dir)
+        if args.prompt:
+            results += bench_prompt(args.runs * 4, tmp_dir)
+    if args.ocr:
+        results += bench_ocr(max(1, args.runs // 5))
+    if args.startup:
+        results += bench_startup(args.runs)
+
+    print_table(results)
+    exponents = scaling_exponents(results)
+    if exponents:
+        print("\nScaling exponents (time ~ size^k between consecutive sizes):")
+        for name, steps in exponents.items():
+            print(f"  {name}: {steps}")
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'platform': platform.platform(),
+            'machine': machine_info(),
+            'sizes': args.sizes,
+        },
+        'results': results,
+        'scaling': exponents,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n[INFO] Results saved to {args.output}")
+
+    failed = [r['name'] for r in results if r.get('errors')]
+    if failed:
+        print(f"[ERROR] Benchmarks with failed requests: {failed}; not comparing or saving a baseline")
+        sys.exit(1)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"[INFO] Baseline saved to {args.baseline}")
+        return
+
+    if not args.compare:
+        return
+    if not os.path.exists(args.baseline):
+        print("[INFO] No baseline found; run with --save-baseline to create one")
+        return
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get('meta', {}).get('machine') != report['meta']['machine']:
+        print(f"[WARNING] Baseline was measured on {baseline.get('meta', {}).get('machine', 'an unknown machine')}, "
+              f"not this one; re-save it here with --save-baseline before comparing")
+        return
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n[ERROR] {len(regressions)} regression(s) over {args.threshold:.0%}:")
+        for name, size, old, new, ratio in regressions:
+            print(f"  {name} @ {size}: {old * 1000:.3f}ms -> {new * 1000:.3f}ms ({ratio:.2f}x)")
+        sys.exit(1)
+    print("[INFO] No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
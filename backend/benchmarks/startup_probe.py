@@ -0,0 +1,86 @@
+"""
+Cold start and per-worker memory of the production entrypoint
+
+Run from backend/ (run_benchmarks.py --startup runs it in fresh interpreters):
+    python benchmarks/startup_probe.py --workers 2
+
+Imports wsgi the way the gunicorn master does, then forks workers that
+each serve a few requests and report their own memory. Prints one JSON
+object: import time, master RSS, and each worker's unique (USS) and
+proportional (PSS) set size in MB.
+"""
+import os
+import gc
+import sys
+import json
+import time
+import argparse
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+REQUESTS = ['/api/catalog/search?q=data', '/api/catalog/autocomplete?prefix=csci', '/metrics']
+
+
+def memory_mb() -> dict:
+    """RSS from /proc/self/status plus PSS/USS from smaps_rollup (Linux)"""
+    values = {}
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                values['rss_mb'] = int(line.split()[1]) / 1024
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            fields = {line.split(':')[0]: int(line.split()[1]) for line in f if line.endswith('kB\n')}
+        values['pss_mb'] = fields['Pss'] / 1024
+        values['uss_mb'] = (fields['Private_Clean'] + fields['Private_Dirty']) / 1024
+    except OSError:
+        pass
+    return values
+
+
+def run_worker(write_fd: int) -> None:
+    from wsgi import app
+    client = app.test_client()
+    for path in REQUESTS:
+        client.get(path)
+    os.write(write_fd, json.dumps(memory_mb()).encode())
+    os._exit(0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure entrypoint import time and per-worker memory")
+    parser.add_argument('--workers', type=int, default=2, help="Workers to fork and measure")
+    args = parser.parse_args()
+
+    os.chdir(BACKEND_DIR)
+    os.environ.setdefault('LLM_WARMUP', '0')  # No model servers needed
+
+    start = time.perf_counter()
+    import wsgi  # noqa: F401
+    import_seconds = time.perf_counter() - start
+    gc.freeze()
+    master = memory_mb()
+
+    workers = []
+    for _ in range(args.workers):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            run_worker(write_fd)
+        os.close(write_fd)
+        with os.fdopen(read_fd) as f:
+            workers.append(json.loads(f.read() or '{}'))
+        os.waitpid(pid, 0)
+
+    print(json.dumps({
+        'import_seconds': import_seconds,
+        'heavy_modules': sorted(m for m in ('openai', 'easyocr', 'pdf2image', 'torch') if m in sys.modules),
+        'master': master,
+        'workers': workers,
+    }))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+import json
+import random
+import string
+from typing import List, Dict
+
+# Roughly the size of a real department's catalog
+COURSES_PER_DEPARTMENT = 50
+
+
+def department_codes(count: int, rng: random.Random) -> List[str]:
+    """Generate unique 3-4 letter department codes"""
+    codes = set()
+    while len(codes) < count:
+        codes.add(''.join(rng.choice(string.ascii_uppercase) for _ in range(rng.choice((3, 4)))))
+    return sorted(codes)
+
+
+def synthetic_course_names(n: int, seed: int = 0) -> List[str]:
+    """
+    Generate n course names like "Abcd 231" spread over departments
+
+    Args:
+        n: Number of courses
+        seed: RNG seed so every run benchmarks the same data
+
+    Returns:
+        List of course names in catalog ("Dept 123") format
+    """
+    rng = random.Random(seed)
+    depts = department_codes(max(1, n // COURSES_PER_DEPARTMENT), rng)
+    names = []
+    for i in range(n):
+        dept = depts[i % len(depts)]
+        number = 100 + (i // len(depts)) * 8 + rng.randint(0, 7)
+        names.append(f"{dept.capitalize()} {number}")
+    return names
+
+
+def synthetic_requirements(n: int, seed: int = 0) -> Dict:
+    """
+    Build a requirementsDB.json-shaped document with n courses
+
+    Mixes the three layouts CourseAnalyzer.load_requirements understands:
+    "courses" lists, "choices" groups and bare [count, course, ...] lists.
+    """
+    rng = random.Random(seed)
+    names = synthetic_course_names(n, seed)
+    requirements = {}
+    for start in range(0, n, 30):
+        chunk = names[start:start + 30]
+        category = f"Category {start // 30}"
+        layout = rng.randint(0, 2)
+        if layout == 0:
+            requirements[category] = {"Core": {"courses": chunk}}
+        elif layout == 1:
+            requirements[category] = {"Options": {"choices": {
+                "Group A": [1] + chunk[:15],
+                "Group B": [2] + chunk[15:],
+            }}}
+        else:
+            requirements[category] = [len(chunk) // 2] + chunk
+    return requirements
+
+
+def synthetic_catalog(n: int, seed: int = 0) -> List[Dict]:
+    """Build a courses.json-shaped list with n courses and in-department prerequisites"""
+    rng = random.Random(seed)
+    names = synthetic_course_names(n, seed)
+    # Names cycle through departments, so i - stride is the previous course in the same department
+    stride = max(1, n // COURSES_PER_DEPARTMENT)
+    catalog = []
+    for i, name in enumerate(names):
+        prereqs = []
+        if i >= stride and rng.random() < 0.6:
+            prereqs.append(names[i - stride])
+        catalog.append({
+            "name": name,
+            "credits": rng.choice((1, 3, 3, 3, 4)),
+            "description": f"Synthetic course {i} covering topic {rng.randint(0, 999)} in depth.",
+            "prerequisites": prereqs
+        })
+    return catalog
+
+
+# Departments CourseAnalyzer.extract_courses_from_text accepts
+TRANSCRIPT_DEPARTMENTS = ('MATH', 'CSCI', 'PHYS', 'CHEM', 'ENGL', 'HIST', 'ECON', 'BIOL', 'WRIT', 'PHIL')
+
+
+def synthetic_transcript(courses: int = 40, seed: int = 0, course_names: List[str] = None) -> str:
+    """
+    Build OCR-like transcript text
+
+    Args:
+        courses: Number of course lines
+        seed: RNG seed
+        course_names: Catalog names ("Dept 123") to draw courses from
+            (default: random numbers in TRANSCRIPT_DEPARTMENTS)
+
+    Returns:
+        Transcript text with terms, course lines and GPA lines
+    """
+    rng = random.Random(seed)
+    lines = ["UNIVERSITY OFFICIAL TRANSCRIPT", "Student: Test Student"]
+    for term, start in enumerate(range(0, courses, 5)):
+        lines.append(f"FALL {2020 + term} Term GPA: {rng.uniform(2.0, 4.0):.2f}")
+        for _ in range(min(5, courses - start)):
+            if course_names:
+                dept, number = rng.choice(course_names).upper().split()
+            else:
+                dept = rng.choice(TRANSCRIPT_DEPARTMENTS)
+                number = rng.randint(100, 499)
+            lines.append(f"{dept} {number} Introduction To Topic {number} A 3.00 12.00")
+    lines.append(f"Cumulative GPA: {rng.uniform(2.0, 4.0):.2f}")
+    return "\n".join(lines)
+
+
+def write_json(data, path: str) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
@@ -0,0 +1,244 @@
+import os
+import re
+import json
+import sqlite3
+import hashlib
+import threading
+from typing import List, Dict, Optional
+
+# Course catalog shared with the frontend
+COURSES_JSON = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'json', 'courses.json')
+
+
+def normalize_course_id(name: str) -> str:
+    """
+    Standardize a course name the same way CourseAnalyzer does ("Csci 111" -> "CSCI111")
+
+    Args:
+        name: Course name as written in the catalog or a transcript
+
+    Returns:
+        Course ID with whitespace removed, upper-cased
+    """
+    return re.sub(r'\s+', '', name).upper()
+
+
+def parse_requirement(requirement: str) -> List[str]:
+    """
+    Split one prerequisite entry into its alternatives ("Math 301 | Math 305" -> ["MATH301", "MATH305"])
+
+    Args:
+        requirement: Prerequisite string from courses.json
+
+    Returns:
+        Normalized course IDs, any one of which satisfies the entry
+    """
+    return [normalize_course_id(p) for p in requirement.split('|') if p.strip()]
+
+
+# Boundary between letters and digits ("PHYS|211", "311|L")
+CODE_BOUNDARY = re.compile(r'(?<=[A-Za-z])(?=\d)|(?<=\d)(?=[A-Za-z])')
+
+
+def split_codes(text: str) -> str:
+    """
+    Separate letters from digits so course codes tokenize the same written either way
+
+    unicode61 keeps "PHYS211" as a single token, which a search for
+    "phys 211" never matches. Text is passed through this before it is
+    indexed, so "PHYS211" and "PHYS 211" both index as "phys", "211".
+
+    Args:
+        text: Text about to be written to an FTS5 table
+
+    Returns:
+        Text with a space at every letter/digit boundary
+    """
+    return CODE_BOUNDARY.sub(' ', text or '')
+
+
+def query_terms(text: str) -> List[str]:
+    """
+    Split user input into FTS5-safe terms
+
+    Letters and digits are split apart so "CSCI311" and "Csci 311" both
+    become ["csci", "311"], matching text indexed through split_codes().
+
+    Args:
+        text: Raw query text
+
+    Returns:
+        List of lower-cased alphanumeric terms
+    """
+    return [t.lower() for t in re.findall(r'[A-Za-z]+|\d+', text or '')]
+
+
+class CourseCatalog:
+    """In-memory SQLite FTS5 index over courses.json"""
+
+    def __init__(self, courses_json: str = COURSES_JSON):
+        """
+        Build the catalog index
+
+        Args:
+            courses_json: Path to the courses JSON file
+        """
+        self.courses_json = courses_json
+        self.courses = []  # Course records in file order
+        self.course_map = {}  # Normalized course ID -> course record
+        self.prerequisite_groups = {}  # Course ID -> list of OR-groups, all of which must be met
+        self.unlocks = {}  # Course ID -> course IDs that list it as a prerequisite
+        self.etag = ''  # Content hash of the source file
+
+        # One shared connection; queries are short so a lock is cheaper than a pool
+        self.conn = sqlite3.connect(':memory:', check_same_thread=False)
+        self.lock = threading.Lock()
+
+        self.load(courses_json)
+
+    def load(self, json_path: str) -> None:
+        """
+        Load courses from JSON and (re)build the FTS5 index
+
+        Args:
+            json_path: Path to the courses JSON file
+        """
+        with open(json_path, 'rb') as f:
+            raw = f.read()
+
+        courses = json.loads(raw.decode('utf-8'))
+
+        records = []
+        course_map = {}
+        for course in courses:
+            name = course.get('name', '').strip()
+            if not name:
+                continue
+            record = {
+                'id': normalize_course_id(name),
+                'name': name,
+                'credits': course.get('credits', 0),
+                'description': course.get('description', ''),
+                'prerequisites': course.get('prerequisites', []),
+                'corequisites': course.get('corequisites', []),
+            }
+            records.append(record)
+            course_map[record['id']] = record
+
+        # Prerequisite graph: AND of OR-groups, plus the reverse edges
+        prerequisite_groups = {}
+        unlocks = {}
+        for record in records:
+            groups = [parse_requirement(r) for r in record['prerequisites']]
+            prerequisite_groups[record['id']] = [g for g in groups if g]
+            for group in groups:
+                for prereq in group:
+                    unlocks.setdefault(prereq, []).append(record['id'])
+
+        with self.lock:
+            cur = self.conn.cursor()
+            cur.execute("DROP TABLE IF EXISTS course_fts")
+            # prefix indexes keep autocomplete on short prefixes from scanning the term list
+            cur.execute(
+                "CREATE VIRTUAL TABLE course_fts USING fts5("
+                "course_id UNINDEXED, name, description, prerequisites, "
+                "tokenize='unicode61', prefix='1 2 3')"
+            )
+            cur.executemany(
+                "INSERT INTO course_fts (rowid, course_id, name, description, prerequisites) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (i, r['id'], split_codes(r['name']), split_codes(r['description']),
+                     split_codes(' '.join(r['prerequisites'])))
+                    for i, r in enumerate(records)
+                ]
+            )
+            cur.execute("INSERT INTO course_fts (course_fts) VALUES ('optimize')")
+            self.conn.commit()
+
+            self.courses = records
+            self.course_map = course_map
+            self.prerequisite_groups = prerequisite_groups
+            self.unlocks = unlocks
+            self.etag = hashlib.sha1(raw).hexdigest()
+
+        print(f"[INFO] Indexed {len(records)} catalog courses")
+
+    def get(self, course_id: str) -> Optional[Dict]:
+        """
+        Look up a single course
+
+        Args:
+            course_id: Course name or ID in any spacing/case
+
+        Returns:
+            Course record, or None if not in the catalog
+        """
+        return self.course_map.get(normalize_course_id(course_id))
+
+    def search(self, query: str, page: int = 1, per_page: int = 20) -> Dict:
+        """
+        Ranked full-text search over name, description and prerequisites
+
+        Args:
+            query: Free-text query
+            page: 1-based page number
+            per_page: Results per page
+
+        Returns:
+            Dictionary with total hit count and the requested page of courses
+        """
+        terms = query_terms(query)
+        page = max(1, page)
+        per_page = max(1, min(per_page, 100))
+        if not terms:
+            return {'query': query, 'total': 0, 'page': page, 'per_page': per_page, 'results': []}
+
+        # Quote every term so user input can never be parsed as FTS5 syntax;
+        # the final term is a prefix so partially typed words still match
+        match = ' '.join(f'"{t}"' for t in terms[:-1]) + f' "{terms[-1]}"*'
+
+        with self.lock:
+            cur = self.conn.cursor()
+            total = cur.execute(
+                "SELECT count(*) FROM course_fts WHERE course_fts MATCH ?", (match,)
+            ).fetchone()[0]
+            # Name hits outrank prerequisite hits, which outrank description hits
+            rows = cur.execute(
+                "SELECT rowid FROM course_fts WHERE course_fts MATCH ? "
+                "ORDER BY bm25(course_fts, 0.0, 10.0, 1.0, 2.0) LIMIT ? OFFSET ?",
+                (match, per_page, (page - 1) * per_page)
+            ).fetchall()
+
+        return {
+            'query': query,
+            'total': total,
+            'page': page,
+            'per_page': per_page,
+            'results': [self.courses[row[0]] for row in rows]
+        }
+
+    def autocomplete(self, prefix: str, limit: int = 10) -> List[Dict]:
+        """
+        Prefix completion against course names only
+
+        Args:
+            prefix: Partially typed course name (e.g. "csci 3")
+            limit: Maximum number of suggestions
+
+        Returns:
+            List of {id, name} suggestions ordered by course name
+        """
+        terms = query_terms(prefix)
+        if not terms:
+            return []
+
+        match = 'name : (' + ' '.join(f'"{t}"*' for t in terms) + ')'
+        limit = max(1, min(limit, 50))
+
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT rowid FROM course_fts WHERE course_fts MATCH ? ORDER BY name LIMIT ?",
+                (match, limit)
+            ).fetchall()
+
+        return [{'id': self.courses[row[0]]['id'], 'name': self.courses[row[0]]['name']} for row in rows]
@@ -0,0 +1,141 @@
+import os
+import time
+import threading
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from catalog import CourseCatalog, COURSES_JSON
+from planner import DegreePlanner, REQUIREMENTS_JSON
+from cohort import CohortIndex
+from course_embeddings import SemanticSearch
+import metrics
+
+CATALOG_RELOADS = metrics.Counter('advisor_catalog_reloads_total', 'Catalog and requirements rebuilds', ['result'])
+
+# Seconds between checks of courses.json and requirementsDB.json (0 turns the watcher off)
+CATALOG_RELOAD_INTERVAL = float(os.getenv('CATALOG_RELOAD_INTERVAL', '2'))
+
+
+class CatalogSnapshot:
+    """
+    One consistent build of the catalog and everything compiled from it
+
+    Never modified after it is published: a request that reads
+    `registry.current` once keeps a course map, prerequisite graph and
+    requirement groups that agree with each other, even if a reload
+    lands while it runs.
+    """
+
+    def __init__(self, version: int, catalog: CourseCatalog, planner: DegreePlanner, cohort_index: CohortIndex,
+                 semantic_search: Optional[SemanticSearch], signature: Tuple):
+        self.version = version  # Increases with every published rebuild in this process
+        self.catalog = catalog
+        self.planner = planner
+        self.cohort_index = cohort_index
+        self.semantic_search = semantic_search
+        self.signature = signature  # (mtime, size, inode) of each source file it was built from
+        self.loaded_at = datetime.utcnow().isoformat() + 'Z'
+
+    def describe(self) -> Dict:
+        return {
+            'version': self.version,
+            'catalog_etag': self.catalog.etag,
+            'requirements_version': self.planner.version,
+            'courses': len(self.catalog.courses),
+            'requirement_groups': len(self.planner.groups),
+            'semantic_index': self.semantic_search is not None,
+            'loaded_at': self.loaded_at,
+        }
+
+
+def file_signature(*paths: str) -> Tuple:
+    signature = []
+    for path in paths:
+        stat = os.stat(path)
+        signature.append((stat.st_mtime_ns, stat.st_size, stat.st_ino))
+    return tuple(signature)
+
+
+class CatalogRegistry:
+    """
+    Hot-reloadable catalog and degree requirements
+
+    A watcher thread polls the two source files and, when either changes,
+    builds a complete new CatalogSnapshot off to the side, then publishes
+    it with a single reference assignment. Readers take `current` without
+    locking and never see a half-built index; the previous snapshot stays
+    alive until its last reader drops it. A build that fails (a file
+    caught mid-write, invalid JSON) is logged and the current snapshot is
+    kept; the same file contents are not retried until they change again.
+    """
+
+    def __init__(self, courses_json: str = COURSES_JSON, requirements_json: str = REQUIREMENTS_JSON,
+                 interval: float = CATALOG_RELOAD_INTERVAL):
+        """
+        Args:
+            courses_json: Path to courses.json
+            requirements_json: Path to requirementsDB.json
+            interval: Seconds between file checks once the watcher is started
+        """
+        self.courses_json = courses_json
+        self.requirements_json = requirements_json
+        self.interval = interval
+        self.build_lock = threading.Lock()  # One rebuild at a time; readers never take it
+        self.failed_signature = None
+        self.thread = None
+        self.pid = None
+        self.current = self.build(0)
+
+    def build(self, version: int) -> CatalogSnapshot:
+        signature = file_signature(self.courses_json, self.requirements_json)
+        catalog = CourseCatalog(self.courses_json)
+        planner = DegreePlanner(catalog, self.requirements_json)
+        return CatalogSnapshot(version, catalog, planner, CohortIndex(catalog, planner.groups),
+                               SemanticSearch.open(catalog), signature)
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Rebuild and publish a new snapshot if a source file changed
+
+        Args:
+            force: Rebuild even if the files look unchanged
+
+        Returns:
+            True if a new snapshot was published
+        """
+        with self.build_lock:
+            try:
+                signature = file_signature(self.courses_json, self.requirements_json)
+            except OSError:
+                return False  # Mid-replace; the next check will see the new file
+            if not force and signature in (self.current.signature, self.failed_signature):
+                return False
+            start = time.perf_counter()
+            try:
+                snapshot = self.build(self.current.version + 1)
+            except Exception as e:
+                self.failed_signature = signature
+                CATALOG_RELOADS.labels('failed').inc()
+                print(f"[WARNING] Catalog reload failed, keeping version {self.current.version}: {e}")
+                return False
+            self.current = snapshot
+            self.failed_signature = None
+        CATALOG_RELOADS.labels('published').inc()
+        print(f"[INFO] Catalog version {snapshot.version} published in {time.perf_counter() - start:.2f}s")
+        return True
+
+    def start(self) -> None:
+        """Start this process's watcher (call after fork; threads don't survive it)"""
+        if self.interval <= 0 or (self.thread is not None and self.pid == os.getpid()):
+            return
+        self.pid = os.getpid()
+        self.thread = threading.Thread(target=self.watch, name='catalog-watcher', daemon=True)
+        self.thread.start()
+
+    def watch(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.reload()
+            except Exception as e:
+                print(f"[WARNING] Catalog watcher error: {e}")
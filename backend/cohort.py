@@ -0,0 +1,215 @@
+from typing import List, Dict, Iterable
+
+import numpy as np
+
+from catalog import CourseCatalog, normalize_course_id
+from planner import RequirementGroup, DEFAULT_CREDITS
+import metrics
+
+COHORT_LATENCY = metrics.Histogram('advisor_cohort_seconds', 'Time to evaluate a cohort query', ['query'])
+
+
+class AndOrMatrix:
+    """
+    Sparse "all of (any of ...)" conditions over interned course columns
+
+    Stored CSR-style: `alternatives` holds the course columns of every
+    OR-group back to back, `group_starts` where each OR-group begins, and
+    `item_starts` where each item's OR-groups begin. Evaluating against a
+    students x courses boolean matrix is then two reduceat calls, whatever
+    the number of students.
+    """
+
+    def __init__(self, items: List[List[List[int]]]):
+        """
+        Args:
+            items: For each item, its OR-groups of course columns (empty = always true)
+        """
+        alternatives = []
+        group_starts = []
+        item_starts = []
+        nonempty = []
+        for i, groups in enumerate(items):
+            groups = [g for g in groups if g]
+            if not groups:
+                continue
+            nonempty.append(i)
+            item_starts.append(len(group_starts))
+            for group in groups:
+                group_starts.append(len(alternatives))
+                alternatives.extend(group)
+        self.size = len(items)
+        self.alternatives = np.array(alternatives, dtype=np.intp)
+        self.group_starts = np.array(group_starts, dtype=np.intp)
+        self.item_starts = np.array(item_starts, dtype=np.intp)
+        self.nonempty = np.array(nonempty, dtype=np.intp)
+
+    def evaluate(self, completed: np.ndarray) -> np.ndarray:
+        """
+        Args:
+            completed: students x courses boolean matrix
+
+        Returns:
+            students x items boolean matrix of satisfied items
+        """
+        result = np.ones((completed.shape[0], self.size), dtype=bool)
+        if len(self.nonempty) and completed.shape[0]:
+            groups = np.logical_or.reduceat(completed[:, self.alternatives], self.group_starts, axis=1)
+            result[:, self.nonempty] = np.logical_and.reduceat(groups, self.item_starts, axis=1)
+        return result
+
+
+class CohortIndex:
+    """Vectorized eligibility and requirement coverage for many students at once"""
+
+    def __init__(self, catalog: CourseCatalog, groups: List[RequirementGroup] = ()):
+        """
+        Intern every course in the catalog, its prerequisites and the requirement groups
+
+        Args:
+            catalog: Loaded course catalog
+            groups: Requirement groups (see planner.load_requirement_groups)
+        """
+        self.catalog = catalog
+        self.groups = list(groups)
+        self.course_ids = []  # Column -> course ID
+        self.columns = {}  # Course ID -> column
+
+        for course in catalog.courses:
+            self.intern(course['id'])
+        for prerequisite_groups in catalog.prerequisite_groups.values():
+            for group in prerequisite_groups:
+                for course_id in group:
+                    self.intern(course_id)
+        for group in self.groups:
+            for option in group.options:
+                for part in option:
+                    for course_id in part:
+                        self.intern(course_id)
+
+        # Catalog courses are the first len(catalog.courses) columns
+        self.prerequisites = AndOrMatrix([
+            [[self.columns[c] for c in g] for g in catalog.prerequisite_groups.get(course['id'], [])]
+            for course in catalog.courses
+        ])
+
+        # Requirement options flattened in group order, with per-group offsets for the sums
+        options = []
+        weights = []
+        option_starts = []
+        self.counted_groups = []
+        for i, group in enumerate(self.groups):
+            if not group.options:
+                continue
+            self.counted_groups.append(i)
+            option_starts.append(len(options))
+            for option in group.options:
+                options.append([[self.columns[c] for c in part] for part in option])
+                weights.append(sum(self.credits(part[0]) for part in option) if group.by_credits else 1)
+        self.options = AndOrMatrix(options)
+        self.option_weights = np.array(weights, dtype=np.int32)
+        self.option_starts = np.array(option_starts, dtype=np.intp)
+        self.required = np.array([g.required for g in self.groups], dtype=np.int32)
+
+    def intern(self, course_id: str) -> int:
+        """Integer column for a course ID, assigning the next free one if new"""
+        column = self.columns.get(course_id)
+        if column is None:
+            column = self.columns[course_id] = len(self.course_ids)
+            self.course_ids.append(course_id)
+        return column
+
+    def credits(self, course_id: str) -> int:
+        course = self.catalog.course_map.get(course_id)
+        return course['credits'] if course else DEFAULT_CREDITS
+
+    def student_matrix(self, students: Iterable[Iterable[str]]) -> np.ndarray:
+        """
+        Encode completed courses as one boolean row per student
+
+        Courses the index has never seen are ignored; they cannot satisfy anything.
+
+        Args:
+            students: Completed course names for each student, in any spacing/case
+
+        Returns:
+            students x courses boolean matrix
+        """
+        rows = []
+        cols = []
+        count = 0
+        # Raw name -> column; the same few hundred spellings repeat across every transcript
+        lookup = {}
+        for row, courses in enumerate(students):
+            count += 1
+            for name in courses:
+                column = lookup.get(name, -1)
+                if column == -1:
+                    column = lookup[name] = self.columns.get(normalize_course_id(name))
+                if column is not None:
+                    rows.append(row)
+                    cols.append(column)
+        matrix = np.zeros((count, len(self.course_ids)), dtype=bool)
+        matrix[rows, cols] = True
+        return matrix
+
+    def eligibility(self, completed: np.ndarray) -> np.ndarray:
+        """
+        Args:
+            completed: Matrix from student_matrix
+
+        Returns:
+            students x catalog courses boolean matrix: prerequisites met and not already taken
+        """
+        with metrics.timed(COHORT_LATENCY, 'eligibility'):
+            taken = completed[:, :len(self.catalog.courses)]
+            return self.prerequisites.evaluate(completed) & ~taken
+
+    def eligible_for(self, completed: np.ndarray, course_id: str) -> np.ndarray:
+        """
+        Args:
+            completed: Matrix from student_matrix
+            course_id: Catalog course in any spacing/case
+
+        Returns:
+            Boolean vector, True for students who can take the course now
+        """
+        course = self.catalog.get(course_id)
+        if course is None:
+            raise KeyError(course_id)
+        with metrics.timed(COHORT_LATENCY, 'eligible_for'):
+            column = self.columns[course['id']]
+            single = AndOrMatrix([[[self.columns[c] for c in g]
+                                   for g in self.catalog.prerequisite_groups.get(course['id'], [])]])
+            return single.evaluate(completed)[:, 0] & ~completed[:, column]
+
+    def coverage(self, completed: np.ndarray) -> np.ndarray:
+        """
+        Progress towards every requirement group
+
+        Args:
+            completed: Matrix from student_matrix
+
+        Returns:
+            students x groups integer matrix of courses (or credits) completed, capped at the requirement
+        """
+        with metrics.timed(COHORT_LATENCY, 'coverage'):
+            progress = np.zeros((completed.shape[0], len(self.groups)), dtype=np.int32)
+            if len(self.counted_groups) and completed.shape[0]:
+                satisfied = self.options.evaluate(completed) * self.option_weights
+                progress[:, self.counted_groups] = np.add.reduceat(satisfied, self.option_starts, axis=1)
+            return np.minimum(progress, self.required)
+
+    def coverage_summary(self, completed: np.ndarray) -> List[Dict]:
+        """Per requirement group: how many students have fully met it"""
+        met = (self.coverage(completed) >= self.required).sum(axis=0)
+        return [
+            {
+                'category': group.category,
+                'group': group.name,
+                'required': group.required,
+                'unit': 'credits' if group.by_credits else 'courses',
+                'students_satisfied': int(met[i]),
+            }
+            for i, group in enumerate(self.groups)
+        ]
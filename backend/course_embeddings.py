@@ -0,0 +1,226 @@
+import os
+import json
+import time
+import argparse
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
+
+import numpy as np
+
+from catalog import CourseCatalog, COURSES_JSON
+import metrics
+
+# Small CPU sentence embedding model (384 dimensions); queries must use the model the index was built with
+EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', 'sentence-transformers/all-MiniLM-L6-v2')
+
+# Raw float16 matrix, one L2-normalized row per course, plus a JSON sidecar describing it
+EMBEDDINGS_PATH = os.getenv('EMBEDDINGS_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                            'db', 'course_embeddings.f16'))
+
+# Rows converted to float32 per step while scoring, so a query never copies the whole matrix
+SCORE_CHUNK = 1024
+
+SEMANTIC_LATENCY = metrics.Histogram('advisor_semantic_search_seconds', 'Semantic course search time per stage',
+                                     ['stage'])
+
+# sentence-transformers (and torch) are only imported when something is embedded
+encoders = {}
+
+
+def get_encoder(model_name: str = EMBEDDING_MODEL):
+    """Return the process-wide sentence encoder, loading it on first call"""
+    if model_name not in encoders:
+        from sentence_transformers import SentenceTransformer
+        encoders[model_name] = SentenceTransformer(model_name, device='cpu')
+    return encoders[model_name]
+
+
+def course_text(course: Dict) -> str:
+    """Text embedded for a course: its name followed by the catalog description"""
+    return f"{course['name']}. {course.get('description') or ''}".strip()
+
+
+def metadata_path(path: str) -> str:
+    return path + '.json'
+
+
+def build_index(catalog: CourseCatalog, path: str = EMBEDDINGS_PATH, model_name: str = EMBEDDING_MODEL,
+                batch_size: int = 64) -> Dict:
+    """
+    Embed every catalog course and write the float16 index
+
+    The matrix and its sidecar are written to temporary files and renamed
+    into place, so processes that already mapped the old index keep reading
+    it undisturbed and pick up the new one when they reopen.
+
+    Args:
+        catalog: Loaded course catalog
+        path: Output matrix path (the sidecar goes next to it)
+        model_name: sentence-transformers model to embed with
+        batch_size: Courses per encoder batch
+
+    Returns:
+        The sidecar metadata
+    """
+    start = time.perf_counter()
+    vectors = get_encoder(model_name).encode(
+        [course_text(c) for c in catalog.courses],
+        batch_size=batch_size,
+        normalize_embeddings=True,
+        convert_to_numpy=True,
+    ).astype(np.float16)
+
+    metadata = {
+        'model': model_name,
+        'count': int(vectors.shape[0]),
+        'dim': int(vectors.shape[1]),
+        'course_ids': [c['id'] for c in catalog.courses],
+        'catalog_etag': catalog.etag,
+        'built_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    vectors.tofile(path + '.tmp')
+    with open(metadata_path(path) + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(metadata, f)
+    os.replace(path + '.tmp', path)
+    os.replace(metadata_path(path) + '.tmp', metadata_path(path))
+
+    print(f"[INFO] Embedded {metadata['count']} courses ({metadata['dim']} dims) "
+          f"in {time.perf_counter() - start:.1f}s -> {path}")
+    return metadata
+
+
+class EmbeddingIndex:
+    """
+    Read-only, memory-mapped course embedding matrix
+
+    The matrix is mapped rather than loaded, so every worker process on the
+    host shares the same page-cache copy.
+    """
+
+    def __init__(self, path: str = EMBEDDINGS_PATH):
+        """
+        Args:
+            path: Matrix written by build_index
+        """
+        with open(metadata_path(path), 'r', encoding='utf-8') as f:
+            self.metadata = json.load(f)
+        self.path = path
+        self.model = self.metadata['model']
+        self.course_ids = self.metadata['course_ids']
+        self.matrix = np.memmap(path, dtype=np.float16, mode='r',
+                                shape=(self.metadata['count'], self.metadata['dim']))
+
+    @classmethod
+    def open(cls, path: str = EMBEDDINGS_PATH) -> Optional['EmbeddingIndex']:
+        """The index at `path`, or None if it has not been built"""
+        if not (os.path.exists(path) and os.path.exists(metadata_path(path))):
+            return None
+        return cls(path)
+
+    def top_k(self, query: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        """
+        Rows most similar to a normalized query vector
+
+        Args:
+            query: Query embedding (same model and dimension as the index)
+            k: Number of rows to return
+
+        Returns:
+            (row, cosine similarity) pairs, best first
+        """
+        count = self.matrix.shape[0]
+        k = max(0, min(k, count))
+        if k == 0:
+            return []
+        query = np.asarray(query, dtype=np.float32)
+        scores = np.empty(count, dtype=np.float32)
+        for start in range(0, count, SCORE_CHUNK):
+            chunk = self.matrix[start:start + SCORE_CHUNK]
+            scores[start:start + len(chunk)] = chunk.astype(np.float32) @ query
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(int(row), float(scores[row])) for row in top]
+
+
+class SemanticSearch:
+    """Plain-language course search over an EmbeddingIndex"""
+
+    def __init__(self, catalog: CourseCatalog, index: EmbeddingIndex):
+        self.catalog = catalog
+        self.index = index
+        if index.metadata.get('catalog_etag') != catalog.etag:
+            print("[WARNING] Course embeddings were built from a different courses.json; "
+                  "run `python course_embeddings.py build` to refresh them")
+        # Queries repeat ("machine learning", "statistics"), so their embeddings are cached
+        self.embed = lru_cache(maxsize=1024)(self._embed)
+
+    @classmethod
+    def open(cls, catalog: CourseCatalog, path: str = EMBEDDINGS_PATH) -> Optional['SemanticSearch']:
+        index = EmbeddingIndex.open(path)
+        return cls(catalog, index) if index is not None else None
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = get_encoder(self.index.model).encode([text], normalize_embeddings=True, convert_to_numpy=True)[0]
+        vector.setflags(write=False)
+        return vector
+
+    def search(self, query: str, k: int = 10) -> Dict:
+        """
+        Courses whose descriptions are closest in meaning to the query
+
+        Args:
+            query: Plain-language interest ("something with data and statistics")
+            k: Number of results
+
+        Returns:
+            Dictionary with the query and up to k courses, each with its similarity score
+        """
+        k = max(1, min(k, 50))
+        text = ' '.join(query.split()).lower()
+        if not text:
+            return {'query': query, 'results': []}
+
+        with metrics.timed(SEMANTIC_LATENCY, 'embed'):
+            vector = self.embed(text)
+        with metrics.timed(SEMANTIC_LATENCY, 'score'):
+            hits = self.index.top_k(vector, k)
+
+        results = []
+        for row, score in hits:
+            course = self.catalog.course_map.get(self.index.course_ids[row])
+            if course is not None:  # Dropped from the catalog since the index was built
+                results.append({**course, 'score': round(score, 4)})
+        return {'query': query, 'model': self.index.model, 'results': results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build or query the course embedding index')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help='Embed every course in courses.json')
+    build.add_argument('--courses', default=COURSES_JSON, help='Path to courses.json')
+    build.add_argument('--output', default=EMBEDDINGS_PATH, help='Where to write the float16 matrix')
+    build.add_argument('--model', default=EMBEDDING_MODEL, help='sentence-transformers model name')
+    build.add_argument('--batch-size', type=int, default=64, help='Courses per encoder batch')
+
+    query = subparsers.add_parser('query', help='Search the built index')
+    query.add_argument('text', help='Plain-language query')
+    query.add_argument('-k', type=int, default=10, help='Number of results')
+    query.add_argument('--index', default=EMBEDDINGS_PATH, help='Matrix written by build')
+
+    args = parser.parse_args()
+    if args.command == 'build':
+        build_index(CourseCatalog(args.courses), args.output, args.model, args.batch_size)
+        return
+
+    searcher = SemanticSearch.open(CourseCatalog(), args.index)
+    if searcher is None:
+        parser.error(f"No index at {args.index}; run the build command first")
+    for course in searcher.search(args.text, args.k)['results']:
+        print(f"{course['score']:.3f}  {course['name']:<12} {course['description'][:80]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+import re
+import json
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, Optional, List, Dict, Tuple
+
+from catalog import COURSES_JSON, normalize_course_id
+
+# Characters OCR confuses, and what they should read as in the letter (department)
+# and digit (number) parts of a course code
+AS_LETTER = str.maketrans({'0': 'O', '1': 'I', '2': 'Z', '5': 'S', '6': 'G', '8': 'B', '7': 'T', '4': 'A'})
+AS_DIGIT = str.maketrans({'O': '0', 'D': '0', 'Q': '0', 'I': '1', 'L': '1', 'Z': '2', 'S': '5', 'G': '6',
+                          'B': '8', 'T': '7', 'A': '4'})
+
+# Substitution cost for a confusable pair (case-insensitive); other edits cost 1
+CONFUSION_COST = 0.25
+CONFUSABLE = {frozenset(pair) for pair in ('0O', '0D', '0Q', '1I', '1L', 'IL', '2Z', '5S', '6G', '8B', '7T', '4A')}
+
+# Departments accepted on transcripts even when none of their courses are in the
+# catalog (their courses are kept as read, not corrected)
+EXTRA_DEPARTMENTS = {
+    'BIO', 'BIOL', 'CS', 'HIST', 'PSYC', 'PSY', 'SOC', 'GER', 'CHIN', 'JAPN', 'COMM', 'ANTH', 'POLI', 'GEOG',
+    'ART', 'MUS', 'PE', 'EDUC', 'EDHE', 'NURS', 'ENGR', 'STAT', 'ASTRO',
+}
+
+# Candidate course codes in OCR text, loose enough to let misreads through:
+# "Csci 111", "CSC1 111", "MATH1O1", "Engl-102"
+CANDIDATE_PATTERN = re.compile(r'\b([A-Za-z0-9]{2,5}?)[- ]?([0-9OoDIlLSsBZG]{3}[A-Za-z]?)\b')
+
+SEPARATORS = re.compile(r'[\s-]')
+
+# What a real course id looks like (skips catalog placeholders like "Upper-Level Biology Placeholder")
+COURSE_ID_PATTERN = re.compile(r'^([A-Z]{2,5})(\d{3}[A-Z]?)$')
+
+
+@dataclass(frozen=True)
+class CourseMatch:
+    """A course code read from OCR text, after correction"""
+    token: str          # Text as OCR'd
+    course_id: str      # Corrected course id
+    cost: float         # Weighted edit distance between the two
+    confidence: float   # 1.0 = read exactly; lower for more or ambiguous corrections
+    in_catalog: bool    # False for courses from known departments outside the catalog
+
+
+def substitution_cost(a: str, b: str) -> float:
+    if a == b:
+        return 0.0
+    return CONFUSION_COST if frozenset((a, b)) in CONFUSABLE else 1.0
+
+
+def weighted_distance(a: str, b: str, max_cost: float = float('inf')) -> float:
+    """
+    Levenshtein distance where OCR-confusable substitutions are cheap
+
+    Args:
+        a, b: Upper-case strings
+        max_cost: Stop early and return inf once every alignment exceeds this
+
+    Returns:
+        Weighted edit distance
+    """
+    previous = [float(i) for i in range(len(b) + 1)]
+    for i, ca in enumerate(a, 1):
+        current = [float(i)]
+        for j, cb in enumerate(b, 1):
+            current.append(min(current[j - 1] + 1, previous[j] + 1, previous[j - 1] + substitution_cost(ca, cb)))
+        if min(current) > max_cost:
+            return float('inf')
+        previous = current
+    return previous[-1]
+
+
+def split_code(compact: str) -> Tuple[str, str]:
+    """Split "CSC1111" / "MATH1O1" (upper-case, no separators) into a confusion-corrected (department, number)"""
+    suffix = ''
+    # A letter after three clean digits is a suffix ("261L"); otherwise it is a misread digit ("26l")
+    if len(compact) > 5 and compact[-1].isalpha() and compact[-4:-1].isdigit():
+        compact, suffix = compact[:-1], compact[-1]
+    return compact[:-3].translate(AS_LETTER), compact[-3:].translate(AS_DIGIT) + suffix
+
+
+class CourseMatcher:
+    """
+    Maps noisy OCR course codes to valid course ids
+
+    Course ids are bucketed by number. A token is first fixed with the
+    confusion tables (letters in the department, digits in the number) and
+    looked up exactly; failing that, its department is compared by weighted
+    edit distance against only the departments offering that number, so a
+    misread department is corrected but a valid number is never rewritten
+    into a different course.
+    """
+
+    def __init__(self, course_ids: Iterable[str], departments: Iterable[str] = (), max_cost: float = 1.0):
+        """
+        Args:
+            course_ids: Valid course ids (normalized, e.g. "CSCI111")
+            departments: Extra department codes accepted without correction
+            max_cost: Largest weighted edit distance accepted as a correction
+        """
+        self.course_ids = set()
+        self.by_number = {}  # "111" -> ["CSCI", ...]
+        for course_id in course_ids:
+            parts = COURSE_ID_PATTERN.match(course_id)
+            if parts:
+                self.course_ids.add(course_id)
+                self.by_number.setdefault(parts.group(2), []).append(parts.group(1))
+        self.departments = {d for ds in self.by_number.values() for d in ds} | set(departments)
+        self.max_cost = max_cost
+        self.match = lru_cache(maxsize=8192)(self._match)
+
+    @classmethod
+    def from_catalog(cls, courses_json: str = COURSES_JSON, extra_ids: Iterable[str] = ()) -> 'CourseMatcher':
+        """
+        Build a matcher over courses.json plus any other known course ids
+
+        Args:
+            courses_json: Path to the courses JSON file
+            extra_ids: More course ids (e.g. from the requirements file)
+        """
+        with open(courses_json, 'r', encoding='utf-8') as f:
+            names = [course.get('name', '') for course in json.load(f)]
+        ids = {normalize_course_id(n) for n in names if n} | {normalize_course_id(c) for c in extra_ids}
+        return cls(ids, EXTRA_DEPARTMENTS)
+
+    def __deepcopy__(self, memo):
+        # Read-only after construction; analyzers copied per transcript can share it
+        return self
+
+    def _match(self, token: str) -> Optional[CourseMatch]:
+        """
+        Args:
+            token: One OCR'd course code
+
+        Returns:
+            Best CourseMatch, or None if nothing plausible
+        """
+        raw = SEPARATORS.sub('', token).upper()
+        department, number = split_code(raw)
+        if len(department) < 2 or not number[:3].isdigit():
+            return None
+        fixed = department + number
+
+        if fixed in self.course_ids:
+            cost = 0.0 if raw == fixed else weighted_distance(raw, fixed)
+            return CourseMatch(token, fixed, cost, self.confidence(cost, fixed), True)
+
+        # Only departments that actually offer this number (and are about as long) are candidates
+        read = raw[:len(raw) - len(number)]
+        scored = sorted(
+            (weighted_distance(read, candidate, self.max_cost), candidate)
+            for candidate in self.by_number.get(number, [])
+            if abs(len(candidate) - len(read)) <= self.max_cost
+        )
+        if scored and scored[0][0] <= self.max_cost:
+            cost, candidate = scored[0]
+            course_id = candidate + number
+            confidence = self.confidence(cost, course_id)
+            if len(scored) > 1 and scored[1][0] == cost:
+                confidence /= 2  # Two departments are equally close
+            return CourseMatch(token, course_id, cost, confidence, True)
+
+        if department in self.departments and department.isalpha():
+            cost = 0.0 if raw == fixed else weighted_distance(raw, fixed)
+            return CourseMatch(token, fixed, cost, self.confidence(cost, fixed), False)
+        return None
+
+    @staticmethod
+    def confidence(cost: float, course_id: str) -> float:
+        return round(max(0.0, 1.0 - cost / len(course_id)), 3)
+
+    def find_all(self, text: str, min_confidence: float = 0.8) -> List[CourseMatch]:
+        """
+        Every confidently matched course code in a block of OCR text
+
+        Args:
+            text: OCR output
+            min_confidence: Drop corrections below this confidence
+
+        Returns:
+            Matches in text order (duplicates included)
+        """
+        matches = []
+        for found in CANDIDATE_PATTERN.finditer(text):
+            match = self.match(found.group(0))
+            if match and match.confidence >= min_confidence:
+                matches.append(match)
+        return matches
+
+
+# Matcher over courses.json, built on first use
+default_matcher = None
+
+def get_default_matcher() -> CourseMatcher:
+    global default_matcher
+    if default_matcher is None:
+        default_matcher = CourseMatcher.from_catalog()
+    return default_matcher
+
+
+def corrections_summary(matches: List[CourseMatch]) -> Dict[str, Dict]:
+    """Tokens that were changed by correction, keyed by token"""
+    return {
+        m.token: {'course_id': m.course_id, 'confidence': m.confidence}
+        for m in matches if SEPARATORS.sub('', m.token).upper() != m.course_id
+    }
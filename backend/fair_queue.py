@@ -0,0 +1,165 @@
+import os
+import heapq
+import itertools
+import threading
+import time
+from typing import Dict, Optional
+
+import metrics
+
+QUEUE_WAIT = metrics.Histogram('llm_queue_wait_seconds', 'Time a model request waited for a slot', ['priority'])
+QUEUE_REJECTED = metrics.Counter('llm_queue_rejected_total', 'Model requests turned away by the fair queue', ['reason'])
+
+# Share of model capacity per class when both are backlogged
+PRIORITY_WEIGHTS = {'interactive': 4.0, 'background': 1.0}
+
+
+class QueueFull(Exception):
+    """The caller already has as many requests waiting as it is allowed"""
+
+
+class QueueTimeout(Exception):
+    """No slot freed up within the wait limit"""
+
+
+class Ticket:
+    """One request's place in the queue; set `cost` to the real cost before leaving"""
+    __slots__ = ('flow', 'priority', 'start', 'estimate', 'cost', 'granted', 'cancelled')
+
+    def __init__(self, flow, priority: str, start: float, estimate: float):
+        self.flow = flow
+        self.priority = priority
+        self.start = start
+        self.estimate = estimate
+        self.cost = estimate
+        self.granted = False
+        self.cancelled = False
+
+
+class FairQueue:
+    """
+    Weighted fair queue in front of the model servers (start-time fair queueing)
+
+    Each (priority, caller) pair is a flow. A request's start tag is the
+    later of the queue's virtual time and its flow's previous finish tag,
+    and its finish tag adds cost / weight, so a caller with many requests
+    queued only ever competes with its own next one, and interactive chats
+    get PRIORITY_WEIGHTS times the share of background jobs. Free slots go
+    to the smallest start tag. Costs are in generated tokens: a request is
+    queued with an estimate and its flow is charged the difference once the
+    real count is known.
+    """
+
+    def __init__(self, concurrency: int, max_waiting_per_flow: int = 4, timeout: float = 30.0,
+                 estimate: float = 256.0, weights: Dict[str, float] = None):
+        """
+        Args:
+            concurrency: Model requests in flight at once, across all callers
+            max_waiting_per_flow: Requests one caller may have waiting before new ones are refused
+            timeout: Longest wait for a slot, in seconds
+            estimate: Cost assumed for a request before its token count is known
+            weights: Share of capacity per priority class
+        """
+        self.concurrency = max(1, concurrency)
+        self.max_waiting_per_flow = max_waiting_per_flow
+        self.timeout = timeout
+        self.estimate = estimate
+        self.weights = weights or PRIORITY_WEIGHTS
+        self.cond = threading.Condition()
+        self.heap = []  # (start tag, sequence, ticket)
+        self.sequence = itertools.count()
+        self.active = 0
+        self.virtual_time = 0.0
+        self.finish_tags = {}  # Flow -> finish tag of its last request
+        self.waiting = {}  # Flow -> requests waiting
+
+    @classmethod
+    def from_env(cls) -> 'FairQueue':
+        return cls(
+            concurrency=int(os.getenv('LLM_MAX_CONCURRENCY', '8')),
+            max_waiting_per_flow=int(os.getenv('LLM_MAX_WAITING_PER_USER', '4')),
+            timeout=float(os.getenv('LLM_QUEUE_TIMEOUT', '30')),
+            estimate=float(os.getenv('LLM_COST_ESTIMATE', '256')),
+        )
+
+    def dispatch(self) -> None:
+        """Grant free slots in start-tag order (caller holds the lock)"""
+        granted = False
+        while self.active < self.concurrency and self.heap:
+            start, _, ticket = heapq.heappop(self.heap)
+            if ticket.cancelled:
+                continue
+            ticket.granted = granted = True
+            self.active += 1
+            self.virtual_time = max(self.virtual_time, start)
+            self.waiting[ticket.flow] -= 1
+            if not self.waiting[ticket.flow]:
+                del self.waiting[ticket.flow]
+        if granted:
+            self.cond.notify_all()
+
+    def acquire(self, caller: str, priority: str = 'interactive', timeout: float = None) -> Ticket:
+        """
+        Wait for a model slot
+
+        Args:
+            caller: Who the request is for (user or client key)
+            priority: Key of PRIORITY_WEIGHTS
+            timeout: Override of the queue's wait limit
+
+        Returns:
+            Ticket to pass to release()
+
+        Raises:
+            QueueFull: The caller already has max_waiting_per_flow requests waiting
+            QueueTimeout: No slot within the wait limit
+        """
+        flow = (priority, caller)
+        weight = self.weights.get(priority, 1.0)
+        queued_at = time.monotonic()
+        with self.cond:
+            if self.waiting.get(flow, 0) >= self.max_waiting_per_flow:
+                QUEUE_REJECTED.labels('full').inc()
+                raise QueueFull(f"Too many requests waiting for {caller}")
+            start = max(self.virtual_time, self.finish_tags.get(flow, 0.0))
+            ticket = Ticket(flow, priority, start, self.estimate)
+            self.finish_tags[flow] = start + self.estimate / weight
+            self.waiting[flow] = self.waiting.get(flow, 0) + 1
+            heapq.heappush(self.heap, (start, next(self.sequence), ticket))
+            self.dispatch()
+
+            deadline = queued_at + (self.timeout if timeout is None else timeout)
+            while not ticket.granted:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    ticket.cancelled = True
+                    self.waiting[flow] -= 1
+                    if not self.waiting[flow]:
+                        del self.waiting[flow]
+                    QUEUE_REJECTED.labels('timeout').inc()
+                    raise QueueTimeout(f"No model slot within {self.timeout:.0f}s")
+                self.cond.wait(remaining)
+        QUEUE_WAIT.labels(priority).observe(time.monotonic() - queued_at)
+        return ticket
+
+    def release(self, ticket: Ticket) -> None:
+        """Free the ticket's slot and charge its flow for the real cost"""
+        with self.cond:
+            self.active -= 1
+            if ticket.cost != ticket.estimate and ticket.flow in self.finish_tags:
+                weight = self.weights.get(ticket.priority, 1.0)
+                self.finish_tags[ticket.flow] += (ticket.cost - ticket.estimate) / weight
+            # Flows that are idle and caught up start at the virtual time anyway
+            if len(self.finish_tags) > 10000:
+                self.finish_tags = {f: tag for f, tag in self.finish_tags.items()
+                                    if tag > self.virtual_time or f in self.waiting}
+            self.dispatch()
+
+    def status(self) -> Dict:
+        with self.cond:
+            return {
+                'active': self.active,
+                'concurrency': self.concurrency,
+                'waiting': sum(self.waiting.values()),
+                'virtual_time': round(self.virtual_time, 3),
+            }
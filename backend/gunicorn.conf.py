@@ -0,0 +1,91 @@
+"""
+Gunicorn settings for the advisor backend
+
+    pip install gunicorn
+    cd backend && gunicorn -c gunicorn.conf.py
+
+The app is imported once in the master (preload_app), which also runs the
+schema checks, then forked into workers that share its memory
+copy-on-write. Anything that starts a thread (the LLM endpoint health
+checks, the catalog file watcher) runs per worker in post_fork, because
+threads don't survive fork.
+
+Reloading:
+    kill -HUP <master>     re-reads this file and replaces workers gracefully;
+                           with preload_app they are forked from the code the
+                           master already loaded
+    kill -USR2 <master>    starts a new master on the new code; once it is up,
+                           kill -QUIT the old master (zero-downtime deploy)
+    courses.json / requirementsDB.json edits need neither: each worker's
+    watcher rebuilds and swaps them in (see catalog_registry.py)
+
+Rate limits and the LLM fair queue are per worker: LLM_MAX_CONCURRENCY caps
+each worker, so the model servers see up to workers x that many requests.
+
+Metrics are kept per worker but reported for the whole server: each worker
+writes its values to a directory created at startup (under METRICS_DIR_BASE,
+default the system temp dir) every METRICS_FLUSH_INTERVAL seconds, and
+whichever worker answers /metrics adds up all of them, including workers
+that have exited (see metrics.py). Scrape the one bind address; there is
+no need to reach workers individually.
+"""
+import gc
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+wsgi_app = 'wsgi:app'
+bind = os.getenv('BIND', f"0.0.0.0:{os.getenv('PORT', '5000')}")
+
+# Streaming (SSE) responses hold a thread each while the model generates,
+# so workers are threaded rather than one request at a time
+workers = int(os.getenv('WEB_CONCURRENCY', min(2 * multiprocessing.cpu_count() + 1, 4)))
+worker_class = 'gthread'
+threads = int(os.getenv('WEB_THREADS', '8'))
+
+preload_app = True
+
+# Worker heartbeat, not a request limit (gthread workers heartbeat between requests)
+timeout = 120
+# Let in-flight streams finish when workers are replaced
+graceful_timeout = int(os.getenv('GRACEFUL_TIMEOUT', '60'))
+keepalive = 5
+
+# Recycle workers now and then so slow leaks can't accumulate
+max_requests = int(os.getenv('MAX_REQUESTS', '2000'))
+max_requests_jitter = 200
+
+accesslog = '-'
+
+
+def on_starting(server):
+    # A fresh directory per master, so an old master still draining after USR2 keeps its own
+    base = os.getenv('METRICS_DIR_BASE') or tempfile.gettempdir()
+    os.environ['METRICS_DIR'] = tempfile.mkdtemp(prefix='advisor-metrics-', dir=base)
+
+
+def when_ready(server):
+    # Everything the master has allocated so far is long-lived; freezing it keeps
+    # the workers' garbage collections from writing to (and un-sharing) those pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from app import start_worker
+    start_worker()
+
+
+def worker_exit(server, worker):
+    # Last snapshot, so requests served since the previous flush are still counted
+    import metrics
+    metrics.write_snapshot()
+
+
+def child_exit(server, worker):
+    import metrics
+    metrics.retire_worker(worker.pid)
+
+
+def on_exit(server):
+    shutil.rmtree(os.environ.get('METRICS_DIR', ''), ignore_errors=True)
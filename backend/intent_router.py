@@ -0,0 +1,240 @@
+import re
+import math
+from collections import Counter
+from typing import List, Dict, Optional, Tuple
+
+from catalog import CourseCatalog
+import metrics
+
+ROUTED_PROMPTS = metrics.Counter('advisor_routed_prompts_total', 'Prompts answered without the LLM', ['intent'])
+
+# Course mentions like "Csci 311", "CSCI311", "math-261"
+COURSE_MENTION = re.compile(r'\b([A-Za-z]{2,5})[\s-]*(\d{3}[A-Za-z]?)\b')
+
+# High-precision patterns, checked in order; a match decides the intent on its own.
+# "unlocks" goes first so "what is X a prerequisite for" is not read as a prerequisite question.
+INTENT_PATTERNS = [
+    ('unlocks', re.compile(r'\b(unlock|open(s)? up|lead(s)? to|after (taking|finishing|completing)|'
+                           r'prerequisite for|can i take after|eligible for after)\b', re.IGNORECASE)),
+    ('prerequisites', re.compile(r'\b(pre-?req(uisite)?s?|required before|need(ed)? (to take )?before|'
+                                 r'take before|requirements? for taking)\b', re.IGNORECASE)),
+    ('credits', re.compile(r'\b(how many (credits?|hours|credit hours)|credit hours?)\b', re.IGNORECASE)),
+    ('description', re.compile(r'\b(what is .* about|describe|description of|what does .* cover|'
+                               r'what will i learn)\b', re.IGNORECASE)),
+]
+
+# Only a prompt that names one course and asks one thing about it is answered from the catalog.
+# A second clause or sentence means a second question, so the lookup would answer only part of it.
+CLAUSE_BREAK = re.compile(r'[,;:]|[.?!]\s+\w|\b(and|or|but|if|because|since|so|then|also|while|whereas|'
+                          r'now that|than|versus|vs)\b', re.IGNORECASE)
+# Questions asking for a reason, a choice, a comparison or a requirement check are not lookups,
+# even when they also mention prerequisites or credits.
+NOT_A_LOOKUP = re.compile(r'\b(why|how come|whether|which|should|could|would|compared?|comparison|'
+                          r'better|worse|easier|harder|count(s|ed)? towards?|satisf(y|ies)|fulfill?s?)\b',
+                          re.IGNORECASE)
+
+# Tiny training set for the fallback classifier; "open" means hand off to the LLM
+TRAINING_EXAMPLES = {
+    'prerequisites': [
+        "what do i need before taking this class",
+        "what are the requirements to enroll in this course",
+        "what classes should i have finished first",
+        "which courses must i complete before this one",
+        "can i take this without taking anything else first",
+    ],
+    'unlocks': [
+        "what classes can i take next after this",
+        "what does this course let me take",
+        "which courses come after this one",
+        "what can i enroll in once i pass this",
+        "what is the next course in the sequence",
+    ],
+    'credits': [
+        "how many hours is this class",
+        "how much credit do i get for this course",
+        "how many credits does this count for",
+        "is this a three hour course",
+    ],
+    'description': [
+        "what is this class about",
+        "tell me about this course",
+        "what topics does this course cover",
+        "what will we learn in this class",
+        "explain what this course is",
+    ],
+    'open': [
+        "plan my remaining semesters",
+        "make me a four year plan",
+        "which electives would be best for a data science career",
+        "should i take this class or that one next semester",
+        "how can i graduate early",
+        "i am struggling in this class what should i do",
+        "is this a good schedule for me",
+        "which emphasis should i pick",
+        "help me choose between these courses",
+    ],
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case words with course codes removed"""
+    return re.findall(r'[a-z]+', COURSE_MENTION.sub(' ', text.lower()))
+
+
+class IntentClassifier:
+    """Multinomial naive Bayes over words; small enough to train at import time"""
+
+    def __init__(self, examples: Dict[str, List[str]]):
+        self.word_counts = {}
+        self.totals = {}
+        self.priors = {}
+        vocabulary = set()
+        total_examples = sum(len(v) for v in examples.values())
+        for intent, sentences in examples.items():
+            counts = Counter(w for s in sentences for w in tokenize(s))
+            self.word_counts[intent] = counts
+            self.totals[intent] = sum(counts.values())
+            self.priors[intent] = math.log(len(sentences) / total_examples)
+            vocabulary.update(counts)
+        self.vocabulary_size = len(vocabulary)
+
+    def classify(self, text: str) -> Tuple[str, float]:
+        """
+        Args:
+            text: User prompt
+
+        Returns:
+            (intent, probability of that intent)
+        """
+        words = tokenize(text)
+        scores = {}
+        for intent, counts in self.word_counts.items():
+            denominator = self.totals[intent] + self.vocabulary_size
+            scores[intent] = self.priors[intent] + sum(math.log((counts[w] + 1) / denominator) for w in words)
+        best = max(scores, key=scores.get)
+        # Softmax over log scores for a confidence value
+        peak = scores[best]
+        norm = sum(math.exp(s - peak) for s in scores.values())
+        return best, 1.0 / norm
+
+
+classifier = IntentClassifier(TRAINING_EXAMPLES)
+
+
+def mentioned_courses(text: str, catalog: CourseCatalog) -> List[Dict]:
+    """Catalog courses mentioned in the text, in order, without duplicates"""
+    found = []
+    seen = set()
+    for dept, number in COURSE_MENTION.findall(text):
+        course = catalog.get(f"{dept}{number}")
+        if course and course['id'] not in seen:
+            seen.add(course['id'])
+            found.append(course)
+    return found
+
+
+def is_single_lookup(text: str) -> bool:
+    """True if the prompt names exactly one course and asks one plain question about it"""
+    if len({(dept.upper(), number.upper()) for dept, number in COURSE_MENTION.findall(text)}) != 1:
+        return False
+    # Check the wording around the course, so the code itself can't look like a sentence break
+    wording = COURSE_MENTION.sub(' course ', text)
+    return not (CLAUSE_BREAK.search(wording) or NOT_A_LOOKUP.search(wording))
+
+
+def classify_intent(text: str, min_confidence: float = 0.6) -> Optional[str]:
+    """
+    Decide whether a prompt is a catalog lookup
+
+    Args:
+        text: User prompt
+        min_confidence: Classifier probability needed when no pattern matches
+
+    Returns:
+        Intent name, or None if the prompt should go to the LLM
+    """
+    if not is_single_lookup(text):
+        return None
+    for intent, pattern in INTENT_PATTERNS:
+        if pattern.search(text):
+            return intent
+    intent, confidence = classifier.classify(text)
+    if intent == 'open' or confidence < min_confidence:
+        return None
+    return intent
+
+
+def course_label(catalog: CourseCatalog, course_id: str) -> str:
+    course = catalog.course_map.get(course_id)
+    if course:
+        return course['name']
+    # Not in the catalog; at least print it the way the catalog spells names ("Engl 101")
+    match = re.match(r'([A-Z]+)(\d.*)', course_id)
+    return f"{match.group(1).capitalize()} {match.group(2)}" if match else course_id
+
+
+def answer_prerequisites(course: Dict, catalog: CourseCatalog) -> str:
+    groups = catalog.prerequisite_groups.get(course['id'], [])
+    if not groups:
+        return f"{course['name']} has no prerequisites."
+    parts = [" or ".join(course_label(catalog, c) for c in group) for group in groups]
+    if len(parts) == 1:
+        return f"{course['name']} requires {parts[0]}."
+    if len(parts) == 2:
+        return f"{course['name']} requires {parts[0]} and {parts[1]}."
+    return f"{course['name']} requires " + ", ".join(parts[:-1]) + f", and {parts[-1]}."
+
+
+def answer_unlocks(course: Dict, catalog: CourseCatalog) -> str:
+    unlocked = catalog.unlocks.get(course['id'], [])
+    if not unlocked:
+        return f"{course['name']} is not a prerequisite for any course in the catalog."
+    names = ", ".join(course_label(catalog, c) for c in unlocked)
+    return f"{course['name']} is a prerequisite for: {names}."
+
+
+def answer_credits(course: Dict, catalog: CourseCatalog) -> str:
+    return f"{course['name']} is worth {course['credits']} credit hours."
+
+
+def answer_description(course: Dict, catalog: CourseCatalog) -> str:
+    if not course['description']:
+        return f"There is no catalog description for {course['name']}."
+    return f"{course['name']}: {course['description']}"
+
+
+ANSWERS = {
+    'prerequisites': answer_prerequisites,
+    'unlocks': answer_unlocks,
+    'credits': answer_credits,
+    'description': answer_description,
+}
+
+
+def route_prompt(prompt_text: str, catalog: CourseCatalog) -> Optional[Dict]:
+    """
+    Answer catalog questions directly from indexed data
+
+    Args:
+        prompt_text: The user's question
+        catalog: Loaded course catalog
+
+    Returns:
+        Response dictionary shaped like process_prompt's, or None to fall back to the LLM
+    """
+    courses = mentioned_courses(prompt_text, catalog)
+    if len(courses) != 1:
+        return None
+    intent = classify_intent(prompt_text)
+    if intent is None:
+        return None
+
+    answer = ANSWERS[intent](courses[0], catalog)
+    ROUTED_PROMPTS.labels(intent).inc()
+    return {
+        'response': answer,
+        'reasoning': '',
+        'original_prompt': prompt_text,
+        'intent': intent,
+        'source': 'catalog'
+    }
@@ -0,0 +1,301 @@
+import os
+import time
+import random
+import threading
+from typing import List, Tuple, Optional
+
+import metrics
+
+# openai takes about a third of a second to import, so it is loaded with the first Endpoint
+
+
+def retryable_errors() -> tuple:
+    """Errors that mean "this replica is unreachable" - safe to retry elsewhere"""
+    import openai
+    return (openai.APIConnectionError,)
+
+
+def timeout_errors() -> tuple:
+    """Connection errors not worth retrying: the request already used its whole timeout"""
+    import openai
+    return (openai.APITimeoutError,)
+
+
+def failure_errors() -> tuple:
+    """Errors that count against a replica's circuit breaker"""
+    import openai
+    return (openai.APIConnectionError, openai.InternalServerError)
+
+ENDPOINT_FAILURES = metrics.Counter('llm_endpoint_failures_total', 'Failed calls per model endpoint', ['endpoint'])
+ENDPOINT_RETRIES = metrics.Counter('llm_retries_total', 'Chat requests retried on another replica')
+LLM_WARMUP_LATENCY = metrics.Histogram('llm_warmup_seconds', 'Prefix-cache warm-up request time per endpoint')
+
+
+class NoEndpointAvailable(Exception):
+    """Raised when every model endpoint is down, open-circuited or already tried"""
+
+
+class Endpoint:
+    """One OpenAI-compatible model server"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, host: str, port: int, api_key: str, timeout: float = 120.0):
+        import openai
+        self.host = host
+        self.port = port
+        self.name = f"{host}:{port}"
+        self.client = openai.Client(base_url=f"http://{host}:{port}/v1", api_key=api_key or "none",
+                                    timeout=timeout, max_retries=0)
+        self.model_name = None
+        self.outstanding = 0
+        self.healthy = True
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.trial_in_flight = False
+        self.warmed = False
+
+    def fetch_model_name(self, timeout: float = None) -> str:
+        client = self.client.with_options(timeout=timeout) if timeout else self.client
+        with metrics.timed(metrics.LLM_MODELS_LIST_LATENCY):
+            self.model_name = client.models.list().data[0].id
+        return self.model_name
+
+    def to_dict(self) -> dict:
+        return {
+            'endpoint': self.name,
+            'model': self.model_name,
+            'healthy': self.healthy,
+            'state': self.state,
+            'outstanding': self.outstanding,
+            'consecutive_failures': self.consecutive_failures,
+        }
+
+
+class Lease:
+    """One request's hold on an endpoint; pass it back to EndpointPool.release()"""
+    __slots__ = ('endpoint', 'trial')
+
+    def __init__(self, endpoint: Endpoint, trial: bool):
+        self.endpoint = endpoint
+        self.trial = trial  # The single request that decides whether a half-open breaker closes
+
+
+class EndpointPool:
+    """
+    Least-outstanding-requests balancer over several model servers
+
+    Each endpoint has a circuit breaker: after `failure_threshold`
+    consecutive failures it is skipped for `cooldown` seconds, then a
+    single trial request decides whether it closes again. A background
+    thread polls /v1/models to mark endpoints healthy or unhealthy.
+    """
+
+    def __init__(self, endpoints: List[Endpoint], failure_threshold: int = 3, cooldown: float = 30.0,
+                 max_attempts: int = 3, health_interval: float = 10.0):
+        if not endpoints:
+            raise ValueError("EndpointPool needs at least one endpoint")
+        self.endpoints = endpoints
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_attempts = max_attempts
+        self.health_interval = health_interval
+        self.lock = threading.Lock()
+        self.health_thread = None
+        self.stop_event = threading.Event()
+        self.warmup_messages = None  # Sent to each endpoint when it becomes healthy
+
+    @classmethod
+    def from_env(cls, api_key: str) -> 'EndpointPool':
+        """
+        Build a pool from LLM_ENDPOINTS ("host:port,host:port"), falling back to LLM_HOST/LLM_PORT
+
+        Args:
+            api_key: API key sent to every endpoint
+
+        Returns:
+            EndpointPool (health checks not started)
+        """
+        spec = os.getenv("LLM_ENDPOINTS")
+        if spec:
+            addresses = []
+            for item in spec.split(','):
+                host, _, port = item.strip().rpartition(':')
+                addresses.append((host, int(port)))
+        else:
+            addresses = [(os.getenv("LLM_HOST", "172.30.80.17"), int(os.getenv("LLM_PORT", "50001")))]
+        return cls(
+            [Endpoint(host, port, api_key) for host, port in addresses],
+            failure_threshold=int(os.getenv("LLM_FAILURE_THRESHOLD", "3")),
+            cooldown=float(os.getenv("LLM_CIRCUIT_COOLDOWN", "30")),
+            max_attempts=int(os.getenv("LLM_MAX_ATTEMPTS", "3")),
+            health_interval=float(os.getenv("LLM_HEALTH_INTERVAL", "10")),
+        )
+
+    def available(self, endpoint: Endpoint, now: float) -> bool:
+        """Whether the breaker lets a request through (caller holds the lock)"""
+        if endpoint.state == Endpoint.OPEN:
+            if now < endpoint.open_until:
+                return False
+            endpoint.state = Endpoint.HALF_OPEN
+        if endpoint.state == Endpoint.HALF_OPEN:
+            return not endpoint.trial_in_flight
+        return endpoint.healthy
+
+    def acquire(self, exclude=()) -> Optional[Lease]:
+        """
+        Lease the available endpoint with the fewest in-flight requests
+
+        Args:
+            exclude: Endpoints already tried for this request
+
+        Returns:
+            Lease on an endpoint (its outstanding count incremented), or None
+        """
+        now = time.monotonic()
+        with self.lock:
+            candidates = [e for e in self.endpoints if e not in exclude and self.available(e, now)]
+            if not candidates:
+                # Health checks can be wrong; rather than fail outright, try closed-circuit endpoints anyway
+                candidates = [e for e in self.endpoints if e not in exclude and e.state == Endpoint.CLOSED]
+            if not candidates:
+                return None
+            fewest = min(e.outstanding for e in candidates)
+            endpoint = random.choice([e for e in candidates if e.outstanding == fewest])
+            endpoint.outstanding += 1
+            trial = endpoint.state == Endpoint.HALF_OPEN
+            if trial:
+                endpoint.trial_in_flight = True
+            return Lease(endpoint, trial)
+
+    def release(self, lease: Lease, error: Exception = None) -> None:
+        """
+        Return a lease and update the breaker with the outcome
+
+        Only the trial request moves a half-open breaker; requests that were
+        already in flight when the breaker opened don't close or re-open it.
+        """
+        endpoint = lease.endpoint
+        with self.lock:
+            endpoint.outstanding -= 1
+            if lease.trial:
+                endpoint.trial_in_flight = False
+            if error is None or not isinstance(error, failure_errors()):
+                if lease.trial:
+                    endpoint.state = Endpoint.CLOSED
+                if endpoint.state == Endpoint.CLOSED:
+                    endpoint.consecutive_failures = 0
+                return
+            endpoint.consecutive_failures += 1
+            if lease.trial or (endpoint.state == Endpoint.CLOSED
+                               and endpoint.consecutive_failures >= self.failure_threshold):
+                endpoint.state = Endpoint.OPEN
+                endpoint.open_until = time.monotonic() + self.cooldown
+        ENDPOINT_FAILURES.labels(endpoint.name).inc()
+
+    def create_chat_completion(self, **kwargs) -> Tuple[Lease, object]:
+        """
+        Start a chat completion, retrying unreachable replicas on another endpoint
+
+        The returned lease keeps the endpoint counted as outstanding until the
+        caller passes it to release(), so streamed responses hold their slot.
+        Timeouts are not retried: each attempt may take the endpoint's full
+        timeout, and the caller is still waiting.
+
+        Args:
+            **kwargs: Arguments for chat.completions.create (model is filled in)
+
+        Returns:
+            (lease, response)
+        """
+        tried = []
+        last_error = None
+        for attempt in range(self.max_attempts):
+            lease = self.acquire(tried)
+            if lease is None:
+                break
+            endpoint = lease.endpoint
+            if attempt:
+                ENDPOINT_RETRIES.inc()
+            try:
+                if endpoint.model_name is None:
+                    endpoint.fetch_model_name()
+                response = endpoint.client.chat.completions.create(model=endpoint.model_name, **kwargs)
+                return lease, response
+            except timeout_errors() as e:
+                self.release(lease, e)
+                raise
+            except retryable_errors() as e:
+                self.release(lease, e)
+                tried.append(endpoint)
+                last_error = e
+            except Exception as e:
+                self.release(lease, e)
+                raise
+        raise NoEndpointAvailable(f"No model endpoint available (tried {[e.name for e in tried]})") from last_error
+
+    def warm_up_endpoint(self, endpoint: Endpoint, messages: List[dict]) -> bool:
+        """
+        Send a one-token request so the server caches the KV state of `messages`
+
+        Later requests starting with the same messages skip most of their prefill.
+        """
+        try:
+            if endpoint.model_name is None:
+                endpoint.fetch_model_name()
+            with metrics.timed(LLM_WARMUP_LATENCY):
+                endpoint.client.chat.completions.create(
+                    model=endpoint.model_name,
+                    messages=messages + [{"role": "user", "content": "Hello"}],
+                    max_tokens=1,
+                    temperature=0.0,
+                )
+            return True
+        except Exception as e:
+            print(f"[WARNING] Warm-up failed for {endpoint.name}: {e}")
+            return False
+
+    def warm_up(self, messages: List[dict]) -> None:
+        """Prime every endpoint's prefix cache with `messages`"""
+        for endpoint in self.endpoints:
+            self.warm_up_endpoint(endpoint, messages)
+
+    def check_health(self) -> None:
+        """Poll /v1/models on every endpoint once, warming up endpoints that just came up"""
+        for endpoint in self.endpoints:
+            try:
+                endpoint.fetch_model_name(timeout=min(5.0, self.health_interval))
+                healthy = True
+            except Exception:
+                healthy = False
+            if healthy and self.warmup_messages and not endpoint.warmed:
+                endpoint.warmed = self.warm_up_endpoint(endpoint, self.warmup_messages)
+            elif not healthy:
+                # A restarted server comes back with an empty cache
+                endpoint.warmed = False
+            with self.lock:
+                endpoint.healthy = healthy
+                # A recovered server may skip the rest of its cooldown and take a trial request
+                if healthy and endpoint.state == Endpoint.OPEN:
+                    endpoint.open_until = 0.0
+
+    def start_health_checks(self) -> 'EndpointPool':
+        """Start the background health-check thread (idempotent)"""
+        if self.health_thread is None and self.health_interval > 0:
+            def loop():
+                while not self.stop_event.is_set():
+                    self.check_health()
+                    self.stop_event.wait(self.health_interval)
+            self.health_thread = threading.Thread(target=loop, name='llm-health-check', daemon=True)
+            self.health_thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+    def status(self) -> List[dict]:
+        with self.lock:
+            return [e.to_dict() for e in self.endpoints]
@@ -0,0 +1,324 @@
+import os
+import glob
+import json
+import time
+import threading
+from contextlib import contextmanager
+from typing import List, Tuple, Sequence, Dict
+
+# Latency buckets in seconds; wide enough to cover SQL queries through full LLM generations
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# Every metric registers itself here on creation
+REGISTRY = []
+
+
+def format_labels(labelnames: Sequence[str], labelvalues: Sequence[str], extra: str = '') -> str:
+    """Render a Prometheus label set like {method="GET",status="200"}"""
+    parts = []
+    for name, value in zip(labelnames, labelvalues):
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{name}="{value}"')
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Base class for a labelled metric family"""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.children = {}
+        self.lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def labels(self, *labelvalues):
+        """Return the child for a set of label values, creating it on first use"""
+        child = self.children.get(labelvalues)
+        if child is None:
+            with self.lock:
+                child = self.children.setdefault(labelvalues, self.new_child())
+        return child
+
+    def new_child(self):
+        raise NotImplementedError
+
+    def load_child(self, values):
+        """Child holding values from snapshot()"""
+        child = self.new_child()
+        child.merge(values)
+        return child
+
+    def snapshot(self) -> list:
+        """[[label values, child values], ...] in a JSON-serializable form"""
+        return [[list(labelvalues), child.snapshot()] for labelvalues, child in list(self.children.items())]
+
+    def render(self, children: Dict = None) -> List[str]:
+        """Exposition lines for this metric's own children, or for `children` merged from several processes"""
+        children = self.children if children is None else children
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for labelvalues, child in sorted(children.items()):
+            lines.extend(child.render(self.name, self.labelnames, labelvalues))
+        return lines
+
+
+class CounterChild:
+    def __init__(self):
+        self.value = 0.0
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self.lock:
+            self.value += amount
+
+    def snapshot(self) -> float:
+        return self.value
+
+    def merge(self, value: float) -> None:
+        self.value += value
+
+    def render(self, name, labelnames, labelvalues):
+        return [f"{name}{format_labels(labelnames, labelvalues)} {format_value(self.value)}"]
+
+
+class Counter(Metric):
+    """Monotonically increasing total"""
+
+    kind = 'counter'
+
+    def new_child(self):
+        return CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increment the unlabelled counter"""
+        self.labels().inc(amount)
+
+
+class HistogramChild:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        # Buckets are few, so a linear scan beats bisect's call overhead
+        with self.lock:
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+                    break
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {'counts': list(self.counts), 'sum': self.sum, 'count': self.count}
+
+    def merge(self, values: dict) -> None:
+        # Buckets are fixed in code, so processes running the same code agree on them
+        if len(values['counts']) == len(self.counts):
+            self.counts = [a + b for a, b in zip(self.counts, values['counts'])]
+        self.sum += values['sum']
+        self.count += values['count']
+
+    def render(self, name, labelnames, labelvalues):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            le = format_labels(labelnames, labelvalues, f'le="{format_value(bound)}"')
+            lines.append(f"{name}_bucket{le} {cumulative}")
+        le = format_labels(labelnames, labelvalues, 'le="+Inf"')
+        lines.append(f"{name}_bucket{le} {self.count}")
+        labels = format_labels(labelnames, labelvalues)
+        lines.append(f"{name}_sum{labels} {format_value(self.sum)}")
+        lines.append(f"{name}_count{labels} {self.count}")
+        return lines
+
+
+class Histogram(Metric):
+    """Distribution of observed values in fixed buckets"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def new_child(self):
+        return HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        """Record a value on the unlabelled histogram"""
+        self.labels().observe(value)
+
+
+@contextmanager
+def timed(histogram: Histogram, *labelvalues):
+    """Observe the wall time of a with-block on a histogram"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.labels(*labelvalues).observe(time.perf_counter() - start)
+
+
+def snapshot() -> Dict[str, list]:
+    """This process's values of every registered metric"""
+    return {metric.name: metric.snapshot() for metric in REGISTRY}
+
+
+# Multi-process mode (gunicorn): with METRICS_DIR set, each worker keeps a snapshot of its
+# metrics in METRICS_DIR/<pid>.json, refreshed every METRICS_FLUSH_INTERVAL seconds and on
+# exit, and /metrics on any worker adds up every file. The master folds the files of exited
+# workers into retired.json, so totals never go backwards when workers are recycled.
+RETIRED = 'retired.json'
+
+
+def metrics_dir():
+    return os.getenv('METRICS_DIR')
+
+
+@contextmanager
+def locked(directory: str, exclusive: bool):
+    """Hold the directory lock: shared while reading snapshots, exclusive while retiring a worker"""
+    import fcntl
+    with open(os.path.join(directory, '.lock'), 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def write_json_atomic(path: str, data) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, separators=(',', ':'))
+    os.replace(tmp, path)
+
+
+def write_snapshot(directory: str = None) -> None:
+    """Publish this process's metrics to the shared directory (no-op outside multi-process mode)"""
+    directory = directory or metrics_dir()
+    if directory:
+        write_json_atomic(os.path.join(directory, f"{os.getpid()}.json"), snapshot())
+
+
+def read_snapshot(path: str) -> Dict[str, list]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def merge_snapshots(snapshots) -> Dict[str, Dict[tuple, object]]:
+    """Sum snapshots into {metric name: {label values: child}} for the registered metrics"""
+    by_name = {metric.name: metric for metric in REGISTRY}
+    merged = {}
+    for data in snapshots:
+        for name, children in data.items():
+            metric = by_name.get(name)
+            if metric is None:
+                continue
+            target = merged.setdefault(name, {})
+            for labelvalues, values in children:
+                key = tuple(labelvalues)
+                if key in target:
+                    target[key].merge(values)
+                else:
+                    target[key] = metric.load_child(values)
+    return merged
+
+
+def retire_worker(pid: int, directory: str = None) -> None:
+    """Fold an exited worker's snapshot into retired.json (run by the master)"""
+    directory = directory or metrics_dir()
+    path = os.path.join(directory or '', f"{pid}.json")
+    if not directory or not os.path.exists(path):
+        return
+    with locked(directory, exclusive=True):
+        retired_path = os.path.join(directory, RETIRED)
+        merged = merge_snapshots([read_snapshot(retired_path), read_snapshot(path)])
+        write_json_atomic(retired_path, {name: [[list(k), child.snapshot()] for k, child in children.items()]
+                                         for name, children in merged.items()})
+        os.remove(path)
+
+
+def start_flusher(interval: float = None) -> None:
+    """Refresh this process's snapshot in the background (no-op outside multi-process mode)"""
+    directory = metrics_dir()
+    if not directory:
+        return
+    interval = interval or float(os.getenv('METRICS_FLUSH_INTERVAL', '5'))
+
+    def loop():
+        while True:
+            write_snapshot(directory)
+            time.sleep(interval)
+    threading.Thread(target=loop, name='metrics-flush', daemon=True).start()
+
+
+def render_metrics() -> str:
+    """
+    Render every registered metric in the Prometheus text exposition format
+
+    In multi-process mode the values are the sum over every worker, live and
+    exited; other workers' values are at most METRICS_FLUSH_INTERVAL old.
+    """
+    directory = metrics_dir()
+    merged = None
+    if directory:
+        write_snapshot(directory)
+        with locked(directory, exclusive=False):
+            merged = merge_snapshots(read_snapshot(path) for path in glob.glob(os.path.join(directory, '*.json')))
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render(None if merged is None else merged.get(metric.name, {})))
+    return "\n".join(lines) + "\n"
+
+
+# HTTP
+REQUEST_LATENCY = Histogram('http_request_duration_seconds', 'Flask request latency',
+                            ['method', 'endpoint', 'status'])
+
+# Database
+SQL_LATENCY = Histogram('db_query_duration_seconds', 'SQL statement execution time', ['statement'])
+
+# LLM
+LLM_MODELS_LIST_LATENCY = Histogram('llm_models_list_seconds', 'Time spent in models.list() when connecting')
+LLM_TIME_TO_FIRST_TOKEN = Histogram('llm_time_to_first_token_seconds',
+                                    'Time from chat request to first streamed delta (prefill + queueing)')
+LLM_GENERATION_LATENCY = Histogram('llm_generation_seconds', 'Total streamed chat completion time')
+LLM_TOKENS_PER_SECOND = Histogram('llm_completion_tokens_per_second', 'Completion tokens per second after the first token',
+                                  buckets=(1, 5, 10, 20, 30, 50, 75, 100, 150, 200, 500))
+LLM_PROMPT_TOKENS = Counter('llm_prompt_tokens_total', 'Prompt tokens sent to the model')
+LLM_COMPLETION_TOKENS = Counter('llm_completion_tokens_total', 'Completion tokens generated by the model')
+LLM_ERRORS = Counter('llm_errors_total', 'Failed chat completions')
+LLM_CANCELLED = Counter('llm_cancelled_total', 'Streamed completions abandoned because the client disconnected')
+
+# OCR
+OCR_PAGE_LATENCY = Histogram('ocr_page_seconds',
+                             'EasyOCR recognition time per PDF page (batched engine: the page share of its batches)')
+OCR_BATCH_LATENCY = Histogram('ocr_batch_seconds', 'EasyOCR readtext_batched time per image batch')
+OCR_PAGES = Counter('ocr_pages_total', 'PDF pages processed by OCR')
+OCR_PREPROCESS_LATENCY = Histogram('ocr_preprocess_seconds', 'Grayscale, deskew and region detection time per page')
+OCR_PIXELS = Counter('ocr_pixels_total', 'Pixels rendered (page) and sent to recognition (recognized)', ['stage'])
+
+# Degree progress
+PROGRESS_REFRESHES = Counter('advisor_progress_refreshes_total', 'Degree progress snapshots recomputed', ['reason'])
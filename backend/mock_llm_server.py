@@ -0,0 +1,208 @@
+"""
+Stand-in OpenAI-compatible model server for local load testing
+
+Speaks GET /v1/models and POST /v1/chat/completions (streaming and not),
+including reasoning_content deltas and stream usage, with a simple latency
+model: time to first token grows with prompt length, tokens arrive at a
+fixed rate, and at most --max-concurrency generations run at once (further
+requests queue, like a saturated model server).
+
+Run from backend/:
+    python mock_llm_server.py --port 50001 --ttft 0.3 --tokens-per-second 40
+then point the app at it with LLM_HOST=127.0.0.1 LLM_PORT=50001.
+"""
+import json
+import time
+import argparse
+import threading
+from dataclasses import dataclass
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+MODEL_ID = "mock-advisor"
+
+
+@dataclass
+class MockConfig:
+    """Latency and output shape of the stand-in model"""
+    ttft: float = 0.0  # Fixed time to first token in seconds
+    prefill_per_token: float = 0.0  # Extra prefill seconds per prompt token
+    tokens_per_second: float = 0.0  # Decode rate; 0 streams as fast as possible
+    reasoning_tokens: int = 20
+    answer_tokens: int = 40
+    max_concurrency: int = 0  # Simultaneous generations; 0 means unlimited
+
+
+def completion_chunk(completion_id: str, delta: dict, finish_reason=None, usage=None) -> dict:
+    """Build one chat.completion.chunk object"""
+    chunk = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": MODEL_ID,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}] if delta is not None else [],
+    }
+    if usage is not None:
+        chunk["usage"] = usage
+    return chunk
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    """Minimal OpenAI-compatible /v1/models and /v1/chat/completions"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        # Keep benchmark output clean
+        pass
+
+    def send_json(self, payload: dict, status: int = 200) -> None:
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip('/') == "/v1/models":
+            self.send_json({"object": "list", "data": [
+                {"id": MODEL_ID, "object": "model", "created": 0, "owned_by": "mock"}
+            ]})
+        else:
+            self.send_json({"error": "not found"}, 404)
+
+    def do_POST(self):
+        if self.path.rstrip('/') != "/v1/chat/completions":
+            self.send_json({"error": "not found"}, 404)
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if self.server.slots is None:
+            self.complete(request)
+        else:
+            with self.server.slots:
+                self.complete(request)
+
+    def complete(self, request: dict) -> None:
+        """Answer one chat completion request following the server's MockConfig"""
+        config = self.server.config
+        prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in request.get("messages", []))
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": config.reasoning_tokens + config.answer_tokens,
+            "total_tokens": prompt_tokens + config.reasoning_tokens + config.answer_tokens,
+        }
+        completion_id = f"chatcmpl-{int(time.time() * 1000)}"
+        token_delay = 1.0 / config.tokens_per_second if config.tokens_per_second > 0 else 0.0
+
+        # Prefill
+        prefill = config.ttft + config.prefill_per_token * prompt_tokens
+        if prefill > 0:
+            time.sleep(prefill)
+
+        if not request.get("stream"):
+            if token_delay:
+                time.sleep(token_delay * config.answer_tokens)
+            self.send_json({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": MODEL_ID,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": " ".join(["summary"] * config.answer_tokens)},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage,
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        def send_event(payload):
+            self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode('utf-8'))
+            self.wfile.flush()
+
+        def send_token(delta):
+            send_event(completion_chunk(completion_id, delta))
+            if token_delay:
+                time.sleep(token_delay)
+
+        send_event(completion_chunk(completion_id, {"role": "assistant", "content": ""}))
+        for i in range(config.reasoning_tokens):
+            send_token({"reasoning_content": f"think{i} "})
+        for i in range(config.answer_tokens):
+            send_token({"content": f"word{i} "})
+        send_event(completion_chunk(completion_id, {}, finish_reason="stop"))
+        if (request.get("stream_options") or {}).get("include_usage"):
+            send_event(completion_chunk(completion_id, None, usage=usage))
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+
+def make_mock_server(host: str = "127.0.0.1", port: int = 0, config: MockConfig = None) -> ThreadingHTTPServer:
+    """
+    Create (but do not start) a mock server
+
+    Args:
+        host: Interface to bind
+        port: Port to bind (0 picks a free port)
+        config: Latency model (defaults to instant responses)
+
+    Returns:
+        ThreadingHTTPServer; its bound port is server.server_address[1]
+    """
+    server = ThreadingHTTPServer((host, port), MockLLMHandler)
+    server.daemon_threads = True
+    server.config = config or MockConfig()
+    server.slots = threading.BoundedSemaphore(server.config.max_concurrency) if server.config.max_concurrency > 0 else None
+    return server
+
+
+def start_mock_server(host: str = "127.0.0.1", port: int = 0, config: MockConfig = None) -> ThreadingHTTPServer:
+    """Start a mock server on a background thread and return it"""
+    server = make_mock_server(host, port, config)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in OpenAI-compatible model server")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=50001)
+    parser.add_argument('--ttft', type=float, default=0.2, help="Fixed time to first token (seconds)")
+    parser.add_argument('--prefill-per-token', type=float, default=0.0,
+                        help="Additional prefill seconds per prompt token")
+    parser.add_argument('--tokens-per-second', type=float, default=40.0, help="Decode rate per request")
+    parser.add_argument('--reasoning-tokens', type=int, default=50)
+    parser.add_argument('--answer-tokens', type=int, default=200)
+    parser.add_argument('--max-concurrency', type=int, default=8,
+                        help="Generations served at once; extra requests queue (0 = unlimited)")
+    args = parser.parse_args()
+
+    config = MockConfig(
+        ttft=args.ttft,
+        prefill_per_token=args.prefill_per_token,
+        tokens_per_second=args.tokens_per_second,
+        reasoning_tokens=args.reasoning_tokens,
+        answer_tokens=args.answer_tokens,
+        max_concurrency=args.max_concurrency,
+    )
+    server = make_mock_server(args.host, args.port, config)
+    print(f"[INFO] Mock model '{MODEL_ID}' listening on http://{args.host}:{server.server_address[1]}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
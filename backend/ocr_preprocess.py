@@ -0,0 +1,200 @@
+import os
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+import numpy as np
+from PIL import Image
+
+# Render resolution for OCR; transcript text stays legible to EasyOCR well below pdf2image's 200 DPI default
+OCR_DPI = int(os.getenv('OCR_DPI', '150'))
+
+# Region detection thresholds in inches, scaled by the render DPI
+BAND_GAP = 0.25      # Blank rows that separate page-wide bands
+COLUMN_GAP = 0.3     # Blank columns that separate side-by-side page columns
+BLOCK_GAP = 0.12     # Blank rows that separate blocks within a column
+PHRASE_GAP = 0.12    # Blank columns that separate table cells (wider than a word space)
+ANCHOR_TOLERANCE = 0.05
+RULE_LENGTH = 1.5    # Horizontal ink runs at least this long are ruling lines, not text
+MARGIN = 0.05        # Padding around each crop
+
+Box = Tuple[int, int, int, int]  # (top, left, bottom, right), bottom/right exclusive
+
+
+@dataclass
+class PreparedPage:
+    """A page after preprocessing, ready for recognition"""
+    gray: np.ndarray                 # Deskewed grayscale page
+    angle: float                     # Rotation applied, in degrees
+    regions: List[Box] = field(default_factory=list)
+    tabular: bool = False            # False when no table was found and every text block is kept
+
+    @property
+    def crops(self) -> List[np.ndarray]:
+        return [self.gray[top:bottom, left:right] for top, left, bottom, right in self.regions]
+
+    @property
+    def crop_pixels(self) -> int:
+        return sum((bottom - top) * (right - left) for top, left, bottom, right in self.regions)
+
+
+def otsu_threshold(gray: np.ndarray) -> int:
+    """Gray level that best separates ink from paper (Otsu's method)"""
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    levels = np.arange(256)
+    weight = np.cumsum(hist)
+    mean = np.cumsum(hist * levels)
+    total_weight, total_mean = weight[-1], mean[-1]
+    background = total_weight - weight
+    valid = (weight > 0) & (background > 0)
+    between = np.zeros(256)
+    between[valid] = (total_mean * weight[valid] - mean[valid] * total_weight) ** 2 / (weight[valid] * background[valid])
+    return int(np.argmax(between))
+
+
+def estimate_skew(ink: np.ndarray, max_angle: float = 2.0, step: float = 0.1) -> float:
+    """
+    Text-line angle by projection profiles
+
+    The correct angle lines every text row up with a histogram bin, which
+    maximizes the sum of squared row counts. Ink pixel coordinates are
+    projected directly, so no image is rotated while searching.
+
+    Args:
+        ink: Boolean ink mask
+        max_angle: Largest skew considered, in degrees
+        step: Search resolution, in degrees
+
+    Returns:
+        Skew in degrees; positive when lines slope down to the right
+    """
+    ys, xs = np.nonzero(ink)
+    if len(ys) < 100:
+        return 0.0
+    stride = max(1, len(ys) // 50000)
+    ys, xs = ys[::stride].astype(np.float64), xs[::stride].astype(np.float64)
+
+    best_angle, best_score = 0.0, -1.0
+    for angle in np.arange(-max_angle, max_angle + step / 2, step):
+        rows = ys - xs * np.tan(np.radians(angle))
+        hist = np.bincount((rows - rows.min()).astype(np.intp))
+        score = float(np.dot(hist, hist))
+        if score > best_score:
+            best_angle, best_score = float(angle), score
+    return best_angle
+
+
+def remove_rules(ink: np.ndarray, length: int) -> np.ndarray:
+    """Clear horizontal ruling lines so they don't glue page columns together"""
+    if ink.shape[1] <= length:
+        return ink
+    padded = np.zeros((ink.shape[0], ink.shape[1] + 1), dtype=np.int32)
+    np.cumsum(ink, axis=1, out=padded[:, 1:])
+    # full[:, j] -> ink[:, j:j + length] is solid
+    full = (padded[:, length:] - padded[:, :-length]) == length
+    if not full.any():
+        return ink
+    # A pixel is on a rule if any solid window covers it
+    starts = np.zeros((ink.shape[0], ink.shape[1] + 1), dtype=np.int32)
+    np.cumsum(np.pad(full, ((0, 0), (0, length - 1))), axis=1, out=starts[:, 1:])
+    covered = (starts[:, length:] - starts[:, :-length]) > 0
+    rule = np.zeros_like(ink)
+    rule[:, length - 1:] = covered[:, :ink.shape[1] - length + 1]
+    return ink & ~rule
+
+
+def runs(profile: np.ndarray, min_gap: int) -> List[Tuple[int, int]]:
+    """[start, end) spans of a nonzero profile, bridging blank stretches shorter than min_gap"""
+    nonzero = np.flatnonzero(profile)
+    if not nonzero.size:
+        return []
+    breaks = np.flatnonzero(np.diff(nonzero) > min_gap)
+    starts = np.r_[nonzero[0], nonzero[breaks + 1]]
+    ends = np.r_[nonzero[breaks] + 1, nonzero[-1] + 1]
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def text_blocks(ink: np.ndarray, dpi: int) -> List[Box]:
+    """
+    Segment a page into text blocks with a three-level XY cut
+
+    Page-wide bands are split into page columns, and each column into
+    blocks. Blocks are never cut vertically again, so the cells of a table
+    row stay in one crop and keep their reading order.
+    """
+    blocks = []
+    for top, bottom in runs(ink.sum(axis=1) > 1, int(BAND_GAP * dpi)):
+        band = ink[top:bottom]
+        for left, right in runs(band.sum(axis=0) > 0, int(COLUMN_GAP * dpi)):
+            column = band[:, left:right]
+            for block_top, block_bottom in runs(column.sum(axis=1) > 0, int(BLOCK_GAP * dpi)):
+                cols = np.flatnonzero(column[block_top:block_bottom].any(axis=0))
+                blocks.append((top + block_top, left + int(cols[0]), top + block_bottom, left + int(cols[-1]) + 1))
+    return blocks
+
+
+def is_tabular(block: np.ndarray, dpi: int, min_lines: int = 3, min_anchors: int = 3) -> bool:
+    """
+    Whether a block looks like a table (course rows with code, title, hours, grade)
+
+    Each text line is split into cells at gaps wider than a word space; a
+    table has several cell start positions ("anchors") shared by many lines,
+    while prose only lines up at its left margin.
+    """
+    lines = runs(block.sum(axis=1) > 0, 1)
+    if len(lines) < min_lines:
+        return False
+    starts = []
+    for line_index, (top, bottom) in enumerate(lines):
+        for start, _ in runs(block[top:bottom].any(axis=0), int(PHRASE_GAP * dpi)):
+            starts.append((start, line_index))
+    starts.sort()
+
+    tolerance = ANCHOR_TOLERANCE * dpi
+    needed = max(min_lines, int(0.4 * len(lines)))
+    anchors = 0
+    cluster_lines = set()
+    cluster_start = None
+    for start, line_index in starts:
+        if cluster_start is None or start - cluster_start > tolerance:
+            anchors += len(cluster_lines) >= needed
+            cluster_start, cluster_lines = start, set()
+        cluster_lines.add(line_index)
+    anchors += len(cluster_lines) >= needed
+    return anchors >= min_anchors
+
+
+def preprocess_page(page: Image.Image, dpi: int = OCR_DPI, max_skew: float = 2.0) -> PreparedPage:
+    """
+    Grayscale, deskew and find the regions worth recognizing
+
+    Args:
+        page: Rendered page (ideally already at `dpi`, e.g. convert_from_path(..., dpi=dpi, grayscale=True))
+        dpi: Resolution the page was rendered at
+        max_skew: Largest rotation to correct, in degrees
+
+    Returns:
+        PreparedPage whose crops cover the tabular course/grade regions,
+        or every text block if the page has no table
+    """
+    gray_image = page.convert('L')
+    gray = np.asarray(gray_image)
+    ink = gray < otsu_threshold(gray)
+
+    angle = estimate_skew(ink, max_skew) if max_skew > 0 else 0.0
+    if abs(angle) >= 0.1:
+        # PIL rotates counter-clockwise, which undoes a down-to-the-right slope
+        gray_image = gray_image.rotate(angle, resample=Image.BILINEAR, fillcolor=255)
+        gray = np.asarray(gray_image)
+        ink = gray < otsu_threshold(gray)
+
+    ink = remove_rules(ink, int(RULE_LENGTH * dpi))
+    blocks = text_blocks(ink, dpi)
+    tables = [b for b in blocks if is_tabular(ink[b[0]:b[2], b[1]:b[3]], dpi)]
+
+    margin = int(MARGIN * dpi)
+    height, width = gray.shape
+    regions = [
+        (max(0, top - margin), max(0, left - margin), min(height, bottom + margin), min(width, right + margin))
+        for top, left, bottom, right in (tables or blocks)
+    ]
+    return PreparedPage(gray=gray, angle=angle, regions=regions, tabular=bool(tables))
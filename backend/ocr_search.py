@@ -3,26 +3,44 @@ import argparse
 import re
 import csv
 import json
+import sys
+import copy
+import time
+import multiprocessing
 from typing import List, Dict, Set, Tuple
-from pdf2image import convert_from_path
-import easyocr
 import numpy as np
 from collections import defaultdict
+import metrics
+from course_matcher import CourseMatcher, corrections_summary
+from planner import REQUIREMENTS_JSON
+from transcript_analysis import find_gpa, find_description
+from ocr_preprocess import preprocess_page, OCR_DPI
+from report import CourseRecord, ReportSummary, ReportWriter, REPORT_FORMATS, group_by_department, check_format
 
-# Initialize EasyOCR reader
-reader = easyocr.Reader(['en', 'ch_sim'], gpu=True)  # Added Chinese support
+# EasyOCR reader, created on first use so batch workers each load their own model
+reader = None
+
+def get_reader():
+    """Return the process-wide EasyOCR reader, loading the model on first call"""
+    global reader
+    if reader is None:
+        import easyocr  # Loads torch; only OCR runs pay for it
+        reader = easyocr.Reader(['en', 'ch_sim'], gpu=True)  # Added Chinese support
+    return reader
 
 class CourseAnalyzer:
     """Class to analyze transcript courses and provide recommendations"""
     
-    def __init__(self, database_path: str = None, requirements_json: str = None):
+    def __init__(self, database_path: str = None, requirements_json: str = None, verbose: bool = True):
         """
         Initialize the course analyzer
         
         Args:
             database_path: Path to CSV file containing course information
             requirements_json: Path to requirements JSON file
+            verbose: Print progress and GPA details to the console
         """
+        self.verbose = verbose
         self.completed_courses = set()
         self.all_courses = set()
         self.course_data = {}  # Store course information
@@ -30,6 +48,8 @@ class CourseAnalyzer:
         self.same_field_courses = {}  # Store courses in the same field
         self.course_sequence_map = {}  # Store course progression sequences
         self.requirement_groups = {}  # Store requirement groups
+        self.course_matcher = None  # Built from the catalog and requirements on first use
+        self.course_corrections = {}  # OCR token -> corrected course id and confidence
         
         if database_path and os.path.exists(database_path):
             self.load_course_database(database_path)
@@ -164,10 +184,14 @@ class CourseAnalyzer:
                             'groups': course_groups.get(course, [])
                         }
             
+            # New requirement courses join the OCR matcher's vocabulary
+            self.course_matcher = None
+            
             # Identify course sequences
             self.analyze_requirement_sequences()
             
-            print(f"[INFO] Loaded {len(self.all_courses)} courses from requirements")
+            if self.verbose:
+                print(f"[INFO] Loaded {len(self.all_courses)} courses from requirements")
             
         except Exception as e:
             print(f"[ERROR] Failed to load requirements: {e}")
@@ -260,7 +284,8 @@ class CourseAnalyzer:
                             self.same_field_courses[field] = []
                         self.same_field_courses[field].append(course_id)
             
-            print(f"[INFO] Loaded {len(self.all_courses)} courses from database")
+            if self.verbose:
+                print(f"[INFO] Loaded {len(self.all_courses)} courses from database")
         except Exception as e:
             print(f"[ERROR] Failed to load course database: {e}")
     
@@ -274,41 +299,15 @@ class CourseAnalyzer:
         Returns:
             Set of completed course IDs
         """
-        # More strict pattern to match course codes
-        # This pattern matches real course codes like MATH101, PHYS211, CSCI111
-        # The department must be 2-4 letters followed by a 3-digit number
-        course_pattern = r'\b([A-Z]{2,4})[- ]?(\d{3}[A-Za-z]?)\b'
-        
-        # Common false positives to filter out
-        false_positives = {
-            'FALL', 'USED', 'FRON', 'MMER', 'WWSL', 'AND', 'BOX', 'TO', 'IN', 'OF', 'MS'
-        }
-        
-        # Find all potential course codes
-        matches = re.findall(course_pattern, text, re.IGNORECASE)
-        
-        # Clean up and standardize course codes
-        cleaned_courses = set()
-        for dept, num in matches:
-            # Skip if department is in false positives list
-            if dept.upper() in false_positives:
-                continue
-            
-            # Additional validation - typical academic departments
-            valid_depts = {'MATH', 'PHYS', 'CHEM', 'BIO', 'BIOL', 'CSCI', 'CS', 'ENGL', 
-                          'HIST', 'ECON', 'PSYC', 'SOC', 'PHIL', 'SPAN', 'FR', 'GER', 
-                          'CHIN', 'JAPN', 'COMM', 'ANTH', 'POLI', 'GEOG', 'GEOL', 'ART', 
-                          'MUS', 'THEA', 'PE', 'EDUC', 'NURS', 'ENGR', 'STAT', 'ASTR',
-                          'WRIT', 'SPCH', 'LIBA', 'HON', 'ELE', 'BISC', 'LAT', 'THEA',
-                          'ASTRO'}
-                          
-            # Skip if not a typical academic department
-            if dept.upper() not in valid_depts:
-                continue
-            
-            # Remove spaces and join department and number
-            course_id = f"{dept}{num}".upper()
-            cleaned_courses.add(course_id)
+        # Match course-code-like tokens against the catalog, correcting OCR misreads
+        # ("CSC1 111" -> CSCI111, "MATH1O1" -> MATH101) and dropping anything implausible
+        matches = self.get_course_matcher().find_all(text)
+        cleaned_courses = {m.course_id for m in matches}
+        self.course_corrections.update(corrections_summary(matches))
+        if self.course_corrections and self.verbose:
+            print("\nCorrected course codes:")
+            for token, correction in self.course_corrections.items():
+                print(f"  {token} -> {correction['course_id']} (confidence {correction['confidence']:.2f})")
         
         # Update completed courses
         self.completed_courses.update(cleaned_courses)
@@ -318,7 +317,7 @@ class CourseAnalyzer:
         
         # Try to extract GPA
         gpa_info = self.extract_gpa(text)
-        if gpa_info:
+        if gpa_info and self.verbose:
             print("\nGPA Information:")
             for gpa_type, value in gpa_info.items():
                 print(f"  {gpa_type}: {value}")
@@ -327,6 +326,12 @@ class CourseAnalyzer:
         # We'll handle this in the main function
         return cleaned_courses
     
+    def get_course_matcher(self) -> CourseMatcher:
+        """Matcher over the course catalog plus the loaded requirement courses"""
+        if self.course_matcher is None:
+            self.course_matcher = CourseMatcher.from_catalog(extra_ids=self.all_courses)
+        return self.course_matcher
+    
     def extract_course_descriptions(self, text: str) -> Dict[str, str]:
         """
         Extract course descriptions from transcript text
@@ -341,52 +346,36 @@ class CourseAnalyzer:
         descriptions = {}
         
         # Split into lines for easier processing
-        lines = text.split('\n')
-        
-        for i, line in enumerate(lines):
-            # Look for course codes in this line
-            course_match = re.search(r'([A-Za-z]{2,4})[- ]?(\d{3}[A-Za-z]?)', line, re.IGNORECASE)
-            if course_match:
-                # Get the standardized course ID
-                dept, num = course_match.groups()
-                course_id = f"{dept}{num}".upper()
-                
-                # Look for description in the same line
-                # Remove the course code first
-                rest_of_line = line[course_match.end():].strip()
+        for line in text.split('\n'):
+            # Look for a course code followed by its title on this line
+            found = find_description(line)
+            if found:
+                course_id, dept, num, description = found
+                descriptions[course_id] = description
                 
-                # Often course title/description follows the code
-                if rest_of_line and len(rest_of_line) > 3:  # Minimal length check
-                    # Clean up the description - filter out grade and credits info
-                    # This regex tries to find the descriptive part before grade/credit info
-                    desc_match = re.match(r'^([^0-9]+)', rest_of_line)
-                    if desc_match:
-                        description = desc_match.group(1).strip()
-                        descriptions[course_id] = description
+                # Update course data if we have this course
+                if course_id in self.course_data:
+                    self.course_data[course_id]['description'] = description
+                else:
+                    # Create basic course data
+                    level_num = int(num[0]) if num[0].isdigit() else 1
+                    if level_num < 2:
+                        level = "Introductory"
+                    elif level_num < 3:
+                        level = "Intermediate"
+                    elif level_num < 4:
+                        level = "Advanced"
+                    else:
+                        level = "Senior/Graduate"
                         
-                        # Update course data if we have this course
-                        if course_id in self.course_data:
-                            self.course_data[course_id]['description'] = description
-                        else:
-                            # Create basic course data
-                            level_num = int(num[0]) if num[0].isdigit() else 1
-                            if level_num < 2:
-                                level = "Introductory"
-                            elif level_num < 3:
-                                level = "Intermediate"
-                            elif level_num < 4:
-                                level = "Advanced"
-                            else:
-                                level = "Senior/Graduate"
-                                
-                            self.course_data[course_id] = {
-                                'name': description,
-                                'field': dept,
-                                'number': int(re.match(r'(\d+)', num).group(1)) if re.match(r'(\d+)', num) else 0,
-                                'description': description,
-                                'level': level_num,
-                                'level_name': level
-                            }
+                    self.course_data[course_id] = {
+                        'name': description,
+                        'field': dept,
+                        'number': int(re.match(r'(\d+)', num).group(1)) if re.match(r'(\d+)', num) else 0,
+                        'description': description,
+                        'level': level_num,
+                        'level_name': level
+                    }
         
         return descriptions
     
@@ -400,40 +389,8 @@ class CourseAnalyzer:
         Returns:
             Dictionary with GPA information
         """
-        gpa_info = {}
-        
-        # Pattern to match GPA (various formats)
-        gpa_patterns = [
-            # Pattern for "GPA: X.XX" format
-            r'GPA[:\s]+(\d+\.\d+)',
-            # Pattern for "X.XX GPA" format
-            r'(\d+\.\d+)\s+GPA',
-            # Pattern for overall/cumulative GPA
-            r'(?:overall|cumulative|cum)[\s\-]*gpa[:\s]+(\d+\.\d+)',
-            # Pattern for term/semester GPA
-            r'(?:term|semester|sem)[\s\-]*gpa[:\s]+(\d+\.\d+)'
-        ]
-        
-        # Apply each pattern
-        for pattern in gpa_patterns:
-            matches = re.finditer(pattern, text.lower())
-            for match in matches:
-                # Get the context to determine GPA type
-                line_start = max(0, match.start() - 30)
-                line_end = min(len(text), match.end() + 30)
-                context = text[line_start:line_end].lower()
-                
-                gpa_value = float(match.group(1))
-                
-                # Determine GPA type based on context
-                if 'cumulative' in context or 'cum' in context or 'overall' in context:
-                    gpa_info['Cumulative GPA'] = gpa_value
-                elif 'semester' in context or 'term' in context or 'sem' in context:
-                    gpa_info['Semester GPA'] = gpa_value
-                elif 'major' in context:
-                    gpa_info['Major GPA'] = gpa_value
-                else:
-                    gpa_info['GPA'] = gpa_value
+        # Shared with the incremental analysis of saved transcripts
+        gpa_info = find_gpa(text)
         
         return gpa_info
     
@@ -536,28 +493,187 @@ class CourseAnalyzer:
         return relationships
 
 
-def ocr_pdf(pdf_path: str) -> str:
+# Recognition engine: "batched" groups crops for readtext_batched, "page" calls readtext per image
+OCR_ENGINE = os.getenv('OCR_ENGINE', 'batched')
+OCR_BATCH_SIZE = int(os.getenv('OCR_BATCH_SIZE', '8'))            # Images per readtext_batched call
+OCR_RECOGNIZER_BATCH = int(os.getenv('OCR_RECOGNIZER_BATCH', '32'))  # Text boxes per recognizer forward pass
+OCR_WORKERS = int(os.getenv('OCR_WORKERS', '0'))                  # Recognizer DataLoader workers
+
+
+def pad_image(image: np.ndarray, height: int, width: int) -> np.ndarray:
+    """Pad an image with white on the bottom/right so detection coordinates are unchanged"""
+    padding = ((0, height - image.shape[0]), (0, width - image.shape[1])) + ((0, 0),) * (image.ndim - 2)
+    return np.pad(image, padding, constant_values=255)
+
+
+def plan_batches(shapes: List[Tuple[int, int]], batch_size: int, max_padding: float) -> List[List[int]]:
+    """
+    Group image indices into batches of similar size
+
+    Images are taken in size order and a batch is closed when it is full or
+    when padding everything to its largest member would exceed `max_padding`
+    times the real pixel count.
+    """
+    order = sorted(range(len(shapes)), key=lambda i: shapes[i])
+    batches = []
+    current = []
+    for i in order:
+        candidate = current + [i]
+        height = max(shapes[j][0] for j in candidate)
+        width = max(shapes[j][1] for j in candidate)
+        real = sum(shapes[j][0] * shapes[j][1] for j in candidate)
+        if current and (len(candidate) > batch_size or height * width * len(candidate) > max_padding * real):
+            batches.append(current)
+            candidate = [i]
+        current = candidate
+    if current:
+        batches.append(current)
+    return batches
+
+
+def recognize_batched(images: List[np.ndarray], batch_size: int = None, workers: int = None,
+                      recognizer_batch: int = None, max_padding: float = 1.5,
+                      verbose: bool = False) -> Tuple[List[list], List[Dict]]:
+    """
+    Run EasyOCR over many images in fixed-size batches
+
+    readtext_batched needs equally sized inputs, so images of similar size
+    share a batch and are padded to the largest in it.
+
+    Args:
+        images: Page images or region crops
+        batch_size: Maximum images per readtext_batched call
+        workers: DataLoader workers for the recognizer
+        recognizer_batch: Text boxes per recognizer forward pass
+        max_padding: Largest padded/real pixel ratio allowed within a batch
+        verbose: Print a line per batch
+
+    Returns:
+        (readtext-style results in input order, per-batch timing records)
+    """
+    batch_size = max(1, batch_size or OCR_BATCH_SIZE)
+    workers = OCR_WORKERS if workers is None else workers
+    recognizer_batch = recognizer_batch or OCR_RECOGNIZER_BATCH
+
+    results = [None] * len(images)
+    timings = []
+    for indices in plan_batches([image.shape[:2] for image in images], batch_size, max_padding):
+        height = max(images[i].shape[0] for i in indices)
+        width = max(images[i].shape[1] for i in indices)
+        batch = [pad_image(images[i], height, width) for i in indices]
+
+        batch_start = time.perf_counter()
+        with metrics.timed(metrics.OCR_BATCH_LATENCY):
+            batch_results = get_reader().readtext_batched(batch, batch_size=recognizer_batch, workers=workers)
+        elapsed = time.perf_counter() - batch_start
+
+        for i, result in zip(indices, batch_results):
+            results[i] = result
+        timings.append({
+            'batch': len(timings) + 1,
+            'images': len(indices),
+            'indices': indices,
+            'size': [height, width],
+            'detections': sum(len(r) for r in batch_results),
+            'seconds': round(elapsed, 4),
+        })
+        if verbose:
+            print(f"[INFO] OCR batch {len(timings)}: {len(indices)} image(s) at {width}x{height} in {elapsed:.2f}s")
+    return results, timings
+
+
+def page_seconds(page_counts: List[int], timings: List[Dict]) -> List[float]:
+    """
+    Split batch recognition time across the pages whose images were in each batch
+
+    Args:
+        page_counts: Number of images recognized for each page, in page order
+        timings: Per-batch records from recognize_batched
+
+    Returns:
+        Seconds per page; each image is charged an equal share of its batch
+    """
+    image_page = [page for page, count in enumerate(page_counts) for _ in range(count)]
+    seconds = [0.0] * len(page_counts)
+    for timing in timings:
+        share = timing['seconds'] / timing['images']
+        for i in timing['indices']:
+            seconds[image_page[i]] += share
+    return seconds
+
+
+def ocr_pdf(pdf_path: str, verbose: bool = True, preprocess: bool = None, engine: str = None,
+            batch_size: int = None, workers: int = None, batch_timings: List[Dict] = None) -> str:
     """
     Extracts and performs OCR on each page of a PDF, focusing on course and GPA information
     
     Args:
         pdf_path: Path to the PDF file
+        verbose: Print per-page progress
+        preprocess: Recognize only the detected table regions of a grayscale,
+            deskewed page at OCR_DPI (defaults to on unless OCR_PREPROCESS=0)
+        engine: "batched" (default, see OCR_ENGINE) or "page"
+        batch_size: Images per batch in batched mode
+        workers: Recognizer DataLoader workers in batched mode
+        batch_timings: If given, per-batch timing records are appended to it
         
     Returns:
         Extracted text from the PDF
     """
-    print(f"[INFO] Processing PDF: {pdf_path}")
-    text_output = ""
+    if preprocess is None:
+        preprocess = os.getenv('OCR_PREPROCESS', '1') != '0'
+    engine = engine or OCR_ENGINE
+    if verbose:
+        print(f"[INFO] Processing PDF: {pdf_path}")
+
+    from pdf2image import convert_from_path
+
+    if preprocess:
+        pages = convert_from_path(pdf_path, dpi=OCR_DPI, grayscale=True)
+    else:
+        pages = convert_from_path(pdf_path)
 
-    pages = convert_from_path(pdf_path)
+    # Images to recognize, grouped by page
+    page_images = []
     for i, page in enumerate(pages):
-        print(f"[INFO] OCR on page {i + 1}/{len(pages)}")
-        # Convert PIL Image to NumPy array
-        image_np = np.array(page)
-        
-        # Perform OCR
-        result = reader.readtext(image_np)
-        
+        if preprocess:
+            with metrics.timed(metrics.OCR_PREPROCESS_LATENCY):
+                prepared = preprocess_page(page, OCR_DPI)
+            images = prepared.crops
+            if verbose:
+                print(f"[INFO] Page {i + 1}/{len(pages)}: {len(images)} region(s), "
+                      f"{prepared.crop_pixels / prepared.gray.size:.0%} of the page, "
+                      f"deskewed {prepared.angle:.1f} degrees")
+        else:
+            # Convert PIL Image to NumPy array
+            images = [np.array(page)]
+        metrics.OCR_PIXELS.labels('page').inc(page.width * page.height)
+        metrics.OCR_PIXELS.labels('recognized').inc(sum(image.shape[0] * image.shape[1] for image in images))
+        page_images.append(images)
+
+    # Perform OCR
+    if engine == 'batched':
+        flat = [image for images in page_images for image in images]
+        flat_results, timings = recognize_batched(flat, batch_size, workers, verbose=verbose)
+        if batch_timings is not None:
+            batch_timings.extend(timings)
+        for seconds in page_seconds([len(images) for images in page_images], timings):
+            metrics.OCR_PAGE_LATENCY.observe(seconds)
+        page_results = []
+        for images in page_images:
+            page_results.append([d for result in flat_results[:len(images)] for d in result])
+            flat_results = flat_results[len(images):]
+    else:
+        page_results = []
+        for i, images in enumerate(page_images):
+            if verbose:
+                print(f"[INFO] OCR on page {i + 1}/{len(pages)}")
+            with metrics.timed(metrics.OCR_PAGE_LATENCY):
+                page_results.append([d for image in images for d in get_reader().readtext(image)])
+    metrics.OCR_PAGES.inc(len(pages))
+
+    text_output = ""
+    for result in page_results:
         # Process OCR results to focus on course, description and GPA
         filtered_text = []
         for detection in result:
@@ -579,59 +695,48 @@ def ocr_pdf(pdf_path: str) -> str:
     return text_output
 
 
-def display_course_relationships(relationships: Dict[str, Dict]) -> None:
+def format_course_lines(record: CourseRecord) -> List[str]:
+    """
+    Format one course for the human-readable report
+
+    Args:
+        record: Course record
+
+    Returns:
+        Lines to print/write (without trailing newlines)
+    """
+    status = "✓" if record.completed else "○"
+
+    # Skip the name when it only repeats the course ID
+    display_name = record.display_name
+    if display_name:
+        lines = [f"\n• {status} {record.course_id}: {display_name}"]
+    else:
+        lines = [f"\n• {status} {record.course_id}"]
+
+    # Show course description if available and different from name
+    if record.description and record.description != record.name:
+        lines.append(f"  Description: {record.description}")
+    return lines
+
+
+def display_course_relationships(relationships: Dict[str, Dict], departments=None) -> None:
     """
     Display course relationships in a simplified format, showing only course title and description
     
     Args:
         relationships: Dictionary of course relationships
+        departments: Output of group_by_department, if already computed
     """
     print("\n===== COURSES =====\n")
     
-    # Group courses by department
-    department_courses = defaultdict(list)
-    
-    for course_id, info in relationships.items():
-        if info['field']:
-            department_courses[info['field']].append((course_id, info))
+    if departments is None:
+        departments = group_by_department(relationships)
     
-    # Sort departments alphabetically
-    for dept in sorted(department_courses.keys()):
-        courses = department_courses[dept]
-        
-        # Sort courses by number
-        sorted_courses = sorted(courses, key=lambda x: x[1].get('number', 0))
-        
+    for dept, records in departments:
         print(f"\n== {dept} DEPARTMENT COURSES ==")
-        
-        # Display courses with simplified information
-        for course_id, info in sorted_courses:
-            status = "✓" if info['completed'] else "○"
-            
-            # Course name handling
-            course_name = info['name'] if 'name' in info else ""
-            
-            # Check if course name is just repeating the course ID
-            if course_name and isinstance(course_name, str):
-                # Extract just the course number part for comparison
-                course_id_parts = re.match(r'([A-Za-z]+)(\d+.*)', course_id)
-                if course_id_parts:
-                    dept_code, course_num = course_id_parts.groups()
-                    # Check if course name is just "DEPT NUM" format
-                    name_pattern = re.compile(rf'{dept_code}\s*{course_num}', re.IGNORECASE)
-                    if name_pattern.fullmatch(course_name.strip()):
-                        # Name is just a repetition of the ID, skip it
-                        print(f"\n• {status} {course_id}")
-                    else:
-                        print(f"\n• {status} {course_id}: {course_name}")
-                else:
-                    print(f"\n• {status} {course_id}: {course_name}")
-            else:
-                print(f"\n• {status} {course_id}")
-            
-            # Show course description if available and different from name
-            if info.get('description') and info.get('description') != info.get('name'):
-                print(f"  Description: {info['description']}")
+        for record in records:
+            print("\n".join(format_course_lines(record)))
 
 
 def search_keyword(text: str, keyword: str) -> List[str]:
@@ -667,7 +772,8 @@ def search_keyword(text: str, keyword: str) -> List[str]:
     return matches
 
 
-def save_output_to_file(analyzer, relationships, transcript_text, keyword=None, output_file="transcript_analysis.txt"):
+def save_output_to_file(analyzer, relationships, transcript_text, keyword=None, output_file="transcript_analysis.txt",
+                        gpa_info=None, departments=None, matches=None):
     """
     Save simplified analysis results to a text file
     
@@ -677,13 +783,22 @@ def save_output_to_file(analyzer, relationships, transcript_text, keyword=None,
         transcript_text: Extracted text from transcript
         keyword: Search keyword (optional)
         output_file: Path to output file
+        gpa_info: Precomputed GPA information (optional)
+        departments: Precomputed output of group_by_department (optional)
+        matches: Precomputed keyword search results (optional)
     """
+    if gpa_info is None:
+        gpa_info = analyzer.extract_gpa(transcript_text)
+    if departments is None:
+        departments = group_by_department(relationships)
+    if keyword and matches is None:
+        matches = search_keyword(transcript_text, keyword)
+
     with open(output_file, 'w', encoding='utf-8') as f:
         # Write header
         f.write("=== TRANSCRIPT ANALYSIS RESULTS ===\n\n")
         
         # Write GPA information if available
-        gpa_info = analyzer.extract_gpa(transcript_text)
         if gpa_info:
             f.write("GPA INFORMATION:\n")
             for gpa_type, value in gpa_info.items():
@@ -693,53 +808,13 @@ def save_output_to_file(analyzer, relationships, transcript_text, keyword=None,
         # Write course information
         f.write("=== COURSES ===\n\n")
         
-        # Group courses by department
-        department_courses = defaultdict(list)
-        for course_id, info in relationships.items():
-            if info['field']:
-                department_courses[info['field']].append((course_id, info))
-        
-        # Write department information
-        for dept in sorted(department_courses.keys()):
-            courses = department_courses[dept]
-            
-            # Sort courses by number
-            sorted_courses = sorted(courses, key=lambda x: x[1].get('number', 0))
-            
+        for dept, records in departments:
             f.write(f"\n== {dept} DEPARTMENT COURSES ==\n")
-            
-            # Write course information with simplified format
-            for course_id, info in sorted_courses:
-                status = "✓" if info['completed'] else "○"
-                
-                # Course name handling
-                course_name = info['name'] if 'name' in info else ""
-                
-                # Check if course name is just repeating the course ID
-                if course_name and isinstance(course_name, str):
-                    # Extract just the course number part for comparison
-                    course_id_parts = re.match(r'([A-Za-z]+)(\d+.*)', course_id)
-                    if course_id_parts:
-                        dept_code, course_num = course_id_parts.groups()
-                        # Check if course name is just "DEPT NUM" format
-                        name_pattern = re.compile(rf'{dept_code}\s*{course_num}', re.IGNORECASE)
-                        if name_pattern.fullmatch(course_name.strip()):
-                            # Name is just a repetition of the ID, skip it
-                            f.write(f"\n• {status} {course_id}\n")
-                        else:
-                            f.write(f"\n• {status} {course_id}: {course_name}\n")
-                    else:
-                        f.write(f"\n• {status} {course_id}: {course_name}\n")
-                else:
-                    f.write(f"\n• {status} {course_id}\n")
-                
-                # Show course description if available and different from name
-                if info.get('description') and info.get('description') != info.get('name'):
-                    f.write(f"  Description: {info['description']}\n")
+            for record in records:
+                f.write("\n".join(format_course_lines(record)) + "\n")
         
         # Write keyword search results if applicable
         if keyword:
-            matches = search_keyword(transcript_text, keyword)
             if matches:
                 f.write(f"\n\n=== SEARCH RESULTS FOR '{keyword}' ===\n\n")
                 for i, match in enumerate(matches, 1):
@@ -752,16 +827,249 @@ def save_output_to_file(analyzer, relationships, transcript_text, keyword=None,
     print(f"[INFO] Analysis results saved to {output_file}")
 
 
+def save_structured_output(completed_courses, departments, gpa_info, output_file, fmt='ndjson',
+                           keyword=None, matches=None):
+    """
+    Stream machine-readable analysis results to a file
+
+    Args:
+        completed_courses: Course IDs found on the transcript
+        departments: Output of group_by_department
+        gpa_info: GPA information
+        output_file: Path to output file
+        fmt: One of report.REPORT_FORMATS
+        keyword: Search keyword (optional)
+        matches: Keyword search results (optional)
+    """
+    check_format(fmt)  # Before opening, so a missing msgpack leaves no empty file behind
+    summary = ReportSummary(
+        gpa=gpa_info,
+        completed_courses=sorted(completed_courses),
+        keyword=keyword,
+        keyword_matches=matches or []
+    )
+    mode = 'wb' if fmt == 'msgpack' else 'w'
+    encoding = None if fmt == 'msgpack' else 'utf-8'
+    with open(output_file, mode, encoding=encoding) as f:
+        count = ReportWriter(f, fmt).write_report(
+            summary, (record for _, records in departments for record in records)
+        )
+    print(f"[INFO] {count} course records saved to {output_file} ({fmt})")
+
+
+def find_requirements_path(requirements_path: str) -> str:
+    """
+    Check the requirements JSON path given on the command line
+
+    Args:
+        requirements_path: Path to the requirements file (defaults to the one the planner serves)
+
+    Returns:
+        The path, or None if the file does not exist
+    """
+    if os.path.exists(requirements_path):
+        return requirements_path
+    print(f"[WARNING] Requirements file not found at {requirements_path}. Course relations may be limited.")
+    return None
+
+
+def collect_batch_inputs(source: str) -> List[str]:
+    """
+    Collect transcript PDFs from a directory (recursively) or a manifest file
+
+    Args:
+        source: Directory of PDFs, or a text file with one PDF path per line
+
+    Returns:
+        Sorted list of PDF paths
+    """
+    pdf_paths = []
+    if os.path.isdir(source):
+        for root, _, files in os.walk(source):
+            for name in files:
+                if name.lower().endswith('.pdf'):
+                    pdf_paths.append(os.path.join(root, name))
+    else:
+        base_dir = os.path.dirname(os.path.abspath(source))
+        with open(source, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                # Manifest entries are relative to the manifest itself
+                pdf_paths.append(line if os.path.isabs(line) else os.path.join(base_dir, line))
+    return sorted(pdf_paths)
+
+
+def load_completed_batch(output_file: str) -> Set[str]:
+    """
+    Read an existing JSONL results file to find transcripts that already succeeded
+
+    Error records and a partial last line are dropped from the file, so the
+    retried transcripts are not reported twice.
+
+    Args:
+        output_file: Path to the JSONL results file
+
+    Returns:
+        Set of PDF paths with an "ok" record
+    """
+    done = set()
+    if not os.path.exists(output_file):
+        return done
+    kept = []
+    dropped = 0
+    with open(output_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A partial last line from an interrupted run; it gets redone
+                dropped += 1
+                continue
+            if record.get('status') != 'ok':
+                dropped += 1
+                continue
+            done.add(record['pdf'])
+            kept.append(line if line.endswith("\n") else line + "\n")
+    if dropped:
+        # Write beside the original and swap, so an interruption here loses nothing
+        tmp_file = output_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.writelines(kept)
+        os.replace(tmp_file, output_file)
+    return done
+
+
+# Per-process analyzer and OCR options set once by init_batch_worker
+worker_analyzer = None
+worker_ocr_options = {}
+
+def init_batch_worker(requirements_path: str, ocr_options: Dict = None) -> None:
+    """
+    Load the OCR model, requirements and course matcher once per worker process
+
+    Args:
+        requirements_path: Path to requirements JSON file (or None)
+        ocr_options: engine/batch_size/workers keyword arguments for ocr_pdf
+    """
+    global worker_analyzer, worker_ocr_options
+    get_reader()
+    worker_analyzer = CourseAnalyzer(requirements_json=requirements_path, verbose=False)
+    # Build the matcher before any copy is made; per-transcript copies share it instead of rebuilding it
+    worker_analyzer.get_course_matcher()
+    worker_ocr_options = ocr_options or {}
+
+
+def analyze_transcript_file(pdf_path: str) -> Dict:
+    """
+    OCR and analyze a single transcript inside a batch worker
+
+    Args:
+        pdf_path: Path to the transcript PDF
+
+    Returns:
+        JSON-serializable result record
+    """
+    start = time.perf_counter()
+    try:
+        transcript_text = ocr_pdf(pdf_path, verbose=False, **worker_ocr_options)
+        # Start from the loaded requirements without state from earlier transcripts
+        analyzer = copy.deepcopy(worker_analyzer)
+        completed_courses = analyzer.extract_courses_from_text(transcript_text)
+        return {
+            'pdf': pdf_path,
+            'status': 'ok',
+            'courses': sorted(completed_courses),
+            'gpa': analyzer.extract_gpa(transcript_text),
+            'text': transcript_text,
+            'seconds': round(time.perf_counter() - start, 3)
+        }
+    except Exception as e:
+        return {
+            'pdf': pdf_path,
+            'status': 'error',
+            'error': str(e),
+            'seconds': round(time.perf_counter() - start, 3)
+        }
+
+
+def run_batch(source: str, requirements_path: str, output_file: str, workers: int = None,
+              ocr_options: Dict = None) -> None:
+    """
+    Analyze many transcripts across a worker pool, appending results as JSONL
+
+    Already-successful PDFs in output_file are skipped and earlier failures
+    are retried, so an interrupted run can be restarted with the same arguments.
+
+    Args:
+        source: Directory of PDFs or manifest file
+        requirements_path: Path to requirements JSON file (or None)
+        output_file: JSONL file to append results to
+        workers: Number of worker processes (defaults to CPU count)
+        ocr_options: engine/batch_size/workers keyword arguments passed to ocr_pdf in every worker
+    """
+    pdf_paths = collect_batch_inputs(source)
+    done = load_completed_batch(output_file)
+    pending = [p for p in pdf_paths if p not in done]
+    workers = workers or os.cpu_count() or 1
+
+    print(f"[INFO] {len(pdf_paths)} transcripts found, {len(done)} already done, {len(pending)} to process")
+    if not pending:
+        return
+
+    start = time.perf_counter()
+    failed = 0
+    # spawn keeps CUDA/torch state out of the parent; every worker loads its own reader
+    ctx = multiprocessing.get_context('spawn')
+    with ctx.Pool(workers, initializer=init_batch_worker, initargs=(requirements_path, ocr_options)) as pool, \
+            open(output_file, 'a', encoding='utf-8') as out:
+        for n, record in enumerate(pool.imap_unordered(analyze_transcript_file, pending), 1):
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            if record['status'] != 'ok':
+                failed += 1
+            elapsed = time.perf_counter() - start
+            print(f"[INFO] [{n}/{len(pending)}] {record['status']} {record['pdf']} "
+                  f"({record['seconds']:.1f}s, {n / elapsed:.2f} files/s)", file=sys.stderr)
+
+    print(f"[INFO] Batch finished: {len(pending) - failed} ok, {failed} failed in {time.perf_counter() - start:.1f}s")
+    print(f"[INFO] Results appended to {output_file}")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Transcript analyzer focusing on courses and GPA")
     parser.add_argument('-i', '--pdf', type=str, help="Path to transcript PDF file")
-    parser.add_argument('-r', '--requirements', type=str, default="./json/requirementsDB.json",
-                        help="Path to requirements JSON file")
+    parser.add_argument('-r', '--requirements', type=str, default=REQUIREMENTS_JSON,
+                        help="Path to requirements JSON file (default: src/json/requirementsDB.json)")
     parser.add_argument('-kw', '--keyword', type=str, help="Search for specific keyword in transcript")
     parser.add_argument('-o', '--output', type=str, default="transcript_analysis.txt",
                         help="Output file for saving analysis results")
+    parser.add_argument('-f', '--format', type=str, default='text', choices=('text',) + REPORT_FORMATS,
+                        help="Output format: human-readable text or structured json/ndjson/msgpack")
+    parser.add_argument('-b', '--batch', type=str,
+                        help="Directory of transcript PDFs or manifest file (one path per line) to analyze in bulk")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="Number of worker processes for batch mode (default: CPU count)")
+    parser.add_argument('--ocr-engine', type=str, default=None, choices=('batched', 'page'),
+                        help="Recognize regions in batches with readtext_batched, or one at a time")
+    parser.add_argument('--ocr-batch-size', type=int, default=None,
+                        help=f"Images per OCR batch (default: {OCR_BATCH_SIZE})")
+    parser.add_argument('--ocr-workers', type=int, default=None,
+                        help=f"DataLoader workers for OCR recognition (default: {OCR_WORKERS})")
     args = parser.parse_args()
 
+    if args.batch:
+        if not os.path.exists(args.batch):
+            print(f"[ERROR] Batch input not found: {args.batch}")
+            return
+        output_file = args.output
+        if output_file == parser.get_default('output'):
+            output_file = "transcript_analysis.jsonl"
+        ocr_options = dict(engine=args.ocr_engine, batch_size=args.ocr_batch_size, workers=args.ocr_workers)
+        run_batch(args.batch, find_requirements_path(args.requirements), output_file, args.workers, ocr_options)
+        return
+
     # Check if PDF file exists
     if not args.pdf:
         print("Please specify a transcript PDF file with -i/--pdf")
@@ -771,20 +1079,12 @@ def main():
         print(f"[ERROR] PDF file not found: {args.pdf}")
         return
     
-    # Check for requirements file, try different paths
-    requirements_path = args.requirements
-    if not os.path.exists(requirements_path):
-        # Try relative path from current directory
-        requirements_path = os.path.join(".", "json", "requirementsDB.json")
-        if not os.path.exists(requirements_path):
-            # Try relative path from parent directory
-            requirements_path = os.path.join("..", "json", "requirementsDB.json")
-            if not os.path.exists(requirements_path):
-                print(f"[WARNING] Requirements file not found. Course relations may be limited.")
-                requirements_path = None
+    # Check for requirements file
+    requirements_path = find_requirements_path(args.requirements)
     
     # Extract text from PDF, focusing on relevant information
-    transcript_text = ocr_pdf(args.pdf)
+    transcript_text = ocr_pdf(args.pdf, engine=args.ocr_engine, batch_size=args.ocr_batch_size,
+                              workers=args.ocr_workers)
     
     # Initialize course analyzer with requirements
     analyzer = CourseAnalyzer(requirements_json=requirements_path)
@@ -795,16 +1095,28 @@ def main():
     # Analyze course relationships
     relationships = analyzer.analyze_course_relationships()
     
+    # Compute everything the reports share once
+    departments = group_by_department(relationships)
+    gpa_info = analyzer.extract_gpa(transcript_text)
+    matches = search_keyword(transcript_text, args.keyword) if args.keyword else None
+    
     # Display course relationships in console
-    display_course_relationships(relationships)
+    display_course_relationships(relationships, departments)
     
     # Save results to file
-    save_output_to_file(analyzer, relationships, transcript_text, args.keyword, args.output)
+    if args.format == 'text':
+        save_output_to_file(analyzer, relationships, transcript_text, args.keyword, args.output,
+                            gpa_info=gpa_info, departments=departments, matches=matches)
+    else:
+        output_file = args.output
+        if output_file == parser.get_default('output'):
+            output_file = f"transcript_analysis.{args.format}"
+        save_structured_output(completed_courses, departments, gpa_info, output_file, args.format,
+                               args.keyword, matches)
     
     # If keyword is provided, search for it in the transcript and show in console
     if args.keyword:
         print(f"\n[INFO] Searching for keyword: '{args.keyword}'")
-        matches = search_keyword(transcript_text, args.keyword)
         
         if matches:
             print(f"\n===== FOUND {len(matches)} MATCHES FOR '{args.keyword}' =====\n")
@@ -0,0 +1,209 @@
+import io
+import os
+import re
+import queue
+import hashlib
+import threading
+from typing import Dict, Optional
+
+import metrics
+
+# Uploaded originals and their rendered variants (kept out of git, like profiles/)
+PHOTOS_DIR = os.getenv('PHOTOS_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'photos'))
+
+# Square edge lengths rendered for every upload: the sidebar avatar (48px at 2x) and the profile page (256px, 1x/2x)
+THUMBNAIL_SIZES = (96, 256, 512)
+
+# Extension -> (Pillow format, MIME type, save options)
+THUMBNAIL_FORMATS = {
+    'webp': ('WEBP', 'image/webp', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', 'image/jpeg', {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+
+ACCEPTED_FORMATS = {'JPEG', 'PNG', 'WEBP', 'GIF'}
+MAX_PHOTO_BYTES = int(os.getenv('MAX_PHOTO_BYTES', str(8 * 1024 * 1024)))
+MAX_PHOTO_PIXELS = 40_000_000  # Decoded size limit, so a small file can't expand into gigabytes
+
+# <photo id>-<size>.<ext>, where the photo id is a hash of the original's bytes
+VARIANT_NAME_PATTERN = re.compile(r'^([0-9a-f]{32})-(\d+)\.(webp|jpg)$')
+
+PHOTO_RENDER_LATENCY = metrics.Histogram('advisor_photo_render_seconds', 'Time to render one photo variant',
+                                         ['trigger'])
+
+
+class InvalidPhoto(ValueError):
+    """Upload is not an image we accept"""
+
+
+def photo_id(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def variant_name(photo: str, size: int, ext: str) -> str:
+    return f"{photo}-{size}.{ext}"
+
+
+def variant_mimetype(name: str) -> str:
+    return THUMBNAIL_FORMATS[name.rsplit('.', 1)[1]][1]
+
+
+class PhotoStore:
+    """
+    Content-addressed profile photos
+
+    Originals are stored once per distinct image under a hash of their
+    bytes, and each variant's name is derived from that hash, its size and
+    its format. A name therefore always refers to the same bytes, so
+    variants can be cached by browsers and proxies forever. Variants are
+    rendered by the ThumbnailWorker after an upload, or on first request if
+    the worker has not reached them yet (or ran in another process).
+    """
+
+    def __init__(self, directory: str = PHOTOS_DIR):
+        self.directory = directory
+        self.originals = os.path.join(directory, 'originals')
+        self.variants = os.path.join(directory, 'variants')
+        os.makedirs(self.originals, exist_ok=True)
+        os.makedirs(self.variants, exist_ok=True)
+
+    def original_path(self, photo: str) -> str:
+        return os.path.join(self.originals, photo)
+
+    def write_atomic(self, path: str, data: bytes) -> None:
+        """Write via a per-thread temporary file, so concurrent renders of one variant can't interleave"""
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def save_original(self, data: bytes) -> str:
+        """
+        Validate and store an uploaded image
+
+        Args:
+            data: Uploaded file contents
+
+        Returns:
+            Photo id (the same image uploaded twice gets the same id)
+
+        Raises:
+            InvalidPhoto: Too large, not an image, or an unsupported format
+            ImportError: Pillow is not installed
+        """
+        from PIL import Image
+
+        if len(data) > MAX_PHOTO_BYTES:
+            raise InvalidPhoto(f"Photo is larger than {MAX_PHOTO_BYTES // (1024 * 1024)}MB")
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                if image.format not in ACCEPTED_FORMATS:
+                    raise InvalidPhoto(f"Unsupported image format {image.format}")
+                if image.width * image.height > MAX_PHOTO_PIXELS:
+                    raise InvalidPhoto("Photo dimensions are too large")
+                image.verify()
+        except InvalidPhoto:
+            raise
+        except Exception as e:
+            raise InvalidPhoto(f"Not a valid image: {e}")
+
+        photo = photo_id(data)
+        path = self.original_path(photo)
+        if not os.path.exists(path):
+            self.write_atomic(path, data)
+        return photo
+
+    def render(self, photo: str, size: int, ext: str, trigger: str = 'worker') -> str:
+        """
+        Render one square variant of a stored original
+
+        Returns:
+            Path of the variant (already there, or written now)
+        """
+        path = os.path.join(self.variants, variant_name(photo, size, ext))
+        if os.path.exists(path):
+            return path
+
+        from PIL import Image, ImageOps
+
+        pil_format, _, options = THUMBNAIL_FORMATS[ext]
+        with metrics.timed(PHOTO_RENDER_LATENCY, trigger):
+            with Image.open(self.original_path(photo)) as image:
+                # JPEGs are decoded at a reduced scale when the target is much smaller
+                image.draft('RGB', (size * 2, size * 2))
+                image = ImageOps.exif_transpose(image)
+                if image.mode in ('RGBA', 'LA', 'P'):
+                    image = image.convert('RGBA')
+                    if pil_format == 'JPEG':
+                        background = Image.new('RGB', image.size, (255, 255, 255))
+                        background.paste(image, mask=image.getchannel('A'))
+                        image = background
+                elif image.mode != 'RGB':
+                    image = image.convert('RGB')
+                thumbnail = ImageOps.fit(image, (size, size), method=Image.Resampling.LANCZOS)
+                output = io.BytesIO()
+                thumbnail.save(output, pil_format, **options)
+            self.write_atomic(path, output.getvalue())
+        return path
+
+    def render_all(self, photo: str) -> None:
+        for size in THUMBNAIL_SIZES:
+            for ext in THUMBNAIL_FORMATS:
+                self.render(photo, size, ext)
+
+    def variant_path(self, name: str) -> Optional[str]:
+        """
+        Path of a variant by its public name, rendering it if it isn't there yet
+
+        Returns:
+            Path, or None if the name is malformed or the original is unknown
+        """
+        match = VARIANT_NAME_PATTERN.match(name)
+        if not match or int(match.group(2)) not in THUMBNAIL_SIZES:
+            return None
+        photo, size, ext = match.group(1), int(match.group(2)), match.group(3)
+        path = os.path.join(self.variants, name)
+        if os.path.exists(path):
+            return path
+        if not os.path.exists(self.original_path(photo)):
+            return None
+        return self.render(photo, size, ext, trigger='on_demand')
+
+    def urls(self, photo: str, prefix: str = '/api/photos') -> Dict[str, Dict[int, str]]:
+        """Public URL of every variant, by format and size"""
+        return {ext: {size: f"{prefix}/{variant_name(photo, size, ext)}" for size in THUMBNAIL_SIZES}
+                for ext in THUMBNAIL_FORMATS}
+
+
+class ThumbnailWorker:
+    """
+    Renders the variants of new uploads off the request thread
+
+    The thread is started on first use in each process, so it also works
+    in gunicorn workers forked after the app was imported. Queued photos
+    are lost on restart; PhotoStore renders missing variants on request.
+    """
+
+    def __init__(self, store: PhotoStore):
+        self.store = store
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.pid = None
+
+    def submit(self, photo: str) -> None:
+        with self.lock:
+            if self.thread is None or self.pid != os.getpid():
+                self.pid = os.getpid()
+                self.thread = threading.Thread(target=self.run, name='thumbnail-worker', daemon=True)
+                self.thread.start()
+        self.queue.put(photo)
+
+    def run(self) -> None:
+        while True:
+            photo = self.queue.get()
+            try:
+                self.store.render_all(photo)
+            except Exception as e:
+                print(f"[WARNING] Thumbnail rendering failed for {photo}: {e}")
+            finally:
+                self.queue.task_done()
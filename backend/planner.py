@@ -0,0 +1,353 @@
+import os
+import re
+import json
+import hashlib
+from dataclasses import dataclass, field
+from typing import List, Dict, Iterable, Optional, Set
+
+from catalog import CourseCatalog, normalize_course_id, parse_requirement
+import metrics
+
+# Degree requirements shared with the frontend
+REQUIREMENTS_JSON = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'json', 'requirementsDB.json')
+
+# requirementsDB.json nests the Data Science emphasis under "Emphasis" but lists the
+# Computer Security emphasis (and its electives) at the top level; categories named
+# here only apply to students in that emphasis
+EMPHASIS_CATEGORIES = {
+    'Data Science': ['Emphasis'],
+    'Computer Security': ['Computer Security', 'Electives'],
+}
+
+# A group's leading number is a course count up to this value, credit hours above it
+# ("Lab Science": [8, ...] is 8 credits, "Mathematics": [4, ...] is 4 courses)
+MAX_COURSE_COUNT = 6
+
+# Credits assumed for requirement courses missing from courses.json
+DEFAULT_CREDITS = 3
+
+PLAN_LATENCY = metrics.Histogram('advisor_plan_seconds', 'Time to generate a semester plan')
+
+
+@dataclass
+class RequirementGroup:
+    """One block of requirementsDB.json: pick `required` courses (or credits) from `options`"""
+    category: str
+    name: str
+    required: int
+    by_credits: bool
+    # Each option is a list of parts that must all be taken ("ElE 235 & ElE 236");
+    # each part is a list of alternatives, any one of which counts ("Math 263 | Math 319")
+    options: List[List[List[str]]] = field(default_factory=list)
+
+
+def parse_option(text: str) -> List[List[str]]:
+    """Parse one requirement entry into AND-parts of OR-alternatives"""
+    return [alternatives for alternatives in (parse_requirement(p) for p in text.split('&')) if alternatives]
+
+
+def make_group(category: str, name: str, required: int, entries: List[str]) -> RequirementGroup:
+    options = [option for option in (parse_option(e) for e in entries if e and e.strip()) if option]
+    by_credits = required > MAX_COURSE_COUNT
+    # "Electives": [2, "Csci 345 | Csci 444 | ..."] means two courses from the list
+    if not by_credits and len(options) == 1 and len(options[0]) == 1 and required > 1:
+        options = [[[course]] for course in options[0][0]]
+    return RequirementGroup(category, name, required, by_credits, options)
+
+
+def load_requirement_groups(json_path: str) -> List[RequirementGroup]:
+    """
+    Flatten requirementsDB.json into requirement groups
+
+    Handles the three layouts used in the file: {"courses": [...]} (all required),
+    {"choices": {name: [count, ...]}} and bare [count, ...] lists.
+
+    Args:
+        json_path: Path to the requirements JSON file
+
+    Returns:
+        Requirement groups in file order
+    """
+    with open(json_path, 'r', encoding='utf-8') as f:
+        requirements = json.load(f)
+
+    groups = []
+    for category, subcategories in requirements.items():
+        if isinstance(subcategories, list) and len(subcategories) > 1:
+            groups.append(make_group(category, category, subcategories[0], subcategories[1:]))
+        elif isinstance(subcategories, dict):
+            for subcategory, data in subcategories.items():
+                if isinstance(data, list) and len(data) > 1:
+                    groups.append(make_group(category, subcategory, data[0], data[1:]))
+                elif isinstance(data, dict):
+                    if 'courses' in data:
+                        courses = [c for c in data['courses'] if c]
+                        groups.append(make_group(category, subcategory, len(courses), courses))
+                    for choice_name, choice_data in data.get('choices', {}).items():
+                        if isinstance(choice_data, list) and len(choice_data) > 1:
+                            groups.append(make_group(category, f"{subcategory} - {choice_name}",
+                                                     choice_data[0], choice_data[1:]))
+    return groups
+
+
+def course_number(course_id: str) -> int:
+    match = re.search(r'(\d+)', course_id)
+    return int(match.group(1)) if match else 999
+
+
+class DegreePlanner:
+    """Deterministic semester planner over the catalog prerequisite graph"""
+
+    def __init__(self, catalog: CourseCatalog, requirements_json: str = REQUIREMENTS_JSON):
+        """
+        Args:
+            catalog: Loaded course catalog (prerequisites and credits)
+            requirements_json: Path to requirementsDB.json
+        """
+        self.catalog = catalog
+        self.groups = load_requirement_groups(requirements_json)
+        # Changes whenever requirementsDB.json does; stored with anything derived from the groups
+        with open(requirements_json, 'rb') as f:
+            self.version = hashlib.sha256(f.read()).hexdigest()[:16]
+        print(f"[INFO] Loaded {len(self.groups)} requirement groups")
+
+    def groups_for(self, emphasis: Optional[str]) -> List[RequirementGroup]:
+        """Requirement groups that apply to a student in `emphasis`"""
+        emphasis_only = {c for categories in EMPHASIS_CATEGORIES.values() for c in categories}
+        own = set(EMPHASIS_CATEGORIES.get(emphasis or '', []))
+        return [g for g in self.groups if g.category not in emphasis_only or g.category in own]
+
+    def credits(self, course_id: str) -> int:
+        course = self.catalog.course_map.get(course_id)
+        return course['credits'] if course else DEFAULT_CREDITS
+
+    def unmet_groups(self, course_id: str, have: Set[str]) -> List[List[str]]:
+        """Prerequisite OR-groups of a course not satisfied by `have`"""
+        return [g for g in self.catalog.prerequisite_groups.get(course_id, []) if not any(c in have for c in g)]
+
+    def pick_alternative(self, alternatives: List[str], have: Set[str]) -> str:
+        """Choose which of several equivalent courses to plan: catalog courses with fewest missing prerequisites"""
+        return min(alternatives, key=lambda c: (c not in self.catalog.course_map,
+                                                len(self.unmet_groups(c, have)), course_number(c)))
+
+    def add_with_prerequisites(self, course_id: str, completed: Set[str], chosen: Dict[str, None],
+                               visiting: Set[str] = None) -> None:
+        """Add a course to the plan after (recursively) adding whatever it still needs"""
+        if course_id in completed or course_id in chosen:
+            return
+        visiting = visiting if visiting is not None else set()
+        if course_id in visiting:
+            return  # Prerequisite cycle in the catalog; the scheduler reports it
+        visiting.add(course_id)
+        for group in self.unmet_groups(course_id, completed | chosen.keys()):
+            have = completed | chosen.keys()
+            if any(c in have for c in group):
+                continue  # Satisfied by a course added for an earlier group
+            self.add_with_prerequisites(self.pick_alternative(group, have), completed, chosen, visiting)
+        visiting.discard(course_id)
+        chosen[course_id] = None
+
+    def option_satisfied(self, option: List[List[str]], have: Set[str]) -> bool:
+        return all(any(c in have for c in part) for part in option)
+
+    def option_weight(self, option: List[List[str]]) -> int:
+        return sum(self.credits(part[0]) for part in option)
+
+    def group_progress(self, group: RequirementGroup, completed: Set[str]):
+        """
+        Returns:
+            (options of the group already satisfied, courses or credits they count for)
+        """
+        done = [o for o in group.options if self.option_satisfied(o, completed)]
+        return done, sum(self.option_weight(o) for o in done) if group.by_credits else len(done)
+
+    def progress(self, completed_courses: Iterable[str], emphasis: str = None) -> List[Dict]:
+        """
+        Progress towards every requirement group, without planning what is left
+
+        Args:
+            completed_courses: Course names in any spacing/case
+            emphasis: Student's emphasis (selects emphasis requirement groups)
+
+        Returns:
+            Per-group progress reports
+        """
+        completed = {normalize_course_id(c) for c in completed_courses if c}
+        reports = []
+        for group in self.groups_for(emphasis):
+            _, progress = self.group_progress(group, completed)
+            reports.append({
+                'category': group.category,
+                'group': group.name,
+                'required': group.required,
+                'unit': 'credits' if group.by_credits else 'courses',
+                'completed': progress,
+                'satisfied': progress >= group.required,
+            })
+        return reports
+
+    def select_courses(self, groups: List[RequirementGroup], completed: Set[str]):
+        """
+        Pick the courses still needed for every requirement group
+
+        Options already planned for another group are preferred (one course can
+        count twice), then those closest to being takeable, then lower numbers.
+
+        Returns:
+            (ordered dict of chosen course IDs, per-group progress reports)
+        """
+        chosen = {}
+        reports = []
+        for group in groups:
+            done, progress = self.group_progress(group, completed)
+            needed = group.required - progress
+            planned = []
+
+            def rank(option):
+                have = completed | chosen.keys()
+                courses = [self.pick_alternative(part, have) for part in option]
+                return (not self.option_satisfied(option, have),
+                        sum(len(self.unmet_groups(c, have)) for c in courses),
+                        min(course_number(c) for c in courses))
+
+            for option in sorted((o for o in group.options if o not in done), key=rank):
+                if needed <= 0:
+                    break
+                for part in option:
+                    have = completed | chosen.keys()
+                    if not any(c in have for c in part):
+                        course_id = self.pick_alternative(part, have)
+                        self.add_with_prerequisites(course_id, completed, chosen)
+                    planned.append(next(c for c in part if c in completed | chosen.keys()))
+                needed -= self.option_weight(option) if group.by_credits else 1
+
+            reports.append({
+                'category': group.category,
+                'group': group.name,
+                'required': group.required,
+                'unit': 'credits' if group.by_credits else 'courses',
+                'completed': progress,
+                'planned': planned,
+                'satisfied': needed <= 0,
+            })
+        return chosen, reports
+
+    def schedule(self, chosen: Dict[str, None], completed: Set[str], start_semester: int,
+                 max_credits: int, max_semesters: int):
+        """
+        Layered topological scheduling with a per-semester credit cap
+
+        Each semester takes the courses whose prerequisites were finished in
+        earlier semesters, longest remaining chain first so long sequences
+        (Csci 111 -> 112 -> 211 -> ...) start as early as possible.
+
+        Returns:
+            (list of semesters, list of course IDs that could not be scheduled)
+        """
+        remaining = set(chosen)
+
+        # Length of the longest chain of planned courses that depends on each course
+        depth = {}
+
+        def chain(course_id, stack=()):
+            if course_id not in depth:
+                if course_id in stack:
+                    return 0
+                depth[course_id] = 1 + max((chain(c, stack + (course_id,))
+                                            for c in self.catalog.unlocks.get(course_id, []) if c in remaining),
+                                           default=0)
+            return depth[course_id]
+
+        for course_id in remaining:
+            chain(course_id)
+
+        done = set(completed)
+        semesters = []
+        while remaining and len(semesters) < max_semesters:
+            ready = sorted((c for c in remaining if not self.unmet_groups(c, done)),
+                           key=lambda c: (-depth[c], course_number(c), c))
+            taken = []
+            load = 0
+            for course_id in ready:
+                credits = self.credits(course_id)
+                if load + credits <= max_credits or not taken:
+                    taken.append(course_id)
+                    load += credits
+            if not taken:
+                break  # Everything left waits on a cycle or an unplannable prerequisite
+            semesters.append({
+                'semester': start_semester + len(semesters),
+                'credits': load,
+                'courses': [self.describe(c) for c in taken],
+            })
+            done.update(taken)
+            remaining.difference_update(taken)
+        return semesters, sorted(remaining)
+
+    def describe(self, course_id: str) -> Dict:
+        course = self.catalog.course_map.get(course_id)
+        return {
+            'id': course_id,
+            'name': course['name'] if course else course_id,
+            'credits': self.credits(course_id),
+        }
+
+    def plan(self, completed_courses: Iterable[str], emphasis: str = None, current_semester: int = 1,
+             max_credits: int = 15, max_semesters: int = 12) -> Dict:
+        """
+        Plan the remaining degree requirements semester by semester
+
+        Args:
+            completed_courses: Course names from the transcript in any spacing/case
+            emphasis: Student's emphasis (selects emphasis requirement groups)
+            current_semester: First semester to schedule into
+            max_credits: Credit cap per semester
+            max_semesters: Give up after this many semesters
+
+        Returns:
+            Dictionary with the semester-by-semester plan and requirement progress
+        """
+        with metrics.timed(PLAN_LATENCY):
+            completed = {normalize_course_id(c) for c in completed_courses if c}
+            chosen, reports = self.select_courses(self.groups_for(emphasis), completed)
+            semesters, unscheduled = self.schedule(chosen, completed, current_semester, max_credits, max_semesters)
+
+        return {
+            'emphasis': emphasis,
+            'start_semester': current_semester,
+            'max_credits': max_credits,
+            'completed': sorted(completed),
+            'semesters': semesters,
+            'total_credits': sum(s['credits'] for s in semesters),
+            'requirements': reports,
+            'unscheduled': [self.describe(c) for c in unscheduled],
+        }
+
+
+def transcript_courses(transcript: str) -> List[str]:
+    """
+    Passed course names from a stored transcript (the JSON saved by TranscriptSetup)
+
+    Args:
+        transcript: User.transcript column value
+
+    Returns:
+        Course names; entries with a failing (zero) grade are left out
+    """
+    try:
+        data = json.loads(transcript) if transcript else {}
+    except ValueError:
+        return []
+    courses = []
+    for course in data.get('courses', []) if isinstance(data, dict) else []:
+        if isinstance(course, str):
+            courses.append(course)
+        elif isinstance(course, dict) and course.get('name'):
+            grade = str(course.get('grade', '')).strip().upper()
+            try:
+                failed = float(grade) == 0
+            except ValueError:
+                failed = grade in ('F', 'W')
+            if not failed:
+                courses.append(course['name'])
+    return courses
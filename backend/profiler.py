@@ -0,0 +1,146 @@
+import os
+import re
+import sys
+import json
+import time
+import threading
+from collections import Counter
+from typing import List, Dict, Optional
+
+# Where per-request captures are written
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profiles')
+
+# Request/profile ids become file names, so only allow a safe alphabet
+PROFILE_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+def frame_label(frame) -> str:
+    """Name a stack frame as file:function (no ';' so collapsed stacks stay parseable)"""
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}".replace(';', ':')
+
+
+class SamplingProfiler:
+    """
+    Low-overhead wall-clock sampling profiler for a single thread
+
+    A background thread reads the target thread's current frame every
+    `interval` seconds and counts whole stacks, so the profiled code runs
+    uninstrumented. Output is in the collapsed-stack format used by
+    flamegraph.pl and speedscope ("outer;inner;leaf count").
+    """
+
+    def __init__(self, thread_id: int = None, interval: float = 0.005):
+        """
+        Args:
+            thread_id: Thread to sample (defaults to the calling thread)
+            interval: Seconds between samples
+        """
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self.started_at = None
+        self.duration = 0.0
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self) -> 'SamplingProfiler':
+        self.started_at = time.perf_counter()
+        self.thread = threading.Thread(target=self.run, name='sampling-profiler', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> 'SamplingProfiler':
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.duration = time.perf_counter() - self.started_at
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def run(self) -> None:
+        while not self.stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(frame_label(frame))
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """Render samples as collapsed stacks, heaviest first"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class ProfileStore:
+    """Keeps the most recent captures on disk as <id>.folded plus <id>.json metadata"""
+
+    def __init__(self, directory: str = PROFILE_DIR, max_profiles: int = 200):
+        self.directory = directory
+        self.max_profiles = max_profiles
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, profile_id: str, ext: str) -> Optional[str]:
+        if not PROFILE_ID_PATTERN.match(profile_id):
+            return None
+        return os.path.join(self.directory, f"{profile_id}.{ext}")
+
+    def save(self, profile_id: str, profiler: SamplingProfiler, meta: Dict) -> bool:
+        """
+        Write one capture and prune the oldest beyond max_profiles
+
+        Args:
+            profile_id: Request id the capture belongs to
+            profiler: Stopped profiler
+            meta: Extra request details (method, path, status...)
+
+        Returns:
+            False if the id is not a valid file name and nothing was written
+        """
+        folded_path = self.path(profile_id, 'folded')
+        if folded_path is None:
+            return False
+        meta = dict(meta, id=profile_id, samples=profiler.samples,
+                    duration=round(profiler.duration, 4), interval=profiler.interval, created=time.time())
+        with self.lock:
+            with open(folded_path, 'w', encoding='utf-8') as f:
+                f.write(profiler.collapsed())
+            with open(self.path(profile_id, 'json'), 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+            self.prune()
+        return True
+
+    def prune(self) -> None:
+        entries = sorted(
+            (e for e in os.scandir(self.directory) if e.name.endswith('.json')),
+            key=lambda e: e.stat().st_mtime
+        )
+        for entry in entries[:max(0, len(entries) - self.max_profiles)]:
+            profile_id = entry.name[:-len('.json')]
+            for ext in ('json', 'folded'):
+                try:
+                    os.remove(self.path(profile_id, ext))
+                except OSError:
+                    pass
+
+    def list(self) -> List[Dict]:
+        """Metadata for every stored capture, newest first"""
+        profiles = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.json'):
+                try:
+                    with open(entry.path, 'r', encoding='utf-8') as f:
+                        profiles.append(json.load(f))
+                except (OSError, ValueError):
+                    continue
+        return sorted(profiles, key=lambda p: p.get('created', 0), reverse=True)
@@ -0,0 +1,110 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+
+import metrics
+
+RATE_LIMITED = metrics.Counter('advisor_rate_limited_total', 'Prompt requests refused by a rate limit', ['limit'])
+
+
+class TokenBucket:
+    """Refills at `rate` per second up to `capacity`; debits may run it negative"""
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` is available (0 if it is now)"""
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """
+    Per-key request and generated-token budgets
+
+    Each key (a user or a client IP) has two buckets: one spends a token per
+    request, the other is debited with the tokens the model generated once a
+    response finishes. A request is admitted only while both have budget
+    left, so a client streaming long answers runs out as surely as one
+    sending many short ones.
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float,
+                 request_burst: float = None, token_burst: float = None, max_keys: int = 10000):
+        """
+        Args:
+            requests_per_minute: Sustained request rate per key
+            tokens_per_minute: Sustained generated-token rate per key
+            request_burst: Requests a quiet key may send at once (default: a minute's worth)
+            token_burst: Generated tokens a quiet key may use at once (default: a minute's worth)
+            max_keys: Buckets kept; the least recently used are dropped (and start full again)
+        """
+        self.request_rate = requests_per_minute / 60.0
+        self.token_rate = tokens_per_minute / 60.0
+        self.request_burst = request_burst or requests_per_minute
+        self.token_burst = token_burst or tokens_per_minute
+        self.max_keys = max_keys
+        self.buckets = OrderedDict()  # Key -> (request bucket, token bucket)
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, prefix: str, requests_per_minute: float, tokens_per_minute: float) -> 'RateLimiter':
+        """Limits from {prefix}_REQUESTS_PER_MINUTE and {prefix}_TOKENS_PER_MINUTE, with defaults"""
+        return cls(float(os.getenv(f'{prefix}_REQUESTS_PER_MINUTE', requests_per_minute)),
+                   float(os.getenv(f'{prefix}_TOKENS_PER_MINUTE', tokens_per_minute)))
+
+    def get_buckets(self, key: str, now: float):
+        """Buckets for a key, created full (caller holds the lock)"""
+        buckets = self.buckets.get(key)
+        if buckets is None:
+            buckets = self.buckets[key] = (TokenBucket(self.request_rate, self.request_burst, now),
+                                           TokenBucket(self.token_rate, self.token_burst, now))
+            if len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(key)
+        return buckets
+
+    def check(self, key: str) -> float:
+        """
+        Admit one request for a key
+
+        Args:
+            key: Caller identity ("user:12", "ip:10.0.0.5")
+
+        Returns:
+            0 if admitted (a request is spent), otherwise seconds until the caller may retry
+        """
+        now = time.monotonic()
+        with self.lock:
+            requests, tokens = self.get_buckets(key, now)
+            requests.refill(now)
+            tokens.refill(now)
+            if tokens.tokens <= 0:
+                RATE_LIMITED.labels('tokens').inc()
+                return tokens.wait_time(1)
+            wait = requests.wait_time(1)
+            if wait:
+                RATE_LIMITED.labels('requests').inc()
+                return wait
+            requests.tokens -= 1
+            return 0.0
+
+    def charge(self, key: str, generated_tokens: float) -> None:
+        """Debit the tokens a finished response generated"""
+        if generated_tokens <= 0:
+            return
+        now = time.monotonic()
+        with self.lock:
+            _, tokens = self.get_buckets(key, now)
+            tokens.refill(now)
+            tokens.tokens -= generated_tokens
@@ -0,0 +1,212 @@
+import re
+import json
+from dataclasses import dataclass, field, asdict
+from typing import List, Dict, Iterable, Tuple, Optional, IO
+
+try:
+    import msgpack  # Optional: only needed for the msgpack format
+except ImportError:
+    msgpack = None
+
+REPORT_FORMATS = ('json', 'ndjson', 'msgpack')
+
+
+@dataclass
+class CourseRecord:
+    """One course from CourseAnalyzer.analyze_course_relationships"""
+    course_id: str
+    name: str
+    field: str
+    number: int
+    level: int
+    level_name: str
+    level_relation: str
+    description: str
+    completed: bool
+    prerequisites: List[str] = field(default_factory=list)
+    completed_prerequisites: List[str] = field(default_factory=list)
+    prerequisites_met: bool = True
+    next_courses: List[str] = field(default_factory=list)
+    related_courses: List[str] = field(default_factory=list)
+    groups: List[str] = field(default_factory=list)
+
+    @property
+    def display_name(self) -> str:
+        """Course name, or empty if the name only repeats the course ID"""
+        if not self.name or not isinstance(self.name, str):
+            return ""
+        if re.sub(r'\s+', '', self.name).upper() == self.course_id.upper():
+            return ""
+        return self.name
+
+    @classmethod
+    def from_relationship(cls, course_id: str, info: Dict) -> 'CourseRecord':
+        """Build a record from one entry of the relationships dictionary"""
+        prereqs = info.get('prerequisites', {})
+        return cls(
+            course_id=course_id,
+            name=info.get('name', course_id),
+            field=info.get('field', ''),
+            number=info.get('number', 0),
+            level=info.get('level', 0),
+            level_name=info.get('level_name', ''),
+            level_relation=info.get('level_relation', ''),
+            description=info.get('description', ''),
+            completed=info.get('completed', False),
+            prerequisites=list(prereqs.get('list', [])),
+            completed_prerequisites=list(prereqs.get('completed', [])),
+            prerequisites_met=prereqs.get('all_completed', True),
+            next_courses=list(info.get('next_courses', [])),
+            related_courses=list(info.get('related_courses', [])),
+            groups=list(info.get('groups', []))
+        )
+
+
+@dataclass
+class ReportSummary:
+    """Transcript-level results written before the course records"""
+    gpa: Dict[str, float] = field(default_factory=dict)
+    completed_courses: List[str] = field(default_factory=list)
+    keyword: Optional[str] = None
+    keyword_matches: List[str] = field(default_factory=list)
+
+
+def group_by_department(relationships: Dict[str, Dict]) -> List[Tuple[str, List[CourseRecord]]]:
+    """
+    Group relationship entries by department in one pass
+
+    Args:
+        relationships: Output of CourseAnalyzer.analyze_course_relationships
+
+    Returns:
+        List of (department, records) sorted by department, records sorted by course number
+    """
+    departments = {}
+    for course_id, info in relationships.items():
+        if info['field']:
+            departments.setdefault(info['field'], []).append(CourseRecord.from_relationship(course_id, info))
+
+    return [
+        (dept, sorted(departments[dept], key=lambda r: r.number))
+        for dept in sorted(departments)
+    ]
+
+
+def check_format(fmt: str) -> None:
+    """
+    Fail before any output is opened if a report format can't be written
+
+    Raises:
+        ValueError: Unknown format
+        RuntimeError: msgpack requested but not installed
+    """
+    if fmt not in REPORT_FORMATS:
+        raise ValueError(f"Unknown report format: {fmt}")
+    if fmt == 'msgpack' and msgpack is None:
+        raise RuntimeError("msgpack output requires the 'msgpack' package (install the 'report' extra)")
+
+
+class ReportWriter:
+    """
+    Streaming writer for analysis reports
+
+    Formats:
+        json    - a single object: {"summary": {...}, "courses": [...]}
+        ndjson  - one {"type": ..., "data": ...} object per line, summary first
+        msgpack - the same typed records as ndjson, packed back to back
+    """
+
+    def __init__(self, stream: IO, fmt: str = 'ndjson'):
+        """
+        Args:
+            stream: Text stream for json/ndjson, binary stream for msgpack
+            fmt: One of REPORT_FORMATS
+        """
+        check_format(fmt)
+        self.stream = stream
+        self.fmt = fmt
+        self.count = 0
+        self.packer = msgpack.Packer() if fmt == 'msgpack' else None
+
+    def write_typed(self, record_type: str, data: Dict) -> None:
+        """Write a single typed record in ndjson/msgpack framing"""
+        if self.fmt == 'msgpack':
+            self.stream.write(self.packer.pack({'type': record_type, 'data': data}))
+        else:
+            self.stream.write(json.dumps({'type': record_type, 'data': data}) + "\n")
+
+    def begin(self, summary: ReportSummary) -> None:
+        """Write the report header"""
+        if self.fmt == 'json':
+            self.stream.write('{"summary": ' + json.dumps(asdict(summary)) + ', "courses": [')
+        else:
+            self.write_typed('summary', asdict(summary))
+
+    def write_course(self, record: CourseRecord) -> None:
+        """Write one course record"""
+        if self.fmt == 'json':
+            self.stream.write((", " if self.count else "") + json.dumps(asdict(record)))
+        else:
+            self.write_typed('course', asdict(record))
+        self.count += 1
+
+    def end(self) -> None:
+        """Finish the report"""
+        if self.fmt == 'json':
+            self.stream.write("]}\n")
+
+    def write_report(self, summary: ReportSummary, records: Iterable[CourseRecord]) -> int:
+        """
+        Write a full report
+
+        Returns:
+            Number of course records written
+        """
+        self.begin(summary)
+        for record in records:
+            self.write_course(record)
+        self.end()
+        return self.count
+
+
+def load_report(path: str) -> Tuple[ReportSummary, List[CourseRecord]]:
+    """
+    Load a report written by ReportWriter; the format is taken from the file extension
+
+    Args:
+        path: Path ending in .json, .ndjson or .msgpack
+
+    Returns:
+        (summary, course records)
+
+    Raises:
+        ValueError: Unknown extension, or a record without a report type
+            (such as a line from a batch-mode results file)
+    """
+    summary = ReportSummary()
+    records = []
+
+    if path.endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return ReportSummary(**data['summary']), [CourseRecord(**c) for c in data['courses']]
+
+    if path.endswith('.msgpack'):
+        if msgpack is None:
+            raise RuntimeError("Reading msgpack reports requires the 'msgpack' package (install the 'report' extra)")
+        with open(path, 'rb') as f:
+            items = list(msgpack.Unpacker(f, raw=False))
+    elif path.endswith('.ndjson'):
+        with open(path, 'r', encoding='utf-8') as f:
+            items = [json.loads(line) for line in f if line.strip()]
+    else:
+        raise ValueError(f"Unknown report file extension: {path}")
+
+    for item in items:
+        if not isinstance(item, dict) or 'type' not in item:
+            raise ValueError(f"{path} is not an analysis report: record without a 'type'")
+        if item['type'] == 'summary':
+            summary = ReportSummary(**item['data'])
+        elif item['type'] == 'course':
+            records.append(CourseRecord(**item['data']))
+    return summary, records
@@ -0,0 +1,221 @@
+import os
+import json
+import time
+import queue
+import logging
+from typing import List, Iterator
+
+logger = logging.getLogger(__name__)
+
+
+class StreamSink:
+    """
+    Receives streamed LLM events from LocalLLM.get_response
+
+    The base class ignores everything, so it doubles as the no-op sink.
+    Subclasses override only the events they care about.
+    """
+
+    def on_reasoning(self, delta: str) -> None:
+        """Called for every reasoning_content delta"""
+
+    def on_content(self, delta: str) -> None:
+        """Called for every answer content delta"""
+
+    def on_finish(self, answer: str, reasoning: str) -> None:
+        """Called once when the stream ends"""
+
+    def on_error(self, error: Exception) -> None:
+        """Called if the request or stream fails"""
+
+    @property
+    def cancelled(self) -> bool:
+        """True once nobody is listening any more; the producer should stop generating"""
+        return False
+
+
+# Explicit name for the default production sink
+NullSink = StreamSink
+
+
+class ConsoleSink(StreamSink):
+    """Debug sink: echoes every token to stdout as it arrives"""
+
+    def __init__(self):
+        self.has_reason_started = False
+        self.has_content_started = False
+
+    def on_reasoning(self, delta: str) -> None:
+        if not self.has_reason_started:
+            self.has_reason_started = True
+            print("\n~~~ BEGINNING OF REASONING ~~~")
+        print(delta, end="")
+
+    def on_content(self, delta: str) -> None:
+        if not self.has_content_started:
+            self.has_content_started = True
+            print("\n~~~ END OF REASONING ~~~")
+            print("\n~~~ BEGINNING OF ANSWER ~~~")
+        print(delta, end="")
+
+    def on_finish(self, answer: str, reasoning: str) -> None:
+        print("\n~~~ END OF ANSWER ~~~")
+
+    def on_error(self, error: Exception) -> None:
+        print("Error getting response:", error)
+
+
+class BufferedLogSink(StreamSink):
+    """Collects deltas in memory and writes one log record per response"""
+
+    def __init__(self, level: int = logging.DEBUG):
+        self.level = level
+        self.reasoning_parts: List[str] = []
+        self.content_parts: List[str] = []
+
+    def on_reasoning(self, delta: str) -> None:
+        self.reasoning_parts.append(delta)
+
+    def on_content(self, delta: str) -> None:
+        self.content_parts.append(delta)
+
+    def on_finish(self, answer: str, reasoning: str) -> None:
+        if logger.isEnabledFor(self.level):
+            logger.log(self.level, "LLM reasoning: %s", "".join(self.reasoning_parts))
+            logger.log(self.level, "LLM answer: %s", "".join(self.content_parts))
+
+    def on_error(self, error: Exception) -> None:
+        logger.error("Error getting response: %s", error)
+
+
+class SSESink(StreamSink):
+    """
+    Forwards events as Server-Sent Events
+
+    The producer (LocalLLM) pushes onto a queue; a Flask response generator
+    drains it through events(), so the two can run on different threads.
+    """
+
+    DONE = object()
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.closed = False
+        self.disconnected = False
+
+    def send(self, event: str, data) -> None:
+        self.queue.put(f"event: {event}\ndata: {json.dumps(data)}\n\n")
+
+    def on_reasoning(self, delta: str) -> None:
+        self.send('reasoning', delta)
+
+    def on_content(self, delta: str) -> None:
+        self.send('content', delta)
+
+    def on_finish(self, answer: str, reasoning: str) -> None:
+        self.send('done', {'response': answer, 'reasoning': reasoning})
+        self.close()
+
+    def on_error(self, error: Exception) -> None:
+        self.send('error', {'error': str(error)})
+        self.close()
+
+    def close(self) -> None:
+        """End the event stream"""
+        if not self.closed:
+            self.closed = True
+            self.queue.put(self.DONE)
+
+    @property
+    def cancelled(self) -> bool:
+        return self.disconnected
+
+    def events(self) -> Iterator[str]:
+        """Yield SSE frames until the stream finishes or the client goes away"""
+        try:
+            while True:
+                item = self.queue.get()
+                if item is self.DONE:
+                    return
+                yield item
+        except GeneratorExit:
+            # The server closes the response iterator when the client disconnects
+            self.disconnected = True
+            raise
+
+
+class MetricsSink(StreamSink):
+    """Counts deltas and measures time to first token without any I/O"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.first_token_at = None
+        self.finished_at = None
+        self.reasoning_deltas = 0
+        self.content_deltas = 0
+
+    def mark_first_token(self) -> None:
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+
+    def on_reasoning(self, delta: str) -> None:
+        self.mark_first_token()
+        self.reasoning_deltas += 1
+
+    def on_content(self, delta: str) -> None:
+        self.mark_first_token()
+        self.content_deltas += 1
+
+    def on_finish(self, answer: str, reasoning: str) -> None:
+        self.finished_at = time.perf_counter()
+
+    def on_error(self, error: Exception) -> None:
+        self.finished_at = time.perf_counter()
+
+    @property
+    def time_to_first_token(self):
+        """Seconds from sink creation to the first delta, or None"""
+        return None if self.first_token_at is None else self.first_token_at - self.start
+
+
+class MultiSink(StreamSink):
+    """Fans every event out to several sinks"""
+
+    def __init__(self, *sinks: StreamSink):
+        self.sinks = [s for s in sinks if s is not None]
+
+    def on_reasoning(self, delta: str) -> None:
+        for sink in self.sinks:
+            sink.on_reasoning(delta)
+
+    def on_content(self, delta: str) -> None:
+        for sink in self.sinks:
+            sink.on_content(delta)
+
+    def on_finish(self, answer: str, reasoning: str) -> None:
+        for sink in self.sinks:
+            sink.on_finish(answer, reasoning)
+
+    def on_error(self, error: Exception) -> None:
+        for sink in self.sinks:
+            sink.on_error(error)
+
+    @property
+    def cancelled(self) -> bool:
+        return any(sink.cancelled for sink in self.sinks)
+
+
+def default_sink() -> StreamSink:
+    """
+    Sink used when the caller does not pass one
+
+    Set LLM_STREAM_SINK=console to echo tokens while debugging, or
+    LLM_STREAM_SINK=log to emit one log record per response.
+    Anything else (the default) does no per-token I/O.
+    """
+    mode = os.getenv("LLM_STREAM_SINK", "null").lower()
+    if mode == "console":
+        return ConsoleSink()
+    if mode == "log":
+        return BufferedLogSink()
+    return NullSink()
@@ -0,0 +1,19 @@
+import os
+import tempfile
+
+import pytest
+
+# app.py opens its database at import; keep tests off backend/db/database.sqlite
+os.environ.setdefault('DATABASE_PATH', os.path.join(tempfile.mkdtemp(prefix='advisor-tests-'), 'database.sqlite'))
+
+
+@pytest.fixture(scope='session')
+def app_module():
+    import app
+    app.init_database()
+    return app
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
@@ -0,0 +1,74 @@
+from types import SimpleNamespace
+
+from ai import LocalLLM
+
+
+class SummaryPool:
+    """Pool whose completions are returned as given and whose releases are recorded"""
+
+    def __init__(self, response):
+        self.response = response
+        self.released = []
+
+    def create_chat_completion(self, **kwargs):
+        return 'lease', self.response
+
+    def release(self, lease, error=None):
+        self.released.append((lease, error))
+
+
+def summary_response(text):
+    message = SimpleNamespace(content=text)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+def fill_history(llm, turns):
+    for i in range(turns):
+        llm.append_to_history('user' if i % 2 == 0 else 'assistant', f'turn {i}')
+
+
+def test_build_messages_order():
+    llm = LocalLLM(pool=SummaryPool(None))
+    llm.set_system_prompt('You are an advisor.')
+    fill_history(llm, 12)
+    llm.append_to_history('user', 'What next?')
+    llm.summary = 'Talked about Csci 211.'
+    llm.add_fact('Major: Computer Science')
+
+    messages = llm.build_messages()
+    assert messages[0] == {'role': 'system', 'content': 'You are an advisor.'}
+    # The nine turns before the newest message, oldest first
+    assert [m['content'] for m in messages[1:10]] == [f'turn {i}' for i in range(3, 12)]
+    volatile = messages[10]
+    assert volatile['role'] == 'system'
+    assert volatile['content'].index('Talked about Csci 211.') < volatile['content'].index('Major: Computer Science')
+    assert messages[11] == {'role': 'user', 'content': 'What next?'}
+    assert len(messages) == 12
+
+
+def test_build_messages_without_volatile_context():
+    llm = LocalLLM(pool=SummaryPool(None))
+    llm.set_system_prompt('You are an advisor.')
+    llm.append_to_history('user', 'Hi')
+    assert llm.build_messages() == [
+        {'role': 'system', 'content': 'You are an advisor.'},
+        {'role': 'user', 'content': 'Hi'},
+    ]
+
+
+def test_update_summary_releases_lease():
+    pool = SummaryPool(summary_response(' Short summary. '))
+    llm = LocalLLM(pool=pool)
+    fill_history(llm, 12)
+    llm.update_summary()
+    assert llm.summary == 'Short summary.'
+    assert pool.released == [('lease', None)]
+
+
+def test_update_summary_releases_lease_on_bad_response():
+    pool = SummaryPool(SimpleNamespace(choices=[], usage=None))
+    llm = LocalLLM(pool=pool)
+    fill_history(llm, 12)
+    llm.update_summary()
+    assert llm.summary == ''
+    assert len(pool.released) == 1 and isinstance(pool.released[0][1], IndexError)
@@ -0,0 +1,50 @@
+import json
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from catalog import CourseCatalog, query_terms, split_codes
+from transcript_index import ensure_transcript_index, index_transcript, search_transcripts
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    courses = [
+        {'name': 'PHYS211', 'credits': 4, 'description': 'General physics with calculus', 'prerequisites': ['MATH161']},
+        {'name': 'Csci 311', 'credits': 3, 'description': 'Algorithms and data structures',
+         'prerequisites': ['CSCI211 | CSCI 212']},
+        {'name': 'Csci 211', 'credits': 3, 'description': 'Programming and algorithms II', 'prerequisites': []},
+    ]
+    path = tmp_path / 'courses.json'
+    path.write_text(json.dumps(courses))
+    return CourseCatalog(str(path))
+
+
+def test_split_codes():
+    assert split_codes('PHYS211 and Csci 311L') == 'PHYS 211 and Csci 311 L'
+    assert query_terms('CSCI311') == query_terms('Csci 311') == ['csci', '311']
+
+
+@pytest.mark.parametrize('query', ['phys 211', 'PHYS211', 'Phys 21'])
+def test_unspaced_names_match_spaced_queries(catalog, query):
+    assert [c['id'] for c in catalog.search(query)['results']] == ['PHYS211']
+
+
+def test_unspaced_prerequisites_are_searchable(catalog):
+    assert [c['id'] for c in catalog.search('csci 212')['results']] == ['CSCI311']
+
+
+def test_autocomplete_spaced_and_unspaced(catalog):
+    assert [s['id'] for s in catalog.autocomplete('phys2')] == ['PHYS211']
+    assert [s['id'] for s in catalog.autocomplete('csci 3')] == ['CSCI311']
+
+
+def test_transcript_search_matches_unspaced_ocr_codes():
+    session = Session(create_engine('sqlite://'))
+    assert ensure_transcript_index(session)
+    index_transcript(session, 1, 'PHYS211 General Physics 4.0 A\nCSCI 311 Algorithms 3.0 B')
+    index_transcript(session, 2, json.dumps({'courses': [{'name': 'PHYS211', 'grade': 'C', 'credits': 4}]}))
+    assert search_transcripts(session, course='PHYS 211')['total'] == 1  # Only the JSON course column
+    assert search_transcripts(session, query='phys211')['total'] == 2
+    assert search_transcripts(session, query='PHYS 211', grade='C')['total'] == 1
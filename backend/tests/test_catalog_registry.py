@@ -0,0 +1,77 @@
+import json
+import shutil
+
+import pytest
+
+from catalog import COURSES_JSON
+from catalog_registry import CatalogRegistry, CATALOG_RELOADS
+from planner import REQUIREMENTS_JSON
+
+
+@pytest.fixture
+def registry(tmp_path):
+    courses = tmp_path / 'courses.json'
+    requirements = tmp_path / 'requirementsDB.json'
+    shutil.copy(COURSES_JSON, courses)
+    shutil.copy(REQUIREMENTS_JSON, requirements)
+    return CatalogRegistry(str(courses), str(requirements), interval=0)
+
+
+def add_course(registry, name):
+    with open(registry.courses_json, 'r', encoding='utf-8') as f:
+        courses = json.load(f)
+    courses.append({'name': name, 'credits': 3, 'description': 'Added in a test', 'prerequisites': []})
+    with open(registry.courses_json, 'w', encoding='utf-8') as f:
+        json.dump(courses, f)
+
+
+def count_builds(registry, monkeypatch):
+    builds = []
+    build = registry.build
+    monkeypatch.setattr(registry, 'build', lambda version: builds.append(version) or build(version))
+    return builds
+
+
+def test_unchanged_files_are_not_rebuilt(registry, monkeypatch):
+    builds = count_builds(registry, monkeypatch)
+    snapshot = registry.current
+    assert registry.reload() is False
+    assert registry.current is snapshot
+    assert builds == []
+
+
+def test_changed_file_publishes_next_version(registry):
+    snapshot = registry.current
+    add_course(registry, 'Test 101')
+    assert registry.reload() is True
+    assert registry.current.version == snapshot.version + 1
+    assert registry.current.catalog.get('TEST101') is not None
+    # Readers holding the old snapshot keep a consistent view
+    assert snapshot.catalog.get('TEST101') is None
+    assert registry.reload() is False
+
+
+def test_force_rebuilds_unchanged_files(registry):
+    assert registry.reload(force=True) is True
+    assert registry.current.version == 1
+
+
+def test_invalid_json_keeps_snapshot_and_is_not_retried(registry, monkeypatch):
+    builds = count_builds(registry, monkeypatch)
+    snapshot = registry.current
+    failed = CATALOG_RELOADS.labels('failed').value
+    with open(registry.courses_json, 'w', encoding='utf-8') as f:
+        f.write('[{"name": ')
+
+    assert registry.reload() is False
+    assert registry.current is snapshot
+    assert CATALOG_RELOADS.labels('failed').value == failed + 1
+    # Same broken contents: not rebuilt again
+    assert registry.reload() is False
+    assert len(builds) == 1
+
+    shutil.copy(COURSES_JSON, registry.courses_json)
+    add_course(registry, 'Test 102')
+    assert registry.reload() is True
+    assert registry.current.version == snapshot.version + 1
+    assert len(builds) == 2
@@ -0,0 +1,83 @@
+import json
+
+import numpy as np
+import pytest
+
+from catalog import CourseCatalog
+from cohort import AndOrMatrix, CohortIndex
+from planner import DegreePlanner
+
+STUDENTS = [
+    [],
+    ['Csci 111'],
+    ['CSCI111', 'csci 112', 'Math 261'],
+    ['Csci 111', 'Csci 112', 'Csci 211', 'Math 261', 'Math 262', 'Csci 311', 'Unknown 999'],
+]
+
+
+@pytest.fixture
+def planner(tmp_path):
+    courses = [
+        {'name': 'Csci 111', 'credits': 3, 'prerequisites': []},
+        {'name': 'Csci 112', 'credits': 3, 'prerequisites': ['Csci 111']},
+        {'name': 'Csci 211', 'credits': 3, 'prerequisites': ['Csci 112']},
+        {'name': 'Csci 311', 'credits': 3, 'prerequisites': ['Csci 211', 'Math 261 | Math 262']},
+        {'name': 'Math 261', 'credits': 4, 'prerequisites': []},
+        {'name': 'Math 262', 'credits': 4, 'prerequisites': ['Math 261']},
+    ]
+    requirements = {
+        'Core': {'Programming': {'courses': ['Csci 111', 'Csci 112', 'Csci 211']}},
+        'Mathematics': [8, 'Math 261', 'Math 262'],
+        'Upper Division': [1, 'Csci 311 | Csci 411'],
+    }
+    (tmp_path / 'courses.json').write_text(json.dumps(courses))
+    (tmp_path / 'requirements.json').write_text(json.dumps(requirements))
+    return DegreePlanner(CourseCatalog(str(tmp_path / 'courses.json')), str(tmp_path / 'requirements.json'))
+
+
+@pytest.fixture
+def index(planner):
+    return CohortIndex(planner.catalog, planner.groups)
+
+
+def test_and_or_matrix():
+    # item 0: always true; item 1: col0 and (col1 or col2)
+    matrix = AndOrMatrix([[], [[0], [1, 2]]])
+    completed = np.array([[False, False, False], [True, False, True], [True, False, False]])
+    assert matrix.evaluate(completed).tolist() == [[True, False], [True, True], [True, False]]
+
+
+def test_eligibility_matches_prerequisite_groups(planner, index):
+    completed = index.student_matrix(STUDENTS)
+    eligible = index.eligibility(completed)
+    for row, courses in enumerate(STUDENTS):
+        taken = {index.course_ids[c] for c in np.flatnonzero(completed[row])}
+        expected = [c['id'] for c in planner.catalog.courses
+                    if c['id'] not in taken and not planner.unmet_groups(c['id'], taken)]
+        assert [planner.catalog.courses[i]['id'] for i in np.flatnonzero(eligible[row])] == expected
+
+
+def test_eligible_for(index):
+    completed = index.student_matrix(STUDENTS)
+    assert index.eligible_for(completed, 'csci 311').tolist() == [False, False, False, False]
+    assert index.eligible_for(completed, 'Csci 112').tolist() == [False, True, False, False]
+    with pytest.raises(KeyError):
+        index.eligible_for(completed, 'Nope 100')
+
+
+def test_coverage_matches_planner_progress(planner, index):
+    coverage = index.coverage(index.student_matrix(STUDENTS))
+    for row, courses in enumerate(STUDENTS):
+        expected = [min(r['completed'], r['required']) for r in planner.progress(courses)]
+        assert coverage[row].tolist() == expected
+
+
+def test_coverage_summary(index):
+    summary = {g['group']: g['students_satisfied'] for g in index.coverage_summary(index.student_matrix(STUDENTS))}
+    assert summary == {'Programming': 1, 'Mathematics': 1, 'Upper Division': 1}
+
+
+def test_empty_cohort(index):
+    completed = index.student_matrix([])
+    assert index.eligibility(completed).shape == (0, len(index.catalog.courses))
+    assert index.coverage(completed).shape == (0, len(index.groups))
@@ -0,0 +1,76 @@
+import json
+
+import numpy as np
+import pytest
+
+import course_embeddings
+from catalog import CourseCatalog
+from course_embeddings import EmbeddingIndex, SemanticSearch, metadata_path
+
+# Unit vectors in 3 dimensions; row order is the index order
+VECTORS = [
+    [1.0, 0.0, 0.0],  # CSCI211
+    [0.0, 1.0, 0.0],  # CSCI311
+    [0.6, 0.8, 0.0],  # CSCI325
+    [0.8, 0.6, 0.0],  # CSCI999, no longer in the catalog
+]
+COURSE_IDS = ['CSCI211', 'CSCI311', 'CSCI325', 'CSCI999']
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    path = str(tmp_path / 'embeddings.f16')
+    np.array(VECTORS, dtype=np.float16).tofile(path)
+    with open(metadata_path(path), 'w', encoding='utf-8') as f:
+        json.dump({'model': 'test-model', 'count': len(VECTORS), 'dim': 3, 'course_ids': COURSE_IDS}, f)
+    return path
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    courses = [
+        {'name': 'Csci 211', 'credits': 3, 'description': 'Programming II', 'prerequisites': []},
+        {'name': 'Csci 311', 'credits': 3, 'description': 'Algorithms', 'prerequisites': ['CSCI211']},
+        {'name': 'Csci 325', 'credits': 3, 'description': 'Databases', 'prerequisites': ['CSCI211']},
+    ]
+    path = tmp_path / 'courses.json'
+    path.write_text(json.dumps(courses))
+    return CourseCatalog(str(path))
+
+
+def test_top_k_orders_by_similarity(index_path):
+    index = EmbeddingIndex(index_path)
+    hits = index.top_k(np.array([1.0, 0.0, 0.0]), 3)
+    assert [row for row, _ in hits] == [0, 3, 2]
+    assert [score for _, score in hits] == pytest.approx([1.0, 0.8, 0.6], abs=1e-3)
+
+
+def test_top_k_scores_across_chunks(index_path, monkeypatch):
+    monkeypatch.setattr(course_embeddings, 'SCORE_CHUNK', 3)
+    hits = EmbeddingIndex(index_path).top_k(np.array([0.0, 1.0, 0.0]), 2)
+    assert [row for row, _ in hits] == [1, 2]
+
+
+@pytest.mark.parametrize('k, expected', [(0, 0), (-1, 0), (2, 2), (10, 4)])
+def test_top_k_clamps_k(index_path, k, expected):
+    assert len(EmbeddingIndex(index_path).top_k(np.array([1.0, 0.0, 0.0]), k)) == expected
+
+
+def test_open_without_index(tmp_path):
+    assert EmbeddingIndex.open(str(tmp_path / 'missing.f16')) is None
+
+
+def test_search_drops_courses_missing_from_catalog(index_path, catalog):
+    search = SemanticSearch(catalog, EmbeddingIndex(index_path))
+    search.embed = lambda text: np.array([1.0, 0.0, 0.0], dtype=np.float32)
+    result = search.search('programming', k=3)
+    assert result['model'] == 'test-model'
+    # CSCI999 ranks second in the index but is gone from the catalog
+    assert [r['id'] for r in result['results']] == ['CSCI211', 'CSCI325']
+    assert result['results'][0]['score'] == pytest.approx(1.0, abs=1e-3)
+
+
+def test_blank_search_skips_embedding(index_path, catalog):
+    search = SemanticSearch(catalog, EmbeddingIndex(index_path))
+    search.embed = None  # Would fail if called
+    assert search.search('   ') == {'query': '   ', 'results': []}
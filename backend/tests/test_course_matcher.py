@@ -0,0 +1,69 @@
+import pytest
+
+from course_matcher import CourseMatcher, corrections_summary, split_code, weighted_distance
+
+
+@pytest.fixture
+def matcher():
+    ids = ['CSCI111', 'CSCI211', 'MATH101', 'MATH261', 'MATH261L', 'ENGL102', 'PHYS211', 'Upper-Level Placeholder']
+    return CourseMatcher(ids, departments={'HIST'})
+
+
+def test_confusable_substitutions_are_cheap():
+    assert weighted_distance('CSC1', 'CSCI') == 0.25
+    assert weighted_distance('CSCX', 'CSCI') == 1.0
+    assert weighted_distance('ABCDEF', 'UVWXYZ', max_cost=1.0) == float('inf')
+
+
+def test_split_code():
+    assert split_code('CSC1111') == ('CSCI', '111')
+    assert split_code('MATH1O1') == ('MATH', '101')
+    assert split_code('MATH261L') == ('MATH', '261L')
+
+
+@pytest.mark.parametrize('token, course_id', [
+    ('Csci 111', 'CSCI111'),
+    ('CSC1 111', 'CSCI111'),
+    ('MATH1O1', 'MATH101'),
+    ('Engl-102', 'ENGL102'),
+    ('Math 261L', 'MATH261L'),
+    ('CSCl 211', 'CSCI211'),
+])
+def test_misreads_are_corrected(matcher, token, course_id):
+    match = matcher.match(token)
+    assert match.course_id == course_id
+    assert match.in_catalog
+
+
+def test_exact_read_has_full_confidence(matcher):
+    match = matcher.match('CSCI 111')
+    assert match.cost == 0.0
+    assert match.confidence == 1.0
+
+
+def test_valid_number_is_not_rewritten(matcher):
+    # There is no PHYS 111; the number is trusted, so it doesn't become CSCI 111 or PHYS 211
+    match = matcher.match('PHYS 111')
+    assert match.course_id == 'PHYS111'
+    assert not match.in_catalog
+    assert matcher.match('XYZQ 111') is None
+
+
+def test_extra_departments_are_kept_as_read(matcher):
+    match = matcher.match('Hist 101')
+    assert match.course_id == 'HIST101'
+    assert not match.in_catalog
+
+
+def test_placeholders_are_not_course_ids(matcher):
+    assert 'Upper-Level Placeholder' not in matcher.course_ids
+
+
+def test_find_all(matcher):
+    text = "Fall 2023\nCSC1 111 Programming I 3.0 A\nMATH1O1 College Algebra 3.0 B\nRoom 101 Hall 2023"
+    matches = matcher.find_all(text)
+    assert [m.course_id for m in matches] == ['CSCI111', 'MATH101']
+    assert corrections_summary(matches) == {
+        'CSC1 111': {'course_id': 'CSCI111', 'confidence': matches[0].confidence},
+        'MATH1O1': {'course_id': 'MATH101', 'confidence': matches[1].confidence},
+    }
@@ -0,0 +1,95 @@
+import threading
+import time
+
+import pytest
+
+from fair_queue import FairQueue, QueueFull, QueueTimeout
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def queue_up(queue, order, caller, priority='interactive'):
+    """Acquire in a thread, record the grant order, release straight away"""
+    def run():
+        ticket = queue.acquire(caller, priority)
+        order.append(caller)
+        queue.release(ticket)
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def test_slots_are_limited():
+    queue = FairQueue(concurrency=2)
+    first, second = queue.acquire('a'), queue.acquire('b')
+    assert queue.status()['active'] == 2
+    with pytest.raises(QueueTimeout):
+        queue.acquire('c', timeout=0.05)
+    queue.release(first)
+    queue.release(second)
+    assert queue.status() == {'active': 0, 'concurrency': 2, 'waiting': 0, 'virtual_time': 0.0}
+
+
+def test_per_caller_waiting_limit():
+    queue = FairQueue(concurrency=1, max_waiting_per_flow=1)
+    held = queue.acquire('other')
+    waiter = threading.Thread(target=lambda: queue.release(queue.acquire('a')))
+    waiter.start()
+    wait_for(lambda: queue.status()['waiting'] == 1)
+    with pytest.raises(QueueFull):
+        queue.acquire('a')
+    queue.release(held)
+    waiter.join()
+
+
+def test_busy_caller_does_not_starve_others():
+    queue = FairQueue(concurrency=1, max_waiting_per_flow=10)
+    held = queue.acquire('busy')
+    order = []
+    threads = [queue_up(queue, order, 'busy') for _ in range(3)]
+    wait_for(lambda: queue.status()['waiting'] == 3)
+    threads.append(queue_up(queue, order, 'quiet'))
+    wait_for(lambda: queue.status()['waiting'] == 4)
+    queue.release(held)
+    for thread in threads:
+        thread.join()
+    # The quiet caller's first request competes with the busy caller's next one, not its whole backlog
+    assert order.index('quiet') <= 1
+
+
+def test_interactive_gets_the_larger_share():
+    queue = FairQueue(concurrency=1, max_waiting_per_flow=10)
+    held = queue.acquire('x')
+    order = []
+    threads = [queue_up(queue, order, 'batch', 'background') for _ in range(3)]
+    wait_for(lambda: queue.status()['waiting'] == 3)
+    threads += [queue_up(queue, order, 'chat') for _ in range(6)]
+    wait_for(lambda: queue.status()['waiting'] == 9)
+    queue.release(held)
+    for thread in threads:
+        thread.join()
+    # Both backlogged: interactive requests get PRIORITY_WEIGHTS 4:1 of the slots
+    assert order[:5].count('chat') == 4
+
+
+def test_actual_cost_is_charged_to_the_flow():
+    queue = FairQueue(concurrency=1, estimate=100)
+    ticket = queue.acquire('a')
+    ticket.cost = 500
+    queue.release(ticket)
+    assert queue.finish_tags[('interactive', 'a')] == pytest.approx(500 / 4.0)
+
+
+def test_timed_out_ticket_is_skipped():
+    queue = FairQueue(concurrency=1)
+    held = queue.acquire('a')
+    with pytest.raises(QueueTimeout):
+        queue.acquire('b', timeout=0.01)
+    queue.release(held)
+    assert queue.status()['active'] == 0
+    queue.release(queue.acquire('c', timeout=0.1))
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from catalog import CourseCatalog
+from intent_router import classify_intent, route_prompt
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    courses = [
+        {'name': 'Csci 211', 'credits': 3, 'description': 'Programming and algorithms II', 'prerequisites': []},
+        {'name': 'Csci 311', 'credits': 3, 'description': 'Algorithms and data structures',
+         'prerequisites': ['CSCI211']},
+        {'name': 'Csci 325', 'credits': 3, 'description': 'Databases', 'prerequisites': ['CSCI211']},
+    ]
+    path = tmp_path / 'courses.json'
+    path.write_text(json.dumps(courses))
+    return CourseCatalog(str(path))
+
+
+@pytest.mark.parametrize('prompt, intent', [
+    ("What are the prerequisites for Csci 311?", 'prerequisites'),
+    ("What do I need before taking Csci 311?", 'prerequisites'),
+    ("What can I take after Csci 211?", 'unlocks'),
+    ("What is Csci 211 a prerequisite for?", 'unlocks'),
+    ("How many credits is Csci 311?", 'credits'),
+    ("What is Csci 311 about?", 'description'),
+])
+def test_direct_lookups_are_routed(catalog, prompt, intent):
+    assert classify_intent(prompt) == intent
+    assert route_prompt(prompt, catalog)['intent'] == intent
+
+
+@pytest.mark.parametrize('prompt', [
+    "Should I take Csci 311 or Csci 325 after taking Csci 211?",
+    "How many credits do I need to graduate if I have taken Csci 211?",
+    "I failed Csci 211, is it really a prerequisite for Csci 311 or can I get an override?",
+    "What is Csci 311 about and is it worth it for a data science career?",
+    "Tell me about Csci 311 and Csci 325, which is easier?",
+    "Why is Csci 211 a prerequisite for Csci 311?",
+    "Can you explain Csci 311 prerequisites and whether I can take it now that I have Csci 211?",
+    "Does the credit hours of Csci 311 count toward my minor?",
+    "What will I learn in Csci 311 compared to Csci 325?",
+    "What are the prerequisites and credits for Csci 311?",
+    "How many credits is Csci 311? Is it hard?",
+])
+def test_advice_questions_go_to_the_llm(catalog, prompt):
+    assert classify_intent(prompt) is None
+    assert route_prompt(prompt, catalog) is None
+
+
+def test_prompts_without_courses_go_to_the_llm(catalog):
+    assert route_prompt("What are the prerequisites?", catalog) is None
+
+
+def test_route_answers_from_catalog(catalog):
+    result = route_prompt("What can I take after Csci 211?", catalog)
+    assert result['source'] == 'catalog'
+    assert result['response'] == "Csci 211 is a prerequisite for: Csci 311, Csci 325."
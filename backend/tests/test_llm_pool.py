@@ -0,0 +1,133 @@
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+from llm_pool import Endpoint, EndpointPool, NoEndpointAvailable
+
+REQUEST = httpx.Request('POST', 'http://test/v1/chat/completions')
+
+
+class FakeCompletions:
+    """Replays a script of results, raising the ones that are exceptions"""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        result = self.script.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def fake_endpoint(name, *script):
+    endpoint = Endpoint(name, 1, 'key')
+    endpoint.model_name = 'test-model'
+    endpoint.client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(script)))
+    return endpoint
+
+
+def connection_error():
+    return openai.APIConnectionError(request=REQUEST)
+
+
+def make_pool(*endpoints, **kwargs):
+    kwargs.setdefault('failure_threshold', 2)
+    kwargs.setdefault('cooldown', 30.0)
+    return EndpointPool(list(endpoints), health_interval=0, **kwargs)
+
+
+def open_breaker(pool, endpoint):
+    for _ in range(pool.failure_threshold):
+        pool.release(pool.acquire(), connection_error())
+    assert endpoint.state == Endpoint.OPEN
+
+
+def test_breaker_opens_after_threshold():
+    endpoint = fake_endpoint('a')
+    pool = make_pool(endpoint)
+    pool.release(pool.acquire(), connection_error())
+    assert endpoint.state == Endpoint.CLOSED
+    pool.release(pool.acquire(), connection_error())
+    assert endpoint.state == Endpoint.OPEN
+    assert pool.acquire() is None
+
+
+def test_non_failure_errors_do_not_count():
+    endpoint = fake_endpoint('a')
+    pool = make_pool(endpoint)
+    for _ in range(3):
+        pool.release(pool.acquire(), ValueError('bad request'))
+    assert endpoint.state == Endpoint.CLOSED
+    assert endpoint.consecutive_failures == 0
+
+
+def test_half_open_allows_one_trial():
+    endpoint = fake_endpoint('a')
+    pool = make_pool(endpoint, cooldown=0.0)
+    open_breaker(pool, endpoint)
+
+    trial = pool.acquire()
+    assert trial.trial and endpoint.state == Endpoint.HALF_OPEN
+    assert pool.acquire() is None
+
+    pool.release(trial)
+    assert endpoint.state == Endpoint.CLOSED
+    assert endpoint.consecutive_failures == 0
+
+
+def test_failed_trial_reopens():
+    endpoint = fake_endpoint('a')
+    pool = make_pool(endpoint, cooldown=0.0)
+    open_breaker(pool, endpoint)
+    pool.release(pool.acquire(), connection_error())
+    assert endpoint.state == Endpoint.OPEN
+
+
+def test_stale_success_does_not_close_breaker():
+    endpoint = fake_endpoint('a')
+    pool = make_pool(endpoint, cooldown=0.0)
+    in_flight = pool.acquire()  # A long stream started while the endpoint was still closed
+    open_breaker(pool, endpoint)
+
+    trial = pool.acquire()
+    assert trial.trial
+    pool.release(in_flight)
+    assert endpoint.state == Endpoint.HALF_OPEN
+    assert endpoint.trial_in_flight
+
+    pool.release(trial, connection_error())
+    assert endpoint.state == Endpoint.OPEN
+
+
+def test_connection_errors_retry_on_another_endpoint():
+    down = fake_endpoint('down', connection_error())
+    up = fake_endpoint('up', 'response')
+    pool = make_pool(down, up)
+    # Make the broken endpoint the first choice
+    up.outstanding = 1
+    lease, response = pool.create_chat_completion(messages=[])
+    assert response == 'response'
+    assert lease.endpoint is up
+    assert down.consecutive_failures == 1
+
+
+def test_timeouts_are_not_retried():
+    slow = fake_endpoint('slow', openai.APITimeoutError(request=REQUEST))
+    other = fake_endpoint('other', 'response')
+    pool = make_pool(slow, other)
+    other.outstanding = 1
+    with pytest.raises(openai.APITimeoutError):
+        pool.create_chat_completion(messages=[])
+    assert other.client.chat.completions.calls == 0
+    assert slow.outstanding == 0
+
+
+def test_no_endpoint_available():
+    pool = make_pool(fake_endpoint('a', connection_error()), max_attempts=3)
+    with pytest.raises(NoEndpointAvailable):
+        pool.create_chat_completion(messages=[])
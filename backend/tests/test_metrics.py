@@ -0,0 +1,65 @@
+import json
+import os
+
+import pytest
+
+import metrics
+
+REQUESTS = metrics.Counter('test_merge_requests_total', 'Test counter', ['route'])
+LATENCY = metrics.Histogram('test_merge_seconds', 'Test histogram', buckets=(0.1, 1.0))
+
+
+def worker_snapshot(requests, latencies):
+    """Snapshot as another worker process would write it"""
+    counter = metrics.CounterChild()
+    counter.inc(requests)
+    histogram = metrics.HistogramChild(LATENCY.buckets)
+    for value in latencies:
+        histogram.observe(value)
+    return {REQUESTS.name: [[['/api/prompt'], counter.snapshot()]], LATENCY.name: [[[], histogram.snapshot()]]}
+
+
+def sample(text, line_start):
+    return next(float(line.split()[-1]) for line in text.splitlines() if line.startswith(line_start))
+
+
+@pytest.fixture
+def metrics_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv('METRICS_DIR', str(tmp_path))
+    return tmp_path
+
+
+def test_single_process_renders_own_values(monkeypatch):
+    monkeypatch.delenv('METRICS_DIR', raising=False)
+    REQUESTS.labels('/single').inc(2)
+    assert sample(metrics.render_metrics(), 'test_merge_requests_total{route="/single"}') >= 2
+
+
+def test_render_sums_worker_snapshots(metrics_dir):
+    before = REQUESTS.labels('/api/prompt').value
+    (metrics_dir / '101.json').write_text(json.dumps(worker_snapshot(3, [0.05, 0.5])))
+    (metrics_dir / '102.json').write_text(json.dumps(worker_snapshot(4, [2.0])))
+    LATENCY.observe(0.05)
+
+    text = metrics.render_metrics()
+    assert sample(text, 'test_merge_requests_total{route="/api/prompt"}') == before + 7
+    assert sample(text, 'test_merge_seconds_bucket{le="0.1"}') == LATENCY.labels().counts[0] + 1
+    assert sample(text, 'test_merge_seconds_count') == LATENCY.labels().count + 3
+    # This process published its own snapshot while rendering
+    assert (metrics_dir / f'{os.getpid()}.json').exists()
+
+
+def test_retired_workers_still_count(metrics_dir):
+    (metrics_dir / '201.json').write_text(json.dumps(worker_snapshot(5, [])))
+    metrics.retire_worker(201)
+    (metrics_dir / '202.json').write_text(json.dumps(worker_snapshot(6, [])))
+    metrics.retire_worker(202)
+    assert sorted(p.name for p in metrics_dir.glob('*.json')) == ['retired.json']
+
+    before = REQUESTS.labels('/api/prompt').value
+    assert sample(metrics.render_metrics(), 'test_merge_requests_total{route="/api/prompt"}') == before + 11
+
+
+def test_unreadable_snapshot_is_skipped(metrics_dir):
+    (metrics_dir / '301.json').write_text('{"truncated')
+    assert 'test_merge_requests_total' in metrics.render_metrics()
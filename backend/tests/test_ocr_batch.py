@@ -0,0 +1,89 @@
+import json
+
+import numpy as np
+import pytest
+
+import ocr_search
+from ocr_search import load_completed_batch, page_seconds, plan_batches, pad_image
+
+
+def test_resume_drops_failed_records(tmp_path):
+    output = tmp_path / 'results.jsonl'
+    records = [
+        {'pdf': 'a.pdf', 'status': 'ok', 'courses': ['CSCI111']},
+        {'pdf': 'b.pdf', 'status': 'error', 'error': 'boom'},
+        {'pdf': 'c.pdf', 'status': 'ok', 'courses': []},
+    ]
+    output.write_text(''.join(json.dumps(r) + '\n' for r in records) + '{"pdf": "d.pdf", "sta')
+
+    assert load_completed_batch(str(output)) == {'a.pdf', 'c.pdf'}
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [r['pdf'] for r in lines] == ['a.pdf', 'c.pdf']
+
+    # A second resume finds nothing left to drop
+    assert load_completed_batch(str(output)) == {'a.pdf', 'c.pdf'}
+
+
+def test_resume_without_output(tmp_path):
+    assert load_completed_batch(str(tmp_path / 'missing.jsonl')) == set()
+
+
+def test_page_seconds_splits_batches_across_pages():
+    # Page 0 has images 0-1, page 1 has image 2, page 2 has none, page 3 has image 3
+    timings = [
+        {'images': 2, 'indices': [0, 2], 'seconds': 1.0},
+        {'images': 2, 'indices': [1, 3], 'seconds': 3.0},
+    ]
+    assert page_seconds([2, 1, 0, 1], timings) == pytest.approx([2.0, 0.5, 0.0, 1.5])
+
+
+def test_pad_image_keeps_content_at_origin():
+    image = np.zeros((2, 3), dtype=np.uint8)
+    padded = pad_image(image, 4, 5)
+    assert padded.shape == (4, 5)
+    assert (padded[:2, :3] == 0).all()
+    assert (padded[2:, :] == 255).all() and (padded[:, 3:] == 255).all()
+
+
+def test_pad_image_color_channels():
+    assert pad_image(np.zeros((2, 3, 3), dtype=np.uint8), 4, 4).shape == (4, 4, 3)
+
+
+def test_plan_batches_respects_batch_size():
+    batches = plan_batches([(10, 10)] * 5, batch_size=2, max_padding=1.5)
+    assert [len(b) for b in batches] == [2, 2, 1]
+    assert sorted(i for b in batches for i in b) == [0, 1, 2, 3, 4]
+
+
+def test_plan_batches_separates_sizes():
+    # Padding a small image to the large one would waste far more than 1.5x its pixels
+    shapes = [(100, 100), (10, 10), (100, 100), (10, 12)]
+    batches = plan_batches(shapes, batch_size=8, max_padding=1.5)
+    assert sorted(sorted(b) for b in batches) == [[0, 2], [1, 3]]
+
+
+def test_plan_batches_empty():
+    assert plan_batches([], batch_size=4, max_padding=1.5) == []
+
+
+def test_batch_workers_use_cli_ocr_options(monkeypatch):
+    calls = []
+    monkeypatch.setattr(ocr_search, 'get_reader', lambda: None)
+    monkeypatch.setattr(ocr_search, 'ocr_pdf', lambda path, **options: calls.append(options) or "MATH 261 A")
+    ocr_search.init_batch_worker(None, {'engine': 'page', 'batch_size': 4, 'workers': 2})
+    record = ocr_search.analyze_transcript_file('a.pdf')
+    assert record['status'] == 'ok'
+    assert calls == [{'verbose': False, 'engine': 'page', 'batch_size': 4, 'workers': 2}]
+
+
+def test_batch_worker_builds_matcher_once(monkeypatch):
+    built = []
+    from_catalog = ocr_search.CourseMatcher.from_catalog
+    monkeypatch.setattr(ocr_search.CourseMatcher, 'from_catalog',
+                        classmethod(lambda cls, *args, **kwargs: built.append(1) or from_catalog(*args, **kwargs)))
+    monkeypatch.setattr(ocr_search, 'get_reader', lambda: None)
+    monkeypatch.setattr(ocr_search, 'ocr_pdf', lambda path, **options: "MATH 261 A")
+    ocr_search.init_batch_worker(None)
+    for pdf in ('a.pdf', 'b.pdf', 'c.pdf'):
+        assert ocr_search.analyze_transcript_file(pdf)['courses'] == ['MATH261']
+    assert len(built) == 1
@@ -0,0 +1,101 @@
+import io
+import uuid
+
+import pytest
+from PIL import Image
+
+from photo_store import PhotoStore, InvalidPhoto
+
+
+class RecordingWorker:
+    """Stands in for ThumbnailWorker, so variants are only rendered on request"""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, photo):
+        self.submitted.append(photo)
+
+
+def image_bytes(fmt='PNG', size=(300, 200), mode='RGB', color=(200, 30, 30)):
+    output = io.BytesIO()
+    Image.new(mode, size, color).save(output, fmt)
+    return output.getvalue()
+
+
+@pytest.fixture
+def store(app_module, tmp_path, monkeypatch):
+    store = PhotoStore(str(tmp_path))
+    monkeypatch.setattr(app_module, 'photo_store', store)
+    monkeypatch.setattr(app_module, 'thumbnail_worker', RecordingWorker())
+    return store
+
+
+@pytest.fixture
+def user_client(client):
+    payload = {'email': f'{uuid.uuid4().hex}@example.com', 'password': 'pw', 'firstName': 'A', 'lastName': 'B'}
+    assert client.post('/api/auth/register', json=payload).status_code == 200
+    return client
+
+
+def upload(client, data):
+    return client.post('/api/users/photo', data={'photo': (io.BytesIO(data), 'photo.png')},
+                       content_type='multipart/form-data')
+
+
+def test_same_image_is_stored_once(app_module, store, user_client, tmp_path):
+    data = image_bytes()
+    first = upload(user_client, data)
+    second = upload(user_client, data)
+    assert first.status_code == second.status_code == 201
+    assert first.get_json()['photos'] == second.get_json()['photos']
+    assert len(list((tmp_path / 'originals').iterdir())) == 1
+    assert len(app_module.thumbnail_worker.submitted) == 2
+
+
+def test_non_image_is_rejected(store, user_client, tmp_path):
+    response = upload(user_client, b'not an image at all')
+    assert response.status_code == 400
+    assert list((tmp_path / 'originals').iterdir()) == []
+
+
+def test_unsupported_format_is_rejected(store):
+    with pytest.raises(InvalidPhoto):
+        store.save_original(image_bytes('BMP'))
+
+
+@pytest.mark.parametrize('ext, fmt', [('webp', 'WEBP'), ('jpg', 'JPEG')])
+def test_variants_render_square(store, user_client, client, ext, fmt):
+    # Transparent PNGs are flattened for JPEG
+    data = image_bytes(size=(300, 200), mode='RGBA', color=(0, 0, 255, 0))
+    url = upload(user_client, data).get_json()['photos'][ext]['96']
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.mimetype == f'image/{"jpeg" if ext == "jpg" else ext}'
+    with Image.open(io.BytesIO(response.data)) as image:
+        assert image.format == fmt
+        assert image.size == (96, 96)
+
+
+def test_unknown_variant_names(store, client):
+    assert client.get('/api/photos/not-a-photo.webp').status_code == 404
+    # Well formed, but no such original
+    assert client.get(f'/api/photos/{"0" * 32}-96.webp').status_code == 404
+    # Size that is never rendered
+    assert client.get(f'/api/photos/{"0" * 32}-100.webp').status_code == 404
+
+
+def test_range_and_conditional_requests(store, user_client, client):
+    url = upload(user_client, image_bytes()).get_json()['photos']['webp']['256']
+    full = client.get(url)
+    assert full.status_code == 200
+    assert 'immutable' in full.headers['Cache-Control']
+
+    partial = client.get(url, headers={'Range': 'bytes=0-9'})
+    assert partial.status_code == 206
+    assert partial.data == full.data[:10]
+    assert partial.headers['Content-Range'] == f'bytes 0-9/{len(full.data)}'
+
+    cached = client.get(url, headers={'If-None-Match': full.headers['ETag']})
+    assert cached.status_code == 304
+    assert cached.data == b''
@@ -0,0 +1,112 @@
+import json
+
+import pytest
+
+from catalog import CourseCatalog
+from planner import DegreePlanner, load_requirement_groups, transcript_courses
+
+
+def course(name, credits=3, prerequisites=()):
+    return {'name': name, 'credits': credits, 'description': '', 'prerequisites': list(prerequisites)}
+
+
+@pytest.fixture
+def requirements_path(tmp_path):
+    requirements = {
+        'Core': {
+            'Programming': {'courses': ['Csci 111', 'Csci 112', 'Csci 211']},
+            'Systems': {'choices': {'Architecture': [1, 'Csci 223 | Csci 224']}},
+        },
+        'Mathematics': [8, 'Math 261', 'Math 262', 'Math 301'],
+        'Major Electives': [2, 'Csci 311 | Csci 325 | Csci 343'],
+        'Emphasis': {'Data Science': {'courses': ['Csci 343']}},
+    }
+    path = tmp_path / 'requirements.json'
+    path.write_text(json.dumps(requirements))
+    return str(path)
+
+
+@pytest.fixture
+def planner(tmp_path, requirements_path):
+    courses = [
+        course('Csci 111'),
+        course('Csci 112', prerequisites=['Csci 111']),
+        course('Csci 211', prerequisites=['Csci 112']),
+        course('Csci 223', prerequisites=['Csci 211']),
+        course('Csci 224', prerequisites=['Csci 211', 'Math 261']),
+        course('Csci 311', prerequisites=['Csci 211']),
+        course('Csci 325', prerequisites=['Csci 211']),
+        course('Csci 343', prerequisites=['Csci 311 | Csci 325']),
+        course('Math 261', credits=4),
+        course('Math 262', credits=4, prerequisites=['Math 261']),
+        course('Math 301', credits=3, prerequisites=['Math 262']),
+    ]
+    path = tmp_path / 'courses.json'
+    path.write_text(json.dumps(courses))
+    return DegreePlanner(CourseCatalog(str(path)), requirements_path)
+
+
+def planned_ids(plan):
+    return [c['id'] for s in plan['semesters'] for c in s['courses']]
+
+
+def test_requirement_group_layouts(requirements_path):
+    groups = {g.name: g for g in load_requirement_groups(requirements_path)}
+    assert groups['Programming'].required == 3
+    assert groups['Systems - Architecture'].options == [[['CSCI223', 'CSCI224']]]
+    assert groups['Mathematics'].by_credits
+    # One "a | b | c" entry with a count above one is split into separate options
+    assert groups['Major Electives'].options == [[['CSCI311']], [['CSCI325']], [['CSCI343']]]
+
+
+def test_emphasis_groups_only_apply_to_that_emphasis(planner):
+    assert 'Emphasis' not in {g.category for g in planner.groups_for(None)}
+    assert 'Emphasis' in {g.category for g in planner.groups_for('Data Science')}
+
+
+def test_prerequisites_come_first(planner):
+    plan = planner.plan([], max_credits=9)
+    order = {c['id']: s['semester'] for s in plan['semesters'] for c in s['courses']}
+    for course_id in order:
+        for group in planner.catalog.prerequisite_groups.get(course_id, []):
+            assert any(order.get(c, 0) < order[course_id] for c in group), course_id
+    assert not plan['unscheduled']
+    assert all(r['satisfied'] for r in plan['requirements'])
+
+
+def test_credit_cap_and_completed_courses(planner):
+    plan = planner.plan(['csci111', 'CSCI 112'], max_credits=7)
+    assert 'CSCI111' not in planned_ids(plan)
+    assert all(s['credits'] <= 7 for s in plan['semesters'])
+    assert plan['semesters'][0]['semester'] == 1
+
+
+def test_cheapest_architecture_option_is_chosen(planner):
+    # Csci 223 needs only Csci 211; Csci 224 also needs Math 261
+    plan = planner.plan(['Csci 111', 'Csci 112', 'Csci 211'])
+    arch = next(r for r in plan['requirements'] if r['group'] == 'Systems - Architecture')
+    assert arch['planned'] == ['CSCI223']
+
+
+def test_plan_is_deterministic(planner):
+    assert planner.plan(['Csci 111']) == planner.plan(['Csci 111'])
+
+
+def test_progress(planner):
+    reports = {r['group']: r for r in planner.progress(['Math 261', 'Math 262', 'Csci 311'])}
+    assert reports['Mathematics'] == {'category': 'Mathematics', 'group': 'Mathematics', 'required': 8,
+                                      'unit': 'credits', 'completed': 8, 'satisfied': True}
+    assert reports['Major Electives']['completed'] == 1
+    assert not reports['Major Electives']['satisfied']
+
+
+def test_transcript_courses_skips_failed_grades():
+    transcript = json.dumps({'courses': [
+        {'name': 'Csci 111', 'grade': 'A'},
+        {'name': 'Csci 112', 'grade': 'F'},
+        {'name': 'Math 261', 'grade': '0.0'},
+        {'name': 'Math 262', 'grade': 'W'},
+        'Csci 211',
+    ]})
+    assert transcript_courses(transcript) == ['Csci 111', 'Csci 211']
+    assert transcript_courses('not json') == []
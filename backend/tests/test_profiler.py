@@ -0,0 +1,54 @@
+import pytest
+from flask import Response, g
+
+from profiler import SamplingProfiler, ProfileStore
+
+
+@pytest.fixture
+def store(app_module, tmp_path, monkeypatch):
+    monkeypatch.setenv('ADMIN_TOKEN', 'secret')
+    store = ProfileStore(str(tmp_path))
+    monkeypatch.setattr(app_module, 'profile_store', store)
+    return store
+
+
+def test_capture_store_and_fetch(client, store):
+    response = client.get('/metrics', headers={'X-Profile': 'secret', 'X-Request-ID': 'req-1'})
+    assert response.headers['X-Profile-Id'] == 'req-1'
+
+    profiles = client.get('/api/profiles', headers={'X-Admin-Token': 'secret'}).get_json()['profiles']
+    assert [(p['id'], p['path'], p['status']) for p in profiles] == [('req-1', '/metrics', 200)]
+    folded = client.get('/api/profiles/req-1', headers={'X-Admin-Token': 'secret'})
+    assert folded.status_code == 200
+    assert folded.mimetype == 'text/plain'
+
+
+def test_unprofiled_request_has_no_profile_id(client, store):
+    assert 'X-Profile-Id' not in client.get('/metrics').headers
+    assert store.list() == []
+
+
+def test_unsafe_request_id_is_replaced(client, store):
+    response = client.get('/metrics', headers={'X-Profile': 'secret', 'X-Request-ID': '../etc/passwd'})
+    profile_id = response.headers['X-Profile-Id']
+    assert profile_id != '../etc/passwd'
+    assert [p['id'] for p in store.list()] == [profile_id]
+
+
+def test_streamed_response_is_saved_on_close(app_module, store):
+    with app_module.app.test_request_context('/stream'):
+        g.request_id = 'stream-1'
+        g.profiler = SamplingProfiler().start()
+        response = app_module.save_profile(Response(iter(['a', 'b'])))
+        assert response.headers['X-Profile-Id'] == 'stream-1'
+        assert store.list() == []
+
+        assert b''.join(response.iter_encoded()) == b'ab'
+        response.close()
+    assert [p['id'] for p in store.list()] == ['stream-1']
+
+
+def test_store_rejects_unsafe_id(tmp_path):
+    profiler = SamplingProfiler().start().stop()
+    assert ProfileStore(str(tmp_path)).save('../x', profiler, {}) is False
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,71 @@
+import json
+import uuid
+
+import metrics
+
+
+def register(client, **fields):
+    payload = {'email': f'{uuid.uuid4().hex}@example.com', 'password': 'pw', 'firstName': 'A', 'lastName': 'B'}
+    payload.update(fields)
+    response = client.post('/api/auth/register', json=payload)
+    assert response.status_code == 200
+    return response.get_json()['user']['id']
+
+
+def refreshes(reason):
+    return metrics.PROGRESS_REFRESHES.labels(reason).value
+
+
+def stored_snapshot(app_module, user_id):
+    with app_module.app.app_context():
+        snapshot = app_module.db.session.get(app_module.DegreeProgressSnapshot, user_id)
+        return json.loads(snapshot.payload) if snapshot else None
+
+
+def transcript(*names):
+    return json.dumps({'courses': [{'name': n, 'grade': 'A', 'credits': 3} for n in names]})
+
+
+def test_registration_creates_snapshot(app_module, client):
+    before = refreshes('new')
+    user_id = register(client, transcript=transcript('Math 261'))
+    assert refreshes('new') == before + 1
+    assert stored_snapshot(app_module, user_id)['completed_courses'] == ['MATH261']
+
+    # Served as stored, without another refresh
+    missing = refreshes('missing')
+    assert client.get('/api/progress').get_json()['completed_courses'] == ['MATH261']
+    assert refreshes('missing') == missing
+
+
+def test_transcript_edit_refreshes_snapshot(app_module, client):
+    user_id = register(client)
+    assert client.get('/api/progress').get_json()['completed_courses'] == []
+
+    before = refreshes('transcript')
+    client.post('/api/users', json={'transcript': transcript('Math 261', 'Math 262')})
+    assert refreshes('transcript') == before + 1
+    assert stored_snapshot(app_module, user_id)['completed_courses'] == ['MATH261', 'MATH262']
+    progress = client.get('/api/progress').get_json()
+    assert progress['completed_courses'] == ['MATH261', 'MATH262']
+    assert progress['credits_completed'] == 6
+
+
+def test_unrelated_edit_keeps_snapshot(client):
+    register(client, transcript=transcript('Math 261'))
+    before = refreshes('transcript')
+    client.post('/api/users', json={'firstName': 'C'})
+    assert refreshes('transcript') == before
+
+
+def test_requirements_change_refreshes_on_read(app_module, client, monkeypatch):
+    register(client)
+    planner = app_module.catalog_registry.current.planner
+    assert client.get('/api/progress').get_json()['requirements_version'] == planner.version
+
+    monkeypatch.setattr(planner, 'version', 'bumped')
+    before = refreshes('requirements')
+    assert client.get('/api/progress').get_json()['requirements_version'] == 'bumped'
+    assert refreshes('requirements') == before + 1
+    client.get('/api/progress')
+    assert refreshes('requirements') == before + 1
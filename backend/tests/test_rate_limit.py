@@ -0,0 +1,67 @@
+import pytest
+
+import rate_limit
+from rate_limit import RateLimiter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit.time, 'monotonic', clock)
+    return clock
+
+
+def test_request_burst_then_refill(clock):
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=10000, request_burst=3)
+    assert [limiter.check('ip:a') for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.check('ip:a') == pytest.approx(1.0)
+    clock.now += 1.0
+    assert limiter.check('ip:a') == 0.0
+
+
+def test_keys_are_independent(clock):
+    limiter = RateLimiter(requests_per_minute=1, tokens_per_minute=10000)
+    assert limiter.check('user:1') == 0.0
+    assert limiter.check('user:1') > 0
+    assert limiter.check('user:2') == 0.0
+
+
+def test_generated_tokens_exhaust_the_budget(clock):
+    limiter = RateLimiter(requests_per_minute=100, tokens_per_minute=600)
+    assert limiter.check('ip:a') == 0.0
+    limiter.charge('ip:a', 900)
+    # 300 tokens in debt at 10 tokens/s, plus one to admit
+    assert limiter.check('ip:a') == pytest.approx(30.1)
+    clock.now += 31
+    assert limiter.check('ip:a') == 0.0
+
+
+def test_refused_requests_are_not_spent(clock):
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=10000, request_burst=1)
+    assert limiter.check('ip:a') == 0.0
+    assert limiter.check('ip:a') > 0
+    clock.now += 1.0
+    assert limiter.check('ip:a') == 0.0
+
+
+def test_least_recently_used_keys_are_dropped(clock):
+    limiter = RateLimiter(requests_per_minute=1, tokens_per_minute=10000, max_keys=2)
+    for key in ('a', 'b', 'c'):
+        limiter.check(key)
+    assert list(limiter.buckets) == ['b', 'c']
+    assert limiter.check('a') == 0.0  # Starts full again
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.setenv('TEST_REQUESTS_PER_MINUTE', '120')
+    limiter = RateLimiter.from_env('TEST', requests_per_minute=10, tokens_per_minute=600)
+    assert limiter.request_rate == 2.0
+    assert limiter.token_rate == 10.0
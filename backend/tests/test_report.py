@@ -0,0 +1,53 @@
+import pytest
+
+import report
+from report import CourseRecord, ReportSummary, ReportWriter, load_report
+from ocr_search import save_structured_output
+
+
+def sample_records():
+    return [
+        CourseRecord(course_id='CSCI111', name='Csci 111', field='CSCI', number=111, level=1,
+                     level_name='Introductory', level_relation='', description='Programming I', completed=True),
+        CourseRecord(course_id='CSCI211', name='Csci 211', field='CSCI', number=211, level=2,
+                     level_name='Intermediate', level_relation='', description='Programming II', completed=False,
+                     prerequisites=['CSCI111'], completed_prerequisites=['CSCI111']),
+    ]
+
+
+@pytest.mark.parametrize('fmt, ext', [('json', 'json'), ('ndjson', 'ndjson')])
+def test_round_trip(tmp_path, fmt, ext):
+    path = tmp_path / f'report.{ext}'
+    summary = ReportSummary(gpa={'GPA': 3.5}, completed_courses=['CSCI111'])
+    with open(path, 'w', encoding='utf-8') as f:
+        assert ReportWriter(f, fmt).write_report(summary, sample_records()) == 2
+    loaded_summary, records = load_report(str(path))
+    assert loaded_summary == summary
+    assert records == sample_records()
+
+
+def test_unknown_format_rejected():
+    with pytest.raises(ValueError):
+        report.check_format('xml')
+
+
+def test_missing_msgpack_leaves_no_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(report, 'msgpack', None)
+    output = tmp_path / 'report.msgpack'
+    with pytest.raises(RuntimeError):
+        save_structured_output({'CSCI111'}, [], {}, str(output), fmt='msgpack')
+    assert not output.exists()
+
+
+def test_batch_results_rejected(tmp_path):
+    path = tmp_path / 'transcript_analysis.ndjson'
+    path.write_text('{"pdf": "a.pdf", "status": "ok", "courses": []}\n')
+    with pytest.raises(ValueError):
+        load_report(str(path))
+
+
+def test_unknown_extension_rejected(tmp_path):
+    path = tmp_path / 'transcript_analysis.jsonl'
+    path.write_text('')
+    with pytest.raises(ValueError):
+        load_report(str(path))
@@ -0,0 +1,95 @@
+from types import SimpleNamespace
+
+from ai import LocalLLM
+from stream_sinks import SSESink, MetricsSink, MultiSink
+
+
+def chunk(content):
+    delta = SimpleNamespace(content=content, reasoning_content=None)
+    return SimpleNamespace(choices=[SimpleNamespace(delta=delta)], usage=None)
+
+
+class FakeStream:
+    """Upstream stream that records how far it was read and whether it was closed"""
+
+    def __init__(self, parts):
+        self.parts = parts
+        self.read = 0
+        self.closed = False
+
+    def __iter__(self):
+        for part in self.parts:
+            self.read += 1
+            yield chunk(part)
+
+    def close(self):
+        self.closed = True
+
+
+class FakePool:
+    def __init__(self, stream):
+        self.stream = stream
+        self.released = []
+
+    def create_chat_completion(self, **kwargs):
+        return 'lease', self.stream
+
+    def release(self, lease, error=None):
+        self.released.append((lease, error))
+
+
+class DisconnectingSink(SSESink):
+    """Simulates the client going away after the first token"""
+
+    def on_content(self, text):
+        super().on_content(text)
+        self.disconnected = True
+
+
+def test_closing_events_marks_sink_cancelled():
+    sink = SSESink()
+    sink.on_content('Hello')
+    events = sink.events()
+    assert 'Hello' in next(events)
+    assert not sink.cancelled
+    events.close()
+    assert sink.cancelled
+
+
+def test_finished_stream_is_not_cancelled():
+    sink = SSESink()
+    sink.on_content('Hello')
+    sink.on_finish('Hello', '')
+    assert len(list(sink.events())) >= 1
+    assert not sink.cancelled
+
+
+def test_multisink_reports_any_cancelled():
+    sse = SSESink()
+    multi = MultiSink(sse, MetricsSink())
+    assert not multi.cancelled
+    sse.disconnected = True
+    assert multi.cancelled
+
+
+def test_get_response_stops_reading_after_disconnect():
+    stream = FakeStream(['a', 'b', 'c', 'd'])
+    pool = FakePool(stream)
+    llm = LocalLLM(pool=pool)
+    answer, _ = llm.get_response('hi', DisconnectingSink())
+
+    assert answer == 'a'
+    assert stream.read == 2
+    assert stream.closed
+    assert pool.released == [('lease', None)]
+    # The abandoned answer is not remembered as part of the conversation
+    assert [m['role'] for m in llm.history] == ['user']
+
+
+def test_get_response_reads_whole_stream_when_connected():
+    stream = FakeStream(['a', 'b', 'c'])
+    llm = LocalLLM(pool=FakePool(stream))
+    answer, _ = llm.get_response('hi', SSESink())
+    assert answer == 'abc'
+    assert not stream.closed
+    assert [m['role'] for m in llm.history] == ['user', 'assistant']
@@ -0,0 +1,137 @@
+import json
+import uuid
+
+import pytest
+
+from transcript_analysis import TranscriptAnalysis, transcript_segments
+
+
+def course(name, grade, credits=3):
+    return {'name': name, 'grade': grade, 'credits': credits}
+
+
+def transcript(*courses):
+    return json.dumps({'courses': list(courses)})
+
+
+def fresh(text):
+    analysis = TranscriptAnalysis()
+    analysis.update(text)
+    return analysis
+
+
+def assert_same(incremental, text):
+    expected = fresh(text)
+    assert incremental.summary() == expected.summary()
+    assert incremental.course_counts == expected.course_counts
+
+
+COURSES = [course('Csci 111', 'A'), course('Csci 112', 'B'), course('Math 261', 'C', 4), course('Engl 101', 'A')]
+
+
+def test_json_transcript_totals():
+    analysis = fresh(transcript(*COURSES, course('Hist 101', 'F'), course('Phys 211', 'W', 4)))
+    assert analysis.completed_courses == ['CSCI111', 'CSCI112', 'ENGL101', 'MATH261']
+    assert analysis.earned == 13
+    # W has no grade points; F counts towards the GPA but not completion
+    assert analysis.gpa == {'GPA': round((12 + 9 + 8 + 12) / 16, 2)}
+
+
+def test_unchanged_transcript_parses_nothing():
+    text = transcript(*COURSES)
+    analysis = fresh(text)
+    assert analysis.update(text) == {'parsed': 0, 'reused': 4, 'removed': 0}
+
+
+@pytest.mark.parametrize('edited', [
+    [course('Csci 111', 'A'), course('Csci 112', 'A'), course('Math 261', 'C', 4), course('Engl 101', 'A')],
+    COURSES[:2] + COURSES[3:],
+    COURSES + [course('Csci 211', 'B')],
+    [course('Csci 211', 'B')] + COURSES,
+    list(reversed(COURSES)),
+    [],
+])
+def test_incremental_update_matches_fresh_analysis(edited):
+    analysis = fresh(transcript(*COURSES))
+    analysis.update(transcript(*edited))
+    assert_same(analysis, transcript(*edited))
+
+
+def test_only_edited_segments_are_parsed():
+    analysis = fresh(transcript(*COURSES))
+    edited = COURSES[:1] + [course('Csci 112', 'A')] + COURSES[2:]
+    assert analysis.update(transcript(*edited)) == {'parsed': 1, 'reused': 3, 'removed': 1}
+
+
+def test_moved_segments_are_reused():
+    analysis = fresh(transcript(*COURSES))
+    changes = analysis.update(transcript(*reversed(COURSES)))
+    assert changes['parsed'] == 0
+
+
+def test_retake_keeps_course_until_both_are_removed():
+    retake = [course('Csci 111', 'C'), course('Csci 111', 'A')]
+    analysis = fresh(transcript(*retake))
+    analysis.update(transcript(retake[1]))
+    assert analysis.completed_courses == ['CSCI111']
+    analysis.update(transcript())
+    assert analysis.completed_courses == []
+
+
+def test_state_round_trip():
+    analysis = fresh(transcript(*COURSES))
+    restored = TranscriptAnalysis.from_json(analysis.to_json())
+    edited = COURSES + [course('Csci 211', 'B')]
+    restored.update(transcript(*edited))
+    assert_same(restored, transcript(*edited))
+
+
+def test_text_transcript_gpa_lines():
+    text = "Fall 2023\nCumulative GPA: 3.40\nSpring 2024\nTerm GPA: 3.10"
+    analysis = fresh(text)
+    assert analysis.gpa == {'Cumulative GPA': 3.4, 'Semester GPA': 3.1}
+    analysis.update(text.replace('3.40', '3.55'))
+    assert analysis.gpa['Cumulative GPA'] == 3.55
+    assert transcript_segments(text)[0] == 'Fall 2023'
+
+
+def register(client, **fields):
+    payload = {'email': f'{uuid.uuid4().hex}@example.com', 'password': 'pw', 'firstName': 'A', 'lastName': 'B'}
+    payload.update(fields)
+    assert client.post('/api/auth/register', json=payload).status_code == 200
+
+
+def saved_gpa(client):
+    return client.get('/api/auth/me').get_json()['gpa']
+
+
+def test_saving_a_transcript_fills_an_empty_gpa(client):
+    register(client)
+    response = client.post('/api/users', json={'transcript': transcript(course('Csci 111', 'A'))}).get_json()
+    assert response['analysis']['gpa'] == {'GPA': 4.0}
+    assert saved_gpa(client) == 4.0
+
+
+def test_saving_a_transcript_keeps_a_gpa_the_user_set(client):
+    register(client, gpa=3.2)
+    response = client.post('/api/users', json={'transcript': transcript(course('Csci 111', 'A'))}).get_json()
+    assert response['analysis']['gpa'] == {'GPA': 4.0}
+    assert saved_gpa(client) == 3.2
+
+
+TEXT_TRANSCRIPT = "Fall 2023\nMATH 261 Calculus I A 4.00\nTerm GPA: 4.00"
+
+
+def test_plan_uses_text_transcript_courses(client):
+    register(client)
+    client.post('/api/users', json={'transcript': TEXT_TRANSCRIPT})
+    assert 'MATH261' in client.get('/api/plan').get_json()['completed']
+
+
+def test_cohort_uses_text_transcript_courses(client, monkeypatch):
+    monkeypatch.setenv('ADMIN_TOKEN', 'secret')
+    register(client)
+    client.post('/api/users', json={'transcript': TEXT_TRANSCRIPT})
+    user_id = client.get('/api/auth/me').get_json()['id']
+    eligible = client.get('/api/cohort/eligible?course=Math 262', headers={'X-Admin-Token': 'secret'}).get_json()
+    assert user_id in eligible['eligible']
@@ -0,0 +1,127 @@
+import io
+import json
+import uuid
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+import user_sync
+from user_sync import UserImporter, export_users, read_lines
+
+ADMIN = {'X-Admin-Token': 'secret'}
+
+
+@pytest.fixture(autouse=True)
+def admin_token(monkeypatch):
+    monkeypatch.setenv('ADMIN_TOKEN', 'secret')
+
+
+def email(name):
+    return f'{name}-{uuid.uuid4().hex[:8]}@example.com'
+
+
+def ndjson(*records):
+    return ''.join((r if isinstance(r, str) else json.dumps(r)) + '\n' for r in records)
+
+
+def bulk_import(client, body, **params):
+    return client.post('/api/users/bulk', query_string=params, data=body, headers=ADMIN,
+                       content_type='application/x-ndjson')
+
+
+def exported(client, emails, **params):
+    lines = client.get('/api/users/bulk', query_string=params, headers=ADMIN).get_data(as_text=True).splitlines()
+    records = {r['email']: r for r in map(json.loads, lines)}
+    return {e: records.get(e) for e in emails}
+
+
+def test_upsert_creates_then_updates_only_given_fields(client):
+    ada, bob = email('ada'), email('bob')
+    response = bulk_import(client, ndjson(
+        {'email': ada, 'password': 'pw', 'firstName': 'Ada', 'major': 'Math'},
+        {'email': bob, 'password': 'pw', 'firstName': 'Bob'},
+    ))
+    assert response.status_code == 200
+    report = response.get_json()
+    assert (report['processed'], report['created'], report['updated'], report['failed']) == (2, 2, 0, 0)
+
+    cy = email('cy')
+    response = bulk_import(client, ndjson({'email': ada, 'major': 'Computer Science'}, {'email': cy}))
+    assert response.get_json()['created'] == 1
+    assert response.get_json()['updated'] == 1
+
+    users = exported(client, [ada, bob, cy])
+    assert users[ada]['major'] == 'Computer Science'
+    assert users[ada]['firstName'] == 'Ada'  # Left out of the update, so unchanged
+    assert users[bob]['firstName'] == 'Bob'
+    assert users[cy] is not None
+
+
+def test_invalid_records_are_reported_by_line(client):
+    good = email('good')
+    response = bulk_import(client, ndjson({'email': 'not-an-email'}, '{broken', {'email': good, 'gpa': 'x'}))
+    assert response.status_code == 207
+    report = response.get_json()
+    assert report['failed'] == 3
+    assert [e['line'] for e in report['errors']] == [1, 2, 3]
+
+
+def test_failed_chunk_is_retried_record_by_record(client, monkeypatch):
+    write = UserImporter.write
+
+    def failing_write(self, rows):
+        if any(row['email'].startswith('bad') for row in rows):
+            raise IntegrityError('INSERT', {}, Exception('rejected'))
+        return write(self, rows)
+
+    monkeypatch.setattr(UserImporter, 'write', failing_write)
+    first, bad, last = email('first'), email('bad'), email('last')
+    response = bulk_import(client, ndjson({'email': first}, {'email': bad}, {'email': last}), chunk_size=10)
+    assert response.status_code == 207
+    report = response.get_json()
+    assert (report['created'], report['failed']) == (2, 1)
+    assert report['errors'] == [{'line': 2, 'email': bad, 'error': 'rejected'}]
+
+    users = exported(client, [first, bad, last])
+    assert users[first] and users[last] and users[bad] is None
+
+
+def test_oversized_line_is_skipped(client, monkeypatch):
+    monkeypatch.setattr(user_sync, 'MAX_LINE_BYTES', 200)
+    before, after = email('before'), email('after')
+    huge = {'email': email('huge'), 'transcript': 'x' * 1000}
+    response = bulk_import(client, ndjson({'email': before}, huge, {'email': after}))
+    assert response.status_code == 207
+    report = response.get_json()
+    assert (report['processed'], report['created'], report['failed']) == (3, 2, 1)
+    assert report['errors'][0]['line'] == 2
+    assert report['errors'][0]['error'] == 'Line is longer than 200 bytes'
+
+
+def test_read_lines_limits():
+    stream = io.BufferedReader(io.BytesIO(b'short\n' + b'y' * 50 + b'\nexact\nlast'), 8)
+    lines = list(read_lines(stream, 5))
+    assert lines[0] == b'short\n'
+    assert isinstance(lines[1], user_sync.LineTooLong)
+    assert lines[2:] == [b'exact\n', b'last']
+
+
+def test_export_round_trip(app_module, client):
+    emails = [email(f'round{i}') for i in range(5)]
+    bulk_import(client, ndjson(*({'email': e, 'password': 'pw', 'firstName': 'R', 'gpa': 3.5,
+                                  'transcript': {'courses': [{'name': 'Math 261', 'grade': 'A'}]}} for e in emails)))
+
+    with app_module.app.app_context():
+        # Small chunks, so the export pages through several keyset queries
+        lines = ''.join(export_users(app_module.db.session, app_module.User.__table__,
+                                     include_password_hash=True, chunk_size=2)).splitlines()
+    records = [json.loads(line) for line in lines]
+    ids = [r['id'] for r in records]
+    assert ids == sorted(set(ids))
+    ours = [r for r in records if r['email'] in emails]
+    assert len(ours) == 5 and all(r['password_hash'] for r in ours)
+
+    # Importing the export changes nothing
+    response = bulk_import(client, ndjson(*ours))
+    assert response.get_json()['updated'] == 5
+    assert list(exported(client, emails, password_hash=1).values()) == ours
@@ -0,0 +1,312 @@
+import re
+import json
+import hashlib
+from difflib import SequenceMatcher
+from typing import List, Dict, Optional, Tuple
+
+from catalog import normalize_course_id
+from course_matcher import get_default_matcher
+from transcript_index import GRADE_POINTS
+import metrics
+
+ANALYSIS_LATENCY = metrics.Histogram('advisor_transcript_analysis_seconds', 'Time to (re)analyze a saved transcript',
+                                     ['mode'])
+ANALYZED_SEGMENTS = metrics.Counter('advisor_transcript_segments_total',
+                                    'Transcript segments seen by analysis, parsed or reused', ['result'])
+
+# GPA formats found on transcripts, tried in order; later matches win
+GPA_PATTERNS = [
+    # Pattern for "GPA: X.XX" format
+    re.compile(r'GPA[:\s]+(\d+\.\d+)'),
+    # Pattern for "X.XX GPA" format
+    re.compile(r'(\d+\.\d+)\s+GPA'),
+    # Pattern for overall/cumulative GPA
+    re.compile(r'(?:overall|cumulative|cum)[\s\-]*gpa[:\s]+(\d+\.\d+)'),
+    # Pattern for term/semester GPA
+    re.compile(r'(?:term|semester|sem)[\s\-]*gpa[:\s]+(\d+\.\d+)'),
+]
+
+# A course code followed by its title ("CSCI 111 Programming and Algorithms I 4.0 A")
+DESCRIPTION_PATTERN = re.compile(r'([A-Za-z]{2,4})[- ]?(\d{3}[A-Za-z]?)', re.IGNORECASE)
+
+
+def find_gpa(text: str) -> Dict[str, float]:
+    """
+    GPA values in transcript text, keyed by type (cumulative, semester, major or plain)
+
+    Args:
+        text: OCR-extracted text (the type is read from 30 characters around each match)
+
+    Returns:
+        Dictionary with GPA information
+    """
+    gpa_info = {}
+    lowered = text.lower()
+    for pattern in GPA_PATTERNS:
+        for match in pattern.finditer(lowered):
+            context = lowered[max(0, match.start() - 30):min(len(text), match.end() + 30)]
+            gpa_value = float(match.group(1))
+            if 'cumulative' in context or 'cum' in context or 'overall' in context:
+                gpa_info['Cumulative GPA'] = gpa_value
+            elif 'semester' in context or 'term' in context or 'sem' in context:
+                gpa_info['Semester GPA'] = gpa_value
+            elif 'major' in context:
+                gpa_info['Major GPA'] = gpa_value
+            else:
+                gpa_info['GPA'] = gpa_value
+    return gpa_info
+
+
+def find_description(line: str) -> Optional[Tuple[str, str, str, str]]:
+    """
+    Course title following the first course code on a line
+
+    Returns:
+        (course ID, department, number, description), or None if the line has no titled course
+    """
+    course_match = DESCRIPTION_PATTERN.search(line)
+    if not course_match:
+        return None
+    dept, num = course_match.groups()
+    rest_of_line = line[course_match.end():].strip()
+    if len(rest_of_line) <= 3:  # Minimal length check
+        return None
+    # The title is the text before the grade and credit columns
+    desc_match = re.match(r'^([^0-9]+)', rest_of_line)
+    if not desc_match:
+        return None
+    return f"{dept}{num}".upper(), dept, num, desc_match.group(1).strip()
+
+
+def grade_points(grade) -> Optional[float]:
+    """Grade points for a letter ("B+") or number ("3.3") grade; None for W, P and the like"""
+    value = str(grade if grade is not None else '').strip().upper()
+    if value in GRADE_POINTS:
+        return GRADE_POINTS[value]
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def transcript_segments(transcript: str) -> List[str]:
+    """
+    Split a stored transcript into independently parsable segments
+
+    JSON transcripts (EditableTranscript / TranscriptSetup) give one canonical
+    JSON segment per course, so editing one course changes one segment;
+    anything else gives one segment per non-empty line.
+    """
+    if not transcript:
+        return []
+    try:
+        data = json.loads(transcript)
+    except ValueError:
+        data = None
+    if isinstance(data, dict):
+        return [json.dumps(course, sort_keys=True) for course in data.get('courses', []) or []
+                if isinstance(course, (str, dict))]
+    return [line.strip() for line in transcript.splitlines() if line.strip()]
+
+
+def segment_key(segment: str) -> str:
+    return hashlib.blake2b(segment.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def parse_segment(segment: str) -> Dict:
+    """
+    Analyze one segment on its own
+
+    Returns:
+        Dictionary with only the non-empty parts of: courses (IDs passed), gpa
+        (values found in the text), descriptions, points/credits for the
+        credit-weighted GPA and earned (credits passed) of JSON transcripts
+    """
+    result = {}
+    course = None
+    if segment.startswith(('{', '"')):
+        try:
+            course = json.loads(segment)
+        except ValueError:
+            pass  # A text line that happens to start with a brace or quote
+    if isinstance(course, (dict, str)):
+        if isinstance(course, str):
+            course = {'name': course}
+        if not course.get('name'):
+            return result
+        course_id = normalize_course_id(course['name'])
+        points = grade_points(course.get('grade'))
+        # Failing and withdrawn grades don't complete a course (as in planner.transcript_courses)
+        passed = str(course.get('grade', '')).strip().upper() != 'W' and points != 0
+        if passed:
+            result['courses'] = [course_id]
+        if course.get('description'):
+            result['descriptions'] = {course_id: course['description']}
+        try:
+            credits = float(course.get('credits') or 0)
+        except (TypeError, ValueError):
+            credits = 0.0
+        if points is not None and credits > 0:
+            result['points'] = points * credits
+            result['credits'] = credits
+        if passed and credits > 0:
+            result['earned'] = credits
+        return result
+
+    courses = [m.course_id for m in get_default_matcher().find_all(segment)]
+    if courses:
+        result['courses'] = courses
+    gpa = find_gpa(segment)
+    if gpa:
+        result['gpa'] = gpa
+    found = find_description(segment)
+    if found:
+        result['descriptions'] = {found[0]: found[3]}
+    return result
+
+
+class TranscriptAnalysis:
+    """
+    Completed courses and GPA of one transcript, patchable edit by edit
+
+    Results are kept per segment next to a hash of its text. On update the
+    old and new hash sequences are diffed, only inserted or replaced
+    segments are parsed, and the course counts and GPA totals are patched
+    with the removed and added segments, so the parsing cost follows the
+    size of the edit rather than the size of the transcript. GPA values
+    read from text are found line by line, so a GPA label must share a
+    line with its value.
+    """
+
+    def __init__(self):
+        self.keys = []  # Segment hashes, in transcript order
+        self.results = []  # parse_segment() output per segment
+        self.course_counts = {}  # Course ID -> segments listing it (a retake appears twice)
+        self.points = 0.0
+        self.credits = 0.0
+        self.earned = 0.0
+
+    @classmethod
+    def from_json(cls, state: Optional[str]) -> 'TranscriptAnalysis':
+        analysis = cls()
+        if state:
+            data = json.loads(state)
+            analysis.keys = data['keys']
+            analysis.results = data['results']
+            analysis.course_counts = data['course_counts']
+            analysis.points = data['points']
+            analysis.credits = data['credits']
+            analysis.earned = data.get('earned', 0.0)
+        return analysis
+
+    def to_json(self) -> str:
+        return json.dumps({
+            'keys': self.keys,
+            'results': self.results,
+            'course_counts': self.course_counts,
+            'points': self.points,
+            'credits': self.credits,
+            'earned': self.earned,
+        }, separators=(',', ':'))
+
+    def apply(self, result: Dict, sign: int) -> None:
+        """Add (sign=1) or remove (sign=-1) one segment's contribution to the totals"""
+        for course_id in result.get('courses', []):
+            count = self.course_counts.get(course_id, 0) + sign
+            if count > 0:
+                self.course_counts[course_id] = count
+            else:
+                self.course_counts.pop(course_id, None)
+        # Rounded so repeated patching doesn't drift from a fresh analysis
+        self.points = round(self.points + sign * result.get('points', 0.0), 6)
+        self.credits = round(self.credits + sign * result.get('credits', 0.0), 6)
+        self.earned = round(self.earned + sign * result.get('earned', 0.0), 6)
+
+    def update(self, transcript: str) -> Dict[str, int]:
+        """
+        Bring the analysis up to date with a new version of the transcript
+
+        Args:
+            transcript: New User.transcript value
+
+        Returns:
+            Counts of segments parsed, reused and removed
+        """
+        segments = transcript_segments(transcript)
+        keys = [segment_key(s) for s in segments]
+        mode = 'incremental' if self.keys else 'full'
+
+        with metrics.timed(ANALYSIS_LATENCY, mode):
+            # Unchanged head and tail are skipped before running the diff on what is left
+            head = 0
+            while head < min(len(keys), len(self.keys)) and keys[head] == self.keys[head]:
+                head += 1
+            tail = 0
+            while (tail < min(len(keys), len(self.keys)) - head
+                   and keys[-1 - tail] == self.keys[-1 - tail]):
+                tail += 1
+
+            old_keys = self.keys[head:len(self.keys) - tail]
+            old_results = self.results[head:len(self.results) - tail]
+            new_keys = keys[head:len(keys) - tail]
+            new_segments = segments[head:len(segments) - tail]
+
+            # Segments moved rather than edited are reused too
+            known = dict(zip(old_keys, old_results))
+            middle = []
+            parsed = removed = 0
+            matcher = SequenceMatcher(None, old_keys, new_keys, autojunk=False)
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+                if tag == 'equal':
+                    middle.extend(old_results[i1:i2])
+                    continue
+                for result in old_results[i1:i2]:
+                    self.apply(result, -1)
+                    removed += 1
+                for key, segment in zip(new_keys[j1:j2], new_segments[j1:j2]):
+                    result = known.get(key)
+                    if result is None:
+                        result = known[key] = parse_segment(segment)
+                        parsed += 1
+                    self.apply(result, 1)
+                    middle.append(result)
+
+            self.keys = keys
+            self.results = self.results[:head] + middle + self.results[len(self.results) - tail:]
+
+        reused = len(keys) - parsed
+        ANALYZED_SEGMENTS.labels('parsed').inc(parsed)
+        ANALYZED_SEGMENTS.labels('reused').inc(reused)
+        return {'parsed': parsed, 'reused': reused, 'removed': removed}
+
+    @property
+    def completed_courses(self) -> List[str]:
+        return sorted(self.course_counts)
+
+    @property
+    def gpa(self) -> Dict[str, float]:
+        """GPA values from the text (last one of each type wins), or the credit-weighted GPA of a JSON transcript"""
+        gpa_info = {}
+        for result in self.results:
+            if 'gpa' in result:
+                gpa_info.update(result['gpa'])
+        if self.credits > 0:
+            gpa_info.setdefault('GPA', round(self.points / self.credits, 2))
+        return gpa_info
+
+    @property
+    def descriptions(self) -> Dict[str, str]:
+        descriptions = {}
+        for result in self.results:
+            descriptions.update(result.get('descriptions', {}))
+        return descriptions
+
+    def summary(self) -> Dict:
+        return {
+            'completed_courses': self.completed_courses,
+            'gpa': self.gpa,
+            'credits': self.credits,
+            'earned_credits': self.earned,
+            'descriptions': self.descriptions,
+            'segments': len(self.keys),
+        }
@@ -0,0 +1,225 @@
+import re
+import json
+from typing import List, Dict, Optional, Tuple
+
+from sqlalchemy import text
+
+from catalog import query_terms, split_codes
+
+# Grade points used by the frontend (src/api/constants.ts); transcripts store the points ("2.0")
+GRADE_POINTS = {
+    'A+': 4.0, 'A': 4.0, 'A-': 3.7, 'B+': 3.3, 'B': 3.0, 'B-': 2.7, 'C+': 2.3, 'C': 2.0,
+    'C-': 1.7, 'D+': 1.3, 'D': 1.0, 'D-': 0.7, 'F': 0.0,
+}
+
+# Rows of one user live at rowid user_id * ROWS_PER_USER + line, so a user's
+# rows can be replaced with a rowid range delete instead of a full scan
+ROWS_PER_USER = 10000
+
+
+def grade_token(grade) -> str:
+    """
+    Single index token for a grade, equal for "C" and "2.0"
+
+    Args:
+        grade: Letter grade or grade points
+
+    Returns:
+        Token like "g20" (points x 10), "gw" for non-point letters, or '' if empty
+    """
+    value = str(grade if grade is not None else '').strip().upper()
+    if not value:
+        return ''
+    if value in GRADE_POINTS:
+        return f"g{round(GRADE_POINTS[value] * 10)}"
+    try:
+        return f"g{round(float(value) * 10)}"
+    except ValueError:
+        return 'g' + re.sub(r'[^a-z0-9]', '', value.lower())
+
+
+def transcript_rows(transcript: str) -> List[Tuple[str, str, str]]:
+    """
+    Split a stored transcript into index rows
+
+    JSON transcripts (saved by TranscriptSetup) give one row per course;
+    anything else (raw OCR text) gives one row per non-empty line.
+
+    Args:
+        transcript: User.transcript column value
+
+    Returns:
+        List of (course, grade token, display text)
+    """
+    if not transcript:
+        return []
+    try:
+        data = json.loads(transcript)
+    except ValueError:
+        data = None
+
+    if isinstance(data, dict):
+        rows = []
+        for course in data.get('courses', []) or []:
+            if isinstance(course, str):
+                rows.append((course, '', course))
+            elif isinstance(course, dict) and course.get('name'):
+                grade = course.get('grade', '')
+                parts = [course['name'], course.get('description') or '']
+                if grade not in (None, ''):
+                    parts.append(f"grade {grade}")
+                if course.get('credits'):
+                    parts.append(f"{course['credits']} credits")
+                rows.append((course['name'], grade_token(grade), ' '.join(p for p in parts if p)))
+        return rows[:ROWS_PER_USER]
+
+    return [('', '', line.strip()) for line in transcript.splitlines() if line.strip()][:ROWS_PER_USER]
+
+
+def ensure_transcript_index(session) -> bool:
+    """
+    Create the FTS5 table if it is missing
+
+    Args:
+        session: SQLAlchemy session on the app database
+
+    Returns:
+        True if the table was just created (and needs a backfill)
+    """
+    exists = session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'transcript_fts'")
+    ).first()
+    if exists:
+        return False
+    session.execute(text(
+        "CREATE VIRTUAL TABLE transcript_fts USING fts5("
+        "user_id UNINDEXED, course, grade, content, tokenize='unicode61', prefix='2 3')"
+    ))
+    return True
+
+
+def index_transcript(session, user_id: int, transcript: str) -> None:
+    """
+    Replace one user's rows in the index (caller commits, so it lands with the user update)
+
+    Args:
+        session: SQLAlchemy session
+        user_id: User whose transcript changed
+        transcript: New transcript value
+    """
+    index_transcripts(session, [(user_id, transcript)])
+
+
+def index_transcripts(session, users) -> None:
+    """
+    Replace several users' rows with one batched delete and one batched insert
+
+    Args:
+        session: SQLAlchemy session
+        users: List of (user_id, transcript)
+    """
+    if not users:
+        return
+    # Plain DB-API executemany: SQLAlchemy's per-row parameter processing costs more than SQLite's work here
+    connection = session.connection()
+    connection.exec_driver_sql("DELETE FROM transcript_fts WHERE rowid BETWEEN ? AND ?",
+                               [(int(user_id) * ROWS_PER_USER, (int(user_id) + 1) * ROWS_PER_USER - 1)
+                                for user_id, _ in users])
+    rows = [(int(user_id) * ROWS_PER_USER + i, user_id, split_codes(course), grade, split_codes(content))
+            for user_id, transcript in users
+            for i, (course, grade, content) in enumerate(transcript_rows(transcript))]
+    if rows:
+        connection.exec_driver_sql(
+            "INSERT INTO transcript_fts (rowid, user_id, course, grade, content) VALUES (?, ?, ?, ?, ?)", rows)
+
+
+def rebuild_transcript_index(session, users) -> int:
+    """
+    Re-index every user from scratch
+
+    Args:
+        session: SQLAlchemy session
+        users: Iterable of (user_id, transcript)
+
+    Returns:
+        Number of users indexed
+    """
+    session.execute(text("DELETE FROM transcript_fts"))
+    count = 0
+    for user_id, transcript in users:
+        index_transcript(session, user_id, transcript)
+        count += 1
+    session.execute(text("INSERT INTO transcript_fts (transcript_fts) VALUES ('optimize')"))
+    return count
+
+
+def build_match(query: str = '', course: str = '', grade: str = '') -> Optional[str]:
+    """
+    Translate search parameters into a safe FTS5 MATCH expression
+
+    `query` keeps "quoted phrases" and trailing-* prefixes; everything else is
+    quoted term by term so user input is never parsed as FTS5 syntax.
+
+    Args:
+        query: Free text over the whole row
+        course: Course name, matched as a phrase on the course column ("PHYS 211")
+        grade: Letter grade or grade points, matched exactly
+
+    Returns:
+        MATCH string, or None if there is nothing to search for
+    """
+    clauses = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', query or ''):
+        if phrase:
+            terms = query_terms(phrase)
+            if terms:
+                clauses.append('"' + ' '.join(terms) + '"')
+        else:
+            terms = query_terms(word)
+            if not terms:
+                continue
+            # "calc*" stays a prefix query; "Csci311" still becomes the phrase "csci 311"
+            clauses.append('"' + ' '.join(terms) + '"' + ('*' if word.endswith('*') else ''))
+    course_terms = query_terms(course)
+    if course_terms:
+        clauses.append('course : "' + ' '.join(course_terms) + '"')
+    token = grade_token(grade)
+    if token:
+        clauses.append(f'grade : "{token}"')
+    return ' AND '.join(clauses) if clauses else None
+
+
+def search_transcripts(session, query: str = '', course: str = '', grade: str = '',
+                       page: int = 1, per_page: int = 20) -> Dict:
+    """
+    Search every stored transcript
+
+    Args:
+        session: SQLAlchemy session
+        query: Free text ("quoted phrases" and prefix* supported)
+        course: Course the row must be for
+        grade: Grade the row must have
+        page: 1-based page number
+        per_page: Matching rows per page
+
+    Returns:
+        Dictionary with the total match count and a page of {user_id, course, snippet} rows, best first
+    """
+    page = max(1, page)
+    per_page = max(1, min(per_page, 100))
+    match = build_match(query, course, grade)
+    result = {'query': query, 'course': course, 'grade': grade, 'total': 0, 'page': page,
+              'per_page': per_page, 'results': []}
+    if match is None:
+        return result
+
+    result['total'] = session.execute(
+        text("SELECT count(*) FROM transcript_fts WHERE transcript_fts MATCH :match"), {'match': match}
+    ).scalar()
+    rows = session.execute(
+        text("SELECT user_id, course, snippet(transcript_fts, 3, '[', ']', '...', 12) "
+             "FROM transcript_fts WHERE transcript_fts MATCH :match ORDER BY rank LIMIT :limit OFFSET :offset"),
+        {'match': match, 'limit': per_page, 'offset': (page - 1) * per_page}
+    ).all()
+    result['results'] = [{'user_id': row[0], 'course': row[1], 'snippet': row[2]} for row in rows]
+    return result
@@ -0,0 +1,304 @@
+import os
+import json
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import Table, select, text
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from transcript_index import index_transcripts
+import metrics
+
+BULK_RECORDS = metrics.Counter('advisor_bulk_user_records_total', 'Users seen by bulk import, by outcome',
+                               ['result'])
+
+# Record key -> User column; camelCase keys are what /api/users returns
+IMPORT_FIELDS = {
+    'email': 'email',
+    'password_hash': 'password_hash',
+    'firstName': 'first_name',
+    'first_name': 'first_name',
+    'lastName': 'last_name',
+    'last_name': 'last_name',
+    'major': 'major',
+    'emphasis': 'emphasis',
+    'gpa': 'gpa',
+    'credits_completed': 'credits_completed',
+    'current_semester': 'current_semester',
+    'transcript': 'transcript',
+    'profile_photo': 'profile_photo',
+}
+NUMERIC_COLUMNS = {'gpa': float, 'credits_completed': int, 'current_semester': int}
+
+# Columns the transcript analysis and progress snapshot are derived from (as in app.PROGRESS_FIELDS)
+PROGRESS_COLUMNS = ('transcript', 'major', 'emphasis')
+
+# Errors listed in the import report; later ones are only counted
+MAX_REPORTED_ERRORS = 1000
+
+# Longest NDJSON line read into memory; a longer record is skipped and reported
+MAX_LINE_BYTES = int(os.getenv('BULK_MAX_LINE_BYTES', str(4 * 1024 * 1024)))
+
+
+class LineTooLong:
+    """Stands in for an NDJSON line that was skipped without being read whole"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+
+
+def read_lines(stream, max_line_bytes: int = None) -> Iterator:
+    """
+    Lines of a binary stream, holding at most max_line_bytes of any one line in memory
+
+    Args:
+        stream: Buffered binary stream (readline with a size limit)
+        max_line_bytes: Longest line accepted (defaults to MAX_LINE_BYTES)
+
+    Yields:
+        Each line as bytes, or a LineTooLong in place of a longer line
+    """
+    limit = max_line_bytes or MAX_LINE_BYTES
+    while True:
+        line = stream.readline(limit + 1)
+        if not line:
+            return
+        if len(line) > limit and not line.endswith(b'\n'):
+            # Discard the rest of the line in bounded reads
+            while True:
+                rest = stream.readline(1 << 16)
+                if not rest or rest.endswith(b'\n'):
+                    break
+            yield LineTooLong(limit)
+            continue
+        yield line
+
+
+class UserImporter:
+    """
+    Upserts users from NDJSON records in chunked transactions
+
+    Each chunk of records is validated in Python and written with one
+    batched INSERT ... ON CONFLICT(email) DO UPDATE per set of columns, so a
+    record only overwrites the fields it contains. Changed transcripts are
+    re-indexed for search in the same transaction, and the stored
+    transcript analyses and progress snapshots of users whose transcript,
+    major or emphasis changed are dropped rather than recomputed
+    (/api/transcript/analysis and /api/progress rebuild them on next
+    read), so re-sending unchanged users is cheap. Records that fail validation are reported
+    by line and skipped; if a chunk fails in the database it is retried
+    record by record so only the offending records are lost.
+    """
+
+    def __init__(self, session, table: Table, hash_password: Callable[[str], str], chunk_size: int = 1000):
+        """
+        Args:
+            session: SQLAlchemy session (committed once per chunk)
+            table: User table
+            hash_password: Hash applied to plain "password" fields
+            chunk_size: Records per transaction
+        """
+        self.session = session
+        self.table = table
+        self.hash_password = hash_password
+        self.chunk_size = chunk_size
+        self.lengths = {c.name: getattr(c.type, 'length', None) for c in table.columns}
+        self.report = {'processed': 0, 'created': 0, 'updated': 0, 'failed': 0, 'errors': []}
+
+    def fail(self, line: int, email: Optional[str], error: str) -> None:
+        self.report['failed'] += 1
+        BULK_RECORDS.labels('failed').inc()
+        if len(self.report['errors']) < MAX_REPORTED_ERRORS:
+            self.report['errors'].append({'line': line, 'email': email, 'error': error})
+
+    def parse(self, record) -> Dict:
+        """
+        One NDJSON record as User column values
+
+        Raises:
+            ValueError: The record is not a usable user
+        """
+        if not isinstance(record, dict):
+            raise ValueError("Record must be a JSON object")
+        email = record.get('email')
+        if not isinstance(email, str) or '@' not in email:
+            raise ValueError("email is required")
+        row = {}
+        for key, value in record.items():
+            column = IMPORT_FIELDS.get(key)
+            if column is None:
+                if key == 'password':
+                    if not isinstance(value, str) or not value:
+                        raise ValueError("password must be a non-empty string")
+                    row['password_hash'] = self.hash_password(value)
+                continue  # Unknown keys (id, exported extras) are ignored
+            if column in NUMERIC_COLUMNS and value is not None:
+                try:
+                    value = NUMERIC_COLUMNS[column](value)
+                except (TypeError, ValueError):
+                    raise ValueError(f"{key} must be a number")
+            elif column == 'transcript' and not isinstance(value, str):
+                value = json.dumps(value) if value is not None else ''
+            elif value is not None and not isinstance(value, str):
+                raise ValueError(f"{key} must be a string")
+            length = self.lengths.get(column)
+            if length and isinstance(value, str) and len(value) > length:
+                raise ValueError(f"{key} is longer than {length} characters")
+            row[column] = value
+        row['email'] = email.strip()
+        return row
+
+    def write(self, rows: List[Dict]) -> Dict[str, int]:
+        """
+        Upsert one chunk (caller commits)
+
+        Returns:
+            Counts of users created and updated
+        """
+        emails = [row['email'] for row in rows]
+        # Current values of the derived-data inputs, so re-sending unchanged users costs no re-indexing
+        existing = {r.email: r for r in self.session.execute(
+            select(self.table.c.email, *(self.table.c[c] for c in PROGRESS_COLUMNS))
+            .where(self.table.c.email.in_(emails))).all()}
+
+        # Rows are grouped by the columns they set, so each group is one batched statement
+        groups = {}
+        for row in rows:
+            groups.setdefault(tuple(sorted(row)), []).append(row)
+        for columns, group in groups.items():
+            stmt = insert(self.table)
+            updates = {c: stmt.excluded[c] for c in columns if c != 'email'}
+            stmt = stmt.on_conflict_do_update(index_elements=['email'], set_=updates) if updates \
+                else stmt.on_conflict_do_nothing(index_elements=['email'])
+            self.session.execute(stmt, group)
+
+        def changed(row, column):
+            old = existing.get(row['email'])
+            return column in row and (old is None or (getattr(old, column) or '') != (row[column] or ''))
+
+        ids = dict(self.session.execute(
+            select(self.table.c.email, self.table.c.id).where(self.table.c.email.in_(emails))).all())
+        transcripts = [(ids[row['email']], row['transcript'] or '') for row in rows if changed(row, 'transcript')]
+        stale = [{'user_id': ids[row['email']]} for row in rows if any(changed(row, c) for c in PROGRESS_COLUMNS)]
+        index_transcripts(self.session, transcripts)
+        if transcripts:
+            self.session.execute(text("DELETE FROM transcript_analysis WHERE user_id = :user_id"),
+                                 [{'user_id': user_id} for user_id, _ in transcripts])
+        if stale:
+            self.session.execute(text("DELETE FROM degree_progress WHERE user_id = :user_id"), stale)
+
+        created = sum(1 for email in emails if email not in existing)
+        return {'created': created, 'updated': len(emails) - created}
+
+    def flush_chunk(self, chunk: Dict[str, Tuple[int, Dict]]) -> None:
+        """Write a chunk in one transaction, or record by record if the batch fails"""
+        if not chunk:
+            return
+        try:
+            counts = self.write([row for _, row in chunk.values()])
+            self.session.commit()
+        except SQLAlchemyError:
+            self.session.rollback()
+            counts = {'created': 0, 'updated': 0}
+            for line, row in chunk.values():
+                try:
+                    result = self.write([row])
+                    self.session.commit()
+                except SQLAlchemyError as e:
+                    self.session.rollback()
+                    self.fail(line, row['email'], str(e.orig) if getattr(e, 'orig', None) else str(e))
+                    continue
+                counts['created'] += result['created']
+                counts['updated'] += result['updated']
+        for key in ('created', 'updated'):
+            self.report[key] += counts[key]
+            BULK_RECORDS.labels(key).inc(counts[key])
+
+    def run(self, lines: Iterable[bytes]) -> Dict:
+        """
+        Import NDJSON lines; memory use is bounded by the chunk size
+
+        Args:
+            lines: One JSON user per line (blank lines are skipped), e.g. from read_lines
+
+        Returns:
+            Counts of records processed, created, updated and failed, with the first errors by line
+        """
+        chunk = {}  # Email -> (line, row); a repeated email within a chunk merges into one row
+        for number, line in enumerate(lines, start=1):
+            if isinstance(line, LineTooLong):
+                self.report['processed'] += 1
+                self.fail(number, None, f"Line is longer than {line.limit} bytes")
+                continue
+            if not line.strip():
+                continue
+            self.report['processed'] += 1
+            record = None
+            try:
+                record = json.loads(line)
+                row = self.parse(record)
+            except ValueError as e:  # Includes malformed JSON
+                self.fail(number, record.get('email') if isinstance(record, dict) else None, str(e))
+                continue
+            if row['email'] in chunk:
+                chunk[row['email']][1].update(row)
+            else:
+                chunk[row['email']] = (number, row)
+            if len(chunk) >= self.chunk_size:
+                self.flush_chunk(chunk)
+                chunk = {}
+        self.flush_chunk(chunk)
+        return self.report
+
+
+def export_users(session, table: Table, include_transcripts: bool = True, include_password_hash: bool = False,
+                 chunk_size: int = 1000) -> Iterator[str]:
+    """
+    Every user as NDJSON lines, read in id order one chunk at a time
+
+    Args:
+        session: SQLAlchemy session
+        table: User table
+        include_transcripts: Include the stored transcript of each user
+        include_password_hash: Include password hashes (for syncing to another instance)
+        chunk_size: Users read per query
+
+    Yields:
+        One JSON object per line, in the format UserImporter reads
+    """
+    columns = [table.c.id, table.c.email, table.c.first_name, table.c.last_name, table.c.major,
+               table.c.emphasis, table.c.gpa, table.c.credits_completed, table.c.current_semester,
+               table.c.profile_photo]
+    if include_transcripts:
+        columns.append(table.c.transcript)
+    if include_password_hash:
+        columns.append(table.c.password_hash)
+
+    last_id = 0
+    while True:
+        # Keyset pagination: each chunk is an index range scan, however deep the export is
+        rows = session.execute(
+            select(*columns).where(table.c.id > last_id).order_by(table.c.id).limit(chunk_size)).mappings().all()
+        if not rows:
+            return
+        lines = []
+        for row in rows:
+            record = {
+                'id': row['id'],
+                'email': row['email'],
+                'firstName': row['first_name'],
+                'lastName': row['last_name'],
+                'major': row['major'],
+                'emphasis': row['emphasis'],
+                'gpa': row['gpa'],
+                'credits_completed': row['credits_completed'],
+                'current_semester': row['current_semester'],
+                'profile_photo': row['profile_photo'],
+            }
+            if include_transcripts:
+                record['transcript'] = row['transcript']
+            if include_password_hash:
+                record['password_hash'] = row['password_hash']
+            lines.append(json.dumps(record, separators=(',', ':')))
+        last_id = rows[-1]['id']
+        yield '\n'.join(lines) + '\n'
@@ -0,0 +1,16 @@
+"""
+Production WSGI entrypoint
+
+    gunicorn -c gunicorn.conf.py
+
+Importing this module runs the one-time schema checks. With preload_app
+(see gunicorn.conf.py) that happens once, in the master, before any
+worker is forked.
+"""
+from app import app, init_database
+
+init_database()
+
+# Needed by every worker on its first advisor request; importing it before the
+# fork lets workers share these pages instead of each loading a private copy
+import openai  # noqa: E402,F401
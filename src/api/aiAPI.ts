@@ -17,7 +17,12 @@ export interface ChatMessage {
 
 export async function sendPrompt(prompt: string): Promise<AiResponse> {
   try {
-    const response = await axios.post(`${API_BASE_URL}/api/prompt`, { prompt });
+    // Send the session cookie so the prompt counts against this user's budget, not the shared IP's
+    const response = await axios.post(
+      `${API_BASE_URL}/api/prompt`,
+      { prompt },
+      { withCredentials: true }
+    );
     return response.data;
   } catch (error) {
     console.error("Error sending prompt to AI:", error);
@@ -37,3 +37,35 @@ export const saveUserData = async (userData: any): Promise<any> => {
     throw error;
   }
 };
+
+export interface PhotoUploadResponse {
+  profile_photo: string;
+  photos: Record<"webp" | "jpg", Record<string, string>>;
+}
+
+export const uploadProfilePhoto = async (
+  file: File
+): Promise<PhotoUploadResponse> => {
+  const formData = new FormData();
+  formData.append("photo", file);
+
+  const response = await fetch("http://localhost:5000/api/users/photo", {
+    method: "POST",
+    credentials: "include",
+    body: formData,
+  });
+
+  if (!response.ok) {
+    const errorData = await response.json();
+    throw new Error(errorData.error || "Failed to upload photo");
+  }
+
+  return await response.json();
+};
+
+// Uploaded photos are served by the backend as /api/photos/<hash>-<size>.<ext>;
+// pick the size a view needs. Other URLs (the default photo, external links) pass through.
+export const photoSrc = (url: string, size: number): string =>
+  url.startsWith("/api/photos/")
+    ? `http://localhost:5000${url.replace(/-\d+\.(webp|jpg)$/, `-${size}.$1`)}`
+    : url;
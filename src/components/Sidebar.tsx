@@ -1,7 +1,7 @@
 import { Link } from "react-router-dom";
 import { useEffect, useState } from "react";
 import { useAuth } from "../context/AuthContext";
-import { getUserData } from "../api/userAPI";
+import { getUserData, photoSrc } from "../api/userAPI";
 
 export default function Sidebar() {
   const { user, logout } = useAuth();
@@ -66,7 +66,7 @@ export default function Sidebar() {
           className="btn flex gap-4 items-center tracking-normal pb-5 pt-5"
         >
           <img
-            src={profilePhoto} // Use the profile photo from state
+            src={photoSrc(profilePhoto, 96)} // 48px avatar, 2x for high-DPI screens
             className="size-12 rounded-full object-cover"
             alt="Profile"
           />
@@ -1,5 +1,10 @@
 import { useState, useEffect } from "react";
-import { getUserData, saveUserData } from "../api/userAPI";
+import {
+  getUserData,
+  saveUserData,
+  uploadProfilePhoto,
+  photoSrc,
+} from "../api/userAPI";
 import { useAuth } from "../context/AuthContext";
 
 export default function Profile() {
@@ -16,6 +21,7 @@ export default function Profile() {
   const [profilePhoto, setProfilePhoto] = useState("/default-profile.jpg");
 
   const [updating, setUpdating] = useState(false);
+  const [uploadError, setUploadError] = useState<string | null>(null);
   const [academicDataLoaded, setAcademicDataLoaded] = useState(false);
 
   useEffect(() => {
@@ -53,6 +59,22 @@ export default function Profile() {
     setEditing(true);
   };
 
+  const handlePhotoUpload = async (e: React.ChangeEvent<HTMLInputElement>) => {
+    const file = e.target.files?.[0];
+    if (!file) return;
+
+    setUpdating(true);
+    setUploadError(null);
+    try {
+      const result = await uploadProfilePhoto(file);
+      setProfilePhoto(result.profile_photo);
+    } catch (error) {
+      setUploadError(error instanceof Error ? error.message : "Upload failed");
+    } finally {
+      setUpdating(false);
+    }
+  };
+
   const handleCancel = () => {
     setEditing(false);
   };
@@ -116,7 +138,8 @@ export default function Profile() {
       <div className="flex gap-6 justify-between items-center">
         <div className="size-64 rounded-full bg-neutral-700 border-2 border-white/60 shadow-md overflow-hidden">
           <img
-            src={`${profilePhoto}`}
+            src={photoSrc(profilePhoto, 256)}
+            srcSet={`${photoSrc(profilePhoto, 256)} 1x, ${photoSrc(profilePhoto, 512)} 2x`}
             alt="Profile"
             className="w-full h-full object-cover"
           />
@@ -179,8 +202,19 @@ export default function Profile() {
                   placeholder="URL to your profile photo"
                 />
                 <p className="text-xs text-neutral-500 mt-1">
-                  Enter the URL of an image to use as your profile picture
+                  Enter the URL of an image to use as your profile picture, or
+                  upload one
                 </p>
+                <input
+                  type="file"
+                  accept="image/jpeg,image/png,image/webp,image/gif"
+                  onChange={handlePhotoUpload}
+                  disabled={updating}
+                  className="mt-2 text-sm text-neutral-400"
+                />
+                {uploadError && (
+                  <p className="text-xs text-red-400 mt-1">{uploadError}</p>
+                )}
               </div>
             </>
           ) : (